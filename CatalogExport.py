@@ -0,0 +1,115 @@
+import os
+import sqlite3
+
+from FanzineIssueSpecPackage import FanzineIssueInfo, FanzineSeriesInfo
+from Log import Log
+
+from FanacTagIndex import TagIndex
+
+
+#================================================================================
+# Export the catalogue of fanzine series and issues to an SQLite database with typed columns so that it can be queried directly
+#   rather than by re-parsing the text reports.
+# The database is built in a temporary file with bulk inserts in a single transaction, the indexes are created once the data is loaded,
+#   and then the temporary file replaces any existing database.
+def ExportCatalogToSQLite(filename: str, fanacIssueList: list[FanzineIssueInfo], tagIndex: TagIndex) -> None:
+    Log(f"Exporting {len(fanacIssueList):,} issues to {filename}", timestamp=True)
+
+    # Assign an ID to each distinct series object
+    seriesIDs: dict[int, int]={}
+    seriesRows: list[tuple]=[]
+    issueRows: list[tuple]=[]
+    mailingRows: list[tuple]=[]
+    for issueID, fz in enumerate(fanacIssueList, start=1):
+        series=fz.Series
+        seriesID=seriesIDs.get(id(series))
+        if seriesID is None:
+            seriesID=len(seriesIDs)+1
+            seriesIDs[id(series)]=seriesID
+            seriesRows.append(SeriesRow(seriesID, series, tagIndex))
+        issueRows.append(IssueRow(issueID, seriesID, fz, tagIndex))
+        for mailing in fz.Mailings:
+            mailingRows.append((issueID, mailing))
+
+    tempname=filename+".tmp"
+    if os.path.exists(tempname):
+        os.remove(tempname)
+    db=sqlite3.connect(tempname)
+    try:
+        db.execute("PRAGMA journal_mode=OFF")
+        db.execute("PRAGMA synchronous=OFF")
+        db.executescript("""
+            CREATE TABLE series (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                editor TEXT,
+                dirurl TEXT,
+                url TEXT,
+                country TEXT,
+                issues INTEGER,
+                pages INTEGER,
+                alphabetize_individually INTEGER,
+                tags TEXT
+            );
+            CREATE TABLE issues (
+                id INTEGER PRIMARY KEY,
+                series_id INTEGER NOT NULL REFERENCES series(id),
+                name TEXT NOT NULL,
+                editor TEXT,
+                dirurl TEXT,
+                pagefilename TEXT,
+                url TEXT,
+                position INTEGER,
+                year INTEGER,
+                month INTEGER,
+                day INTEGER,
+                date TEXT,
+                vol INTEGER,
+                num INTEGER,
+                numsuffix TEXT,
+                whole INTEGER,
+                wsuffix TEXT,
+                pages INTEGER,
+                country TEXT,
+                fanzinetype TEXT
+            );
+            CREATE TABLE mailings (
+                issue_id INTEGER NOT NULL REFERENCES issues(id),
+                mailing TEXT NOT NULL
+            );
+            """)
+        with db:     # A single transaction for all the inserts
+            db.executemany("INSERT INTO series VALUES (?,?,?,?,?,?,?,?,?,?)", seriesRows)
+            db.executemany("INSERT INTO issues VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", issueRows)
+            db.executemany("INSERT INTO mailings VALUES (?,?)", mailingRows)
+        db.executescript("""
+            CREATE INDEX issues_series ON issues(series_id);
+            CREATE INDEX issues_year ON issues(year, month, day);
+            CREATE INDEX issues_editor ON issues(editor);
+            CREATE INDEX issues_country ON issues(country);
+            CREATE INDEX series_name ON series(name);
+            CREATE INDEX series_country ON series(country);
+            CREATE INDEX mailings_mailing ON mailings(mailing);
+            """)
+    finally:
+        db.close()
+
+    os.replace(tempname, filename)
+    Log(f"Export complete: {len(seriesRows):,} series, {len(issueRows):,} issues, {len(mailingRows):,} mailing entries", timestamp=True)
+
+
+def SeriesRow(seriesID: int, series: FanzineSeriesInfo, tagIndex: TagIndex) -> tuple:
+    counts=series.Counts
+    tags=sorted(tagIndex.SeriesTags(series.SeriesName))
+    return (seriesID, series.SeriesName, series.Editor, series.DirURL, series.URL, series.Country,
+            counts.Issuecount if counts is not None else None, counts.Pagecount if counts is not None else None,
+            1 if series.AlphabetizeIndividually else 0, ", ".join(tags))
+
+
+def IssueRow(issueID: int, seriesID: int, fz: FanzineIssueInfo, tagIndex: TagIndex) -> tuple:
+    fd=fz.FIS.FD
+    fs=fz.FIS.FS
+    return (issueID, seriesID, fz.IssueName, fz.Editor, fz.DirURL, fz.PageFilename, fz.URL, fz.Position,
+            fd.Year, fd.MonthNum, fd.DayNum, fz.FIS.DateStr,
+            fs.Vol, fs.Num, fs.NumSuffix, fs.Whole, fs.WSuffix,
+            fz.Pagecount, fz.Locale.CountryName, tagIndex.FanzineType(fz))
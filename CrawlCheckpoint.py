@@ -0,0 +1,102 @@
+import os
+import time
+import threading
+
+from FanzineIssueSpecPackage import FanzineIssueInfo
+from CrawlFrontier import NormalizeIndexUrl
+from Log import Log, LogError
+
+
+#================================================================================
+# A checkpoint of a crawl in progress, so that a crawl which dies partway (a network drop, an assert on a malformed table, ...) can be restarted
+#   without reading again the index pages it had already read.
+# Each index page read successfully is recorded along with the issues read from it and the index pages it links to.  The checkpoint is written
+#   to disk every few minutes and whenever the crawl stops, by writing a temporary file and renaming it over the old one, so the file on disk is
+#   always a complete checkpoint.
+# A restarted crawl uses the recorded results for the pages in the checkpoint rather than reading them again, and reads only the rest.
+# When the crawl completes the checkpoint is deleted, so the next crawl starts afresh.
+# The checkpoint records the crawl it belongs to (runKey, a hash of the directories being crawled) and when that crawl started.  A checkpoint
+#   from a different crawl, or one older than maxAgeHours, is discarded rather than resumed.
+# A filename of "" means no checkpointing: nothing is read, recorded or written.
+# Parameters:
+#   Crawl Checkpoint                -- the checkpoint file (default "Crawl checkpoint.json")
+#   Crawl Checkpoint Minutes        -- how often it is written (default 2)
+#   Crawl Checkpoint Max Age Hours  -- how old a checkpoint can be and still be resumed (default 48)
+class CrawlCheckpoint:
+    def __init__(self, filename: str, minutes: float, runKey: str, maxAgeHours: float):
+        self.Filename: str=filename
+        self._interval: float=60*minutes
+        self._runKey: str=runKey
+        self._started: float=time.time()       # When the crawl this checkpoint belongs to started
+        self._lastSave: float=time.time()
+        self._lock=threading.Lock()
+        self._dirty: bool=False
+        # Normalized URL --> (issues, list of (title, URL) of linked index pages)
+        self._pages: dict[str, tuple[list[FanzineIssueInfo], list[tuple[str, str]]]]={}
+        self.Resumed: int=0
+
+        if filename != "" and os.path.exists(filename):
+            import jsonpickle
+            try:
+                with open(filename, "r", encoding="utf-8") as f:
+                    checkpoint=jsonpickle.decode(f.read())
+                started=float(checkpoint["Started"])
+                if checkpoint["RunKey"] != runKey:
+                    Log(f"Ignoring the crawl checkpoint {filename}: it is from a crawl of a different set of directories")
+                elif time.time()-started > 3600*maxAgeHours:
+                    Log(f"Ignoring the crawl checkpoint {filename}: it is from {time.ctime(started)}, more than {maxAgeHours:g} hours ago")
+                else:
+                    self._started=started
+                    self._pages={url: (issues, [tuple(x) for x in links]) for url, (issues, links) in checkpoint["Pages"].items()}
+                    Log(f"Resuming the crawl of {time.ctime(started)} from {filename}: {len(self._pages):,} index pages already read", timestamp=True)
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                LogError(f"CrawlCheckpoint: unable to read {filename}, so starting from scratch: {e}")
+
+
+    # Return the recorded results for a page, or None if it is not in the checkpoint
+    def Get(self, url: str) -> tuple[list[FanzineIssueInfo], list[tuple[str, str]]]|None:
+        with self._lock:
+            result=self._pages.get(NormalizeIndexUrl(url))
+            if result is not None:
+                self.Resumed+=1
+            return result
+
+
+    def Record(self, url: str, issues: list[FanzineIssueInfo], links: list[tuple[str, str]]) -> None:
+        if self.Filename == "":
+            return
+        with self._lock:
+            self._pages[NormalizeIndexUrl(url)]=(issues, links)
+            self._dirty=True
+            if time.time()-self._lastSave > self._interval:
+                self._Save()
+
+
+    def Save(self) -> None:
+        with self._lock:
+            if self._dirty:
+                self._Save()
+
+
+    def _Save(self) -> None:
+        import jsonpickle
+        tempname=self.Filename+".tmp"
+        try:
+            with open(tempname, "w", encoding="utf-8") as f:
+                f.write(jsonpickle.encode({"RunKey": self._runKey, "Started": self._started,
+                                           "Pages": {url: [issues, links] for url, (issues, links) in self._pages.items()}}))
+            os.replace(tempname, self.Filename)
+        except OSError as e:
+            LogError(f"CrawlCheckpoint: unable to write {self.Filename}: {e}")
+            return
+        self._dirty=False
+        self._lastSave=time.time()
+        Log(f"Crawl checkpoint written: {len(self._pages):,} index pages", timestamp=True)
+
+
+    # The crawl has completed, so the checkpoint is no longer needed
+    def Remove(self) -> None:
+        with self._lock:
+            self._dirty=False
+            if self.Filename != "" and os.path.exists(self.Filename):
+                os.remove(self.Filename)
@@ -0,0 +1,85 @@
+from typing import Callable, Iterator
+
+import re
+import threading
+import urllib.parse
+
+
+#================================================================================
+# The frontier of a crawl of fanzine index pages.
+# Index pages are added to the frontier as they are found; each is read exactly once, no matter how many pages link to it, since a page is only
+#   admitted if its normalized URL has not been seen before.
+# The index pages found on a page (the rows which DecodeTableRow() recognizes as links to another fanac.org/fanzines directory) are added
+#   one level deeper than it.  Each page's depth is kept, so links found on a page at maxDepth are never followed, however the page was reached.
+class CrawlFrontier:
+    def __init__(self, maxDepth: int, threads: int):
+        self.MaxDepth: int=maxDepth
+        self.Threads: int=max(1, threads)
+        self._visited: set[str]=set()
+        self._lock=threading.Lock()
+        self._queue: list[tuple[str, str]]=[]           # (title, url) of the pages waiting to be read
+        self._depth: dict[str, int]={}                  # Normalized URL --> its depth: 0 for the pages added directly, 1 for the pages they link to, ...
+        self.Pages: dict[str, tuple[str, str, str]]={}  # Normalized URL --> (title, url, normalized URL of the page it was found on or "") for each page admitted
+
+
+    # Add a page to the frontier.  parentUrl is the page which links to it, or "" if it was added directly.
+    # Returns False if it has already been seen.
+    def Add(self, title: str, url: str, parentUrl: str="") -> bool:
+        with self._lock:
+            key=NormalizeIndexUrl(url)
+            if key in self._visited:
+                return False
+            self._visited.add(key)
+            if parentUrl == "":
+                self._depth[key]=0
+                self.Pages[key]=(title, url, "")
+            else:
+                parentKey=NormalizeIndexUrl(parentUrl)
+                self._depth[key]=self._depth[parentKey]+1
+                self.Pages[key]=(title, url, parentKey)
+        self._queue.append((title, url))
+        return True
+
+
+    # Add the index pages linked to from a page which has been read, unless that page is already at the depth limit.
+    #   admit(url) decides whether a page which was linked to should be read at all
+    def AddLinks(self, parentUrl: str, links: list[tuple[str, str]], admit: Callable[[str], bool]) -> None:
+        if self._depth[NormalizeIndexUrl(parentUrl)] >= self.MaxDepth:
+            return
+        for linkTitle, linkUrl in links:
+            if admit(linkUrl):
+                self.Add(linkTitle, linkUrl, parentUrl)
+
+
+    # The number of pages admitted to the frontier so far
+    @property
+    def Count(self) -> int:
+        return len(self._visited)
+
+
+    # Read all the pages waiting, following the links found on them.
+    #   read(title, url) reads a page and returns (whatever was read from it, list of (title, url) of the index pages it links to)
+    #   admit(url) decides whether a page which was linked to should be read at all
+    # Yields (title, url, whatever was read) for each page in the order the pages were added to the frontier.
+    # The pages are read a batch at a time: all the pages waiting are read concurrently, and then the pages they link to.
+    def Crawl(self, read: Callable[[str, str], tuple[object, list[tuple[str, str]]]], admit: Callable[[str], bool]) -> Iterator[tuple[str, str, object]]:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=self.Threads) as executor:
+            while len(self._queue) > 0:
+                batch=self._queue
+                self._queue=[]
+                for (title, url), (result, links) in zip(batch, executor.map(lambda page: read(*page), batch)):
+                    yield title, url, result
+                    self.AddLinks(url, links, admit)
+
+
+# Reduce an index page's URL to a canonical form, so that the different ways of writing the same URL are recognized as the same page:
+#   http and https, with and without www., upper case host, doubled slashes, %-escapes, a trailing /index.html, and a missing trailing slash
+def NormalizeIndexUrl(url: str) -> str:
+    u=urllib.parse.urlsplit(url.strip())
+    host=u.netloc.lower().removeprefix("www.")
+    path=re.sub(r"/+", "/", urllib.parse.unquote(u.path))
+    path=re.sub(r"/index\.html?$", "/", path, flags=re.IGNORECASE)
+    if not path.endswith("/") and not path.lower().endswith((".html", ".htm")):
+        path+="/"
+    return host+path
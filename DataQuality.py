@@ -0,0 +1,190 @@
+from typing import Callable
+from dataclasses import dataclass, asdict
+from collections import defaultdict
+
+import os
+import json
+
+from FanzineIssueSpecPackage import FanzineIssueInfo, FanzineSerial
+from ReportOutput import OpenReport
+from Log import Log
+from HelpersPackage import ReadList, RemoveArticles
+
+
+#================================================================================
+# The data-quality checks.
+# Each check is a rule registered below with @IssueRule (which looks at one issue at a time) or @SeriesRule (which looks at all the issues of a series).
+# A rule returns a detail string for each problem it finds (or None/[] if there is none).
+# All the rules are run in a single sweep through the catalogue by CheckDataQuality(), with the series checked concurrently, and the results are
+#   written to "Data quality findings.json" as a list of {Rule, Series, Issue, URL, Detail}.
+# A rule may have a suppression list: a control file of series names which the rule is not applied to (e.g., control-Ignore Page Count Errors.txt).
+#   A rule registered with offIfNoSuppressions=True isn't run at all when its suppression list is empty or missing.
+# The existing text reports (e.g., "Fanzines with odd names.txt") select their issues with DataQualityFindings.Has().
+@dataclass(frozen=True)
+class Finding:
+    Rule: str
+    Series: str
+    Issue: str
+    URL: str
+    Detail: str
+
+
+@dataclass(frozen=True)
+class QualityRule:
+    Name: str
+    Check: Callable
+    IsSeriesRule: bool
+    SuppressionFile: str
+    OffIfNoSuppressions: bool
+
+
+Rules: list[QualityRule]=[]
+
+
+def IssueRule(name: str, suppressionFile: str="", offIfNoSuppressions: bool=False):
+    def Register(f: Callable[[FanzineIssueInfo], str|None]):
+        Rules.append(QualityRule(name, f, False, suppressionFile, offIfNoSuppressions))
+        return f
+    return Register
+
+
+def SeriesRule(name: str, suppressionFile: str="", offIfNoSuppressions: bool=False):
+    def Register(f: Callable[[list[FanzineIssueInfo]], list[tuple[FanzineIssueInfo, str]]]):
+        Rules.append(QualityRule(name, f, True, suppressionFile, offIfNoSuppressions))
+        return f
+    return Register
+
+
+#================================================================================
+class DataQualityFindings:
+    def __init__(self, findings: list[Finding], flagged: set[tuple[str, int]]):
+        self.Findings: list[Finding]=findings
+        self._flagged: set[tuple[str, int]]=flagged        # (rule name, id(fz))
+
+    # Did the rule flag this issue?
+    def Has(self, fz: FanzineIssueInfo, rule: str) -> bool:
+        return (rule, id(fz)) in self._flagged
+
+    def Count(self, rule: str) -> int:
+        return sum(1 for f in self.Findings if f.Rule == rule)
+
+
+def CheckDataQuality(fanacIssueList: list[FanzineIssueInfo], rootDir: str, reportFilePath: str) -> DataQualityFindings:
+    Log(f"Checking data quality with {len(Rules)} rules", timestamp=True)
+    suppressions: dict[str, set[str]]={}
+    for rule in Rules:
+        if rule.SuppressionFile != "":
+            suppressions[rule.Name]=set(ReadList(os.path.join(rootDir, rule.SuppressionFile)))
+    rules=[rule for rule in Rules if not (rule.OffIfNoSuppressions and len(suppressions.get(rule.Name, ())) == 0)]
+
+    bySeries: defaultdict[str, list[FanzineIssueInfo]]=defaultdict(list)
+    for fz in fanacIssueList:
+        bySeries[fz.SeriesName].append(fz)
+
+    def CheckSeries(seriesName: str) -> list[tuple[str, FanzineIssueInfo, str]]:
+        issues=bySeries[seriesName]
+        results: list[tuple[str, FanzineIssueInfo, str]]=[]
+        for rule in rules:
+            if seriesName in suppressions.get(rule.Name, ()):
+                continue
+            if rule.IsSeriesRule:
+                results.extend((rule.Name, fz, detail) for fz, detail in rule.Check(issues))
+            else:
+                for fz in issues:
+                    detail=rule.Check(fz)
+                    if detail is not None:
+                        results.append((rule.Name, fz, detail))
+        return results
+
+    findings: list[Finding]=[]
+    flagged: set[tuple[str, int]]=set()
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor() as executor:
+        for results in executor.map(CheckSeries, bySeries.keys()):
+            for ruleName, fz, detail in results:
+                findings.append(Finding(Rule=ruleName, Series=fz.SeriesName, Issue=fz.IssueName, URL=fz.URL, Detail=detail))
+                flagged.add((ruleName, id(fz)))
+    findings.sort(key=lambda f: (f.Rule, f.Series.casefold(), f.Issue.casefold()))
+
+    with OpenReport(os.path.join(reportFilePath, "Data quality findings.json"), "w", encoding="utf-8") as f:
+        json.dump([asdict(finding) for finding in findings], f, indent=1, ensure_ascii=False)
+
+    quality=DataQualityFindings(findings, flagged)
+    for rule in Rules:
+        if rule in rules:
+            Log(f"   {rule.Name}: {quality.Count(rule.Name):,}")
+        else:
+            Log(f"   {rule.Name}: not checked, since {rule.SuppressionFile} is empty")
+    return quality
+
+
+#================================================================================
+# The rules
+
+# Flag cases where the issue name doesn't match the series name.  We're being real simple and picky here!
+@IssueRule("Odd name")
+def OddName(fz: FanzineIssueInfo) -> str|None:
+    n1=RemoveArticles(fz.IssueName).casefold().strip()
+    n2=RemoveArticles(fz.SeriesName).casefold().strip()
+    # We'd like them to match to the length of the shorter name
+    length=min(len(n1), len(n2))
+    if n1[:length] != n2[:length]:
+        return "Issue name does not begin with the series name"
+    return None
+
+
+@IssueRule("Odd page count")
+def OddPageCount(fz: FanzineIssueInfo) -> str|None:
+    if fz.Pagecount > 250:
+        return f"{fz.Pagecount} pages"
+    return None
+
+
+# As before, there's no check unless control-Ignore Page Count Errors.txt lists some series
+@IssueRule("No page count", suppressionFile="control-Ignore Page Count Errors.txt", offIfNoSuppressions=True)
+def NoPageCount(fz: FanzineIssueInfo) -> str|None:
+    if fz.DirURL != "" and fz.Pagecount == 0:
+        return "No page count"
+    return None
+
+
+# The date columns had something in them, but it could not be interpreted (see ExtractDate()).  Issues with no date at all aren't reported.
+# (The text is kept on the issue by DecodeTableRow().  Issues from a fanzine list saved before it did so don't have it.)
+@IssueRule("Bad date")
+def BadDate(fz: FanzineIssueInfo) -> str|None:
+    dateText=getattr(fz, "UnparsedDate", "")
+    if dateText != "" and (fz.FIS is None or fz.FIS.Year is None):
+        return f"Uninterpretable date '{dateText}'"
+    return None
+
+
+# The serial in the issue name disagrees with the serial columns.  (This repeats the checks in ExtractSerialNumber() on the finished record.)
+@IssueRule("Inconsistent serial")
+def InconsistentSerial(fz: FanzineIssueInfo) -> str|None:
+    fs=fz.FIS.FS if fz.FIS is not None else None
+    if fs is None:
+        return None
+    ser=FanzineSerial().Match(fz.IssueName)
+    if ser.Num is not None and 1930 <= ser.Num <= 2050:      # A trailing year, not a number
+        return None
+    if ser.Vol is not None and ser.Num is not None:
+        if fs.Vol is not None and fs.Vol != ser.Vol:
+            return f"Volume={fs.Vol} but the name says Vol {ser.Vol}"
+        if fs.Num is not None and fs.Num != ser.Num:
+            return f"Number={fs.Num} but the name says #{ser.Num}"
+    elif ser.Num is not None and fs.Whole is not None and fs.Whole != ser.Num:
+        return f"Whole={fs.Whole} but the name says #{ser.Num}"
+    return None
+
+
+# The same issue name appears more than once in a series, pointing to different files
+@SeriesRule("Repeated issue name")
+def RepeatedIssueName(issues: list[FanzineIssueInfo]) -> list[tuple[FanzineIssueInfo, str]]:
+    byName: defaultdict[str, list[FanzineIssueInfo]]=defaultdict(list)
+    for fz in issues:
+        byName[fz.IssueName.casefold().strip()].append(fz)
+    results=[]
+    for same in byName.values():
+        if len(set(fz.URL for fz in same)) > 1:
+            results.extend((fz, f"{len(same)} issues with this name") for fz in same)
+    return results
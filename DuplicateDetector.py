@@ -0,0 +1,126 @@
+from collections import defaultdict
+
+import os
+import copy
+import re
+
+from FanzineIssueSpecPackage import FanzineIssueInfo
+from Settings import Settings
+from ReportOutput import OpenReport
+from Log import Log, LogError
+
+
+#================================================================================
+# Find issues which appear more than once in the catalogue under different series.
+# RemoveDuplicateIssues() only drops exact duplicates (same DirURL and PageFilename), but an index page can list an issue that lives in another
+#   directory (see the cross-directory handling in DecodeTableRow()), and the same issue can be listed separately on two index pages.
+# Rather than compare all pairs of issues, the issues are put into blocks keyed by their normalized title words, year and serial, and only issues
+#   in the same block are compared.  Within a block, issues listed on different index pages whose months don't conflict are duplicates.
+# An issue with neither a year nor a serial is never considered a duplicate: its title alone is too weak.
+#
+# The parameter "Duplicate Issue Policy" says what to do with them:
+#   keep    -- don't look for them (the old behavior)
+#   flag    -- list them in the report, but leave them all in the catalogue (the default)
+#   merge   -- keep one issue of each set (preferring the one listed on its own series' page), fold the others' page counts, mailings and tags
+#               into it, and drop the others
+# Either way, the report "Duplicate issues.txt" lists what was found (and, for merge, what was kept).
+def ApplyDuplicatePolicy(fanacIssueList: list[FanzineIssueInfo], reportFilePath: str) -> list[FanzineIssueInfo]:
+    policy=Settings().Get("Duplicate Issue Policy", "flag").strip().lower()
+    if policy == "keep":
+        return fanacIssueList
+    if policy not in ["flag", "merge"]:
+        LogError(f"ApplyDuplicatePolicy: Unknown Duplicate Issue Policy '{policy}'. Using 'flag'")
+        policy="flag"
+
+    duplicates=FindDuplicateIssues(fanacIssueList)
+    Log(f"{len(duplicates):,} sets of duplicate issues found", timestamp=True)
+
+    with OpenReport(os.path.join(reportFilePath, "Duplicate issues.txt"), "w", encoding="utf-8") as f:
+        f.write(f"Issues listed under more than one series  (policy: {policy})\n\n")
+        for group in duplicates:
+            for i, fz in enumerate(group):
+                marker="   " if policy == "flag" else (" * " if i == 0 else "   ")
+                f.write(f"{marker}{fz.IssueName}  [{fz.SeriesName}]  {fz.FIS.DateStr}  {fz.URL}\n")
+            f.write("\n")
+        if policy == "merge":
+            f.write("* marks the issue kept\n")
+
+    if policy == "flag":
+        return fanacIssueList
+
+    # The merge is done into a copy of the keeper, so the issues in the list passed in are never changed
+    dropped: set[int]=set()
+    merged: dict[int, FanzineIssueInfo]={}      # id() of the keeper --> its merged copy
+    for group in duplicates:
+        keeper=copy.copy(group[0])
+        keeper.Mailings=list(group[0].Mailings)
+        keeper.Taglist=list(group[0].Taglist)
+        MergeInto(keeper, group[1:])
+        merged[id(group[0])]=keeper
+        dropped.update(id(fz) for fz in group[1:])
+    Log(f"{len(dropped):,} duplicate issues merged", timestamp=True)
+    return [merged.get(id(fz), fz) for fz in fanacIssueList if id(fz) not in dropped]
+
+
+# Return the sets of duplicates found.  Each set is in order of preference: the first is the one to keep.
+def FindDuplicateIssues(fanacIssueList: list[FanzineIssueInfo]) -> list[list[FanzineIssueInfo]]:
+    blocks: defaultdict[tuple, list[FanzineIssueInfo]]=defaultdict(list)
+    for fz in fanacIssueList:
+        key=BlockingKey(fz)
+        if key is not None:
+            blocks[key].append(fz)
+
+    duplicates: list[list[FanzineIssueInfo]]=[]
+    for block in blocks.values():
+        if len(block) < 2 or len(set(IndexPage(fz) for fz in block)) < 2:
+            continue
+        block=sorted(block, key=lambda fz: (not IsHome(fz), fz.URL))
+        keeper=block[0]
+        group=[keeper]+[fz for fz in block[1:] if IndexPage(fz) != IndexPage(keeper) and MonthsAgree(fz, keeper)]
+        if len(group) > 1:
+            duplicates.append(group)
+    duplicates.sort(key=lambda group: (group[0].SeriesName.casefold(), group[0].FIS.FormatYearMonthDayForSorting()))
+    return duplicates
+
+
+#--------------------------------------------------------------------------------
+# The blocking key: normalized title words, year and serial.  None if the issue has no year and no serial.
+def BlockingKey(fz: FanzineIssueInfo) -> tuple|None:
+    year=fz.FIS.Year
+    fs=fz.FIS.FS
+    serial=(fs.Vol, fs.Num, fs.Whole) if fs is not None else (None, None, None)
+    if year is None and serial == (None, None, None):
+        return None
+    return TitleWords(fz.IssueName), year, serial
+
+
+def TitleWords(title: str) -> str:
+    words=[w for w in re.split(r"[^0-9a-z]+", title.casefold()) if w not in ["", "the", "a", "an"]]
+    return " ".join(sorted(set(words)))
+
+
+# The index page an issue was listed on
+def IndexPage(fz: FanzineIssueInfo) -> str:
+    return fz.Series.DirURL.rstrip("/") if fz.Series is not None else ""
+
+
+# Is the issue's file in the directory of the index page it was listed on (rather than being a reference to another directory)?
+def IsHome(fz: FanzineIssueInfo) -> bool:
+    return fz.DirURL.rstrip("/") == IndexPage(fz)
+
+
+def MonthsAgree(fz1: FanzineIssueInfo, fz2: FanzineIssueInfo) -> bool:
+    return fz1.FIS.MonthNum is None or fz2.FIS.MonthNum is None or fz1.FIS.MonthNum == fz2.FIS.MonthNum
+
+
+# Fold what the duplicates know and the keeper doesn't into the keeper
+def MergeInto(keeper: FanzineIssueInfo, others: list[FanzineIssueInfo]) -> None:
+    for fz in others:
+        if keeper.Pagecount == 0 and fz.Pagecount > 0:
+            keeper.Pagecount=fz.Pagecount
+        for mailing in fz.Mailings:
+            if mailing not in keeper.Mailings:
+                keeper.Mailings.append(mailing)
+        for tag in fz.Taglist:
+            if tag not in keeper.Taglist:
+                keeper.Taglist.append(tag)
@@ -0,0 +1,151 @@
+from collections import defaultdict, Counter
+from difflib import SequenceMatcher
+
+import os
+import re
+import unicodedata
+
+from FanzineIssueSpecPackage import FanzineIssueInfo
+from ReportOutput import OpenReport
+from Log import Log
+from HelpersPackage import UnscrambleListOfNames
+
+
+#================================================================================
+# Propose additions to People Canonical Names.txt by finding editor names which are probably spelling variants of each other
+#   (e.g., "F.M. Busby" and "F. M. Busby", "Lee Hoffman" and "Lee Hoffmann", "Terry Carr" and "T. Carr").
+# Every distinct editor name is put into a block keyed by the phonetic (Soundex) key of its surname and its first initial, and names are only
+#   compared with the other names in their block, so this scales to tens of thousands of names.
+# Two names in a block are variants if
+#   * they are the same once case, accents, punctuation and spacing are ignored, or
+#   * they have the same surname and their given names agree word for word, allowing an initial to stand for a name, or
+#   * their surnames sound alike and the names as a whole are very similar (a typo)
+# Variants are gathered into clusters and the name used most often in a cluster is proposed as its canonical name.
+# Names which already appear in People Canonical Names.txt are left alone.
+# The proposals are written in the same "name --> canonical name" format as People Canonical Names.txt, to be reviewed and copied over by hand.
+# Turned on by the parameter "Propose Canonical Names".
+SimilarityThreshold=0.92      # "John Berry" and "John Barry" (0.90) are different people; "Lee Hoffman" and "Lee Hoffmann" (0.96) are not
+
+Suffixes={"jr", "sr", "ii", "iii", "iv"}
+
+
+def ProposeCanonicalNames(fanacIssueList: list[FanzineIssueInfo], peopleCanonicalNames: dict[str, str], reportFilePath: str) -> None:
+    Log("Clustering editor names", timestamp=True)
+    uses: Counter[str]=Counter()
+    for fz in fanacIssueList:
+        for ed in UnscrambleListOfNames(fz.Editor):
+            ed=ed.strip().removesuffix(" et al")
+            if ed != "" and ed not in peopleCanonicalNames:
+                uses[ed]+=1
+    known=set(peopleCanonicalNames.values())
+
+    blocks: defaultdict[tuple[str, str], list[str]]=defaultdict(list)
+    parsed: dict[str, tuple[list[str], str]]={}
+    for name in uses:
+        given, surname=SplitName(name)
+        if surname == "":
+            continue
+        parsed[name]=(given, surname)
+        blocks[(Soundex(surname), given[0][0] if len(given) > 0 else "")].append(name)
+
+    parent: dict[str, str]={}       # Union-find over the names
+    # Names which differ only by initials are joined afterwards, and only when the initials can stand for just one person:
+    #   "T. Carr" is not joined to anyone if there is both a "Terry Carr" and a "Tom Carr"
+    initialMatches: defaultdict[str, list[str]]=defaultdict(list)      # Name with initials --> the names it might abbreviate
+    comparisons=0
+    for block in blocks.values():
+        for i in range(len(block)):
+            for j in range(i+1, len(block)):
+                comparisons+=1
+                match=Compare(parsed[block[i]], parsed[block[j]])
+                if match == "same":
+                    Union(parent, block[i], block[j])
+                elif match == "initials":
+                    if Initials(parsed[block[i]]) >= Initials(parsed[block[j]]):
+                        initialMatches[block[i]].append(block[j])
+                    else:
+                        initialMatches[block[j]].append(block[i])
+    for name, partners in initialMatches.items():
+        if len(set(Find(parent, partner) for partner in partners)) == 1:
+            Union(parent, name, partners[0])
+
+    clusters: defaultdict[str, list[str]]=defaultdict(list)
+    for name in parsed:
+        clusters[Find(parent, name)].append(name)
+    clusters={k: v for k, v in clusters.items() if len(v) > 1}
+
+    with OpenReport(os.path.join(reportFilePath, "Proposed People Canonical Names.txt"), "w", encoding="utf-8") as f:
+        f.write("# Proposed additions to People Canonical Names.txt.  Check them before copying them over!\n\n")
+        for names in sorted(clusters.values(), key=lambda c: CanonicalName(c, uses, known).casefold()):
+            canonical=CanonicalName(names, uses, known)
+            for name in sorted(names, key=lambda x: x.casefold()):
+                if name != canonical:
+                    f.write(f"{name} --> {canonical}\n")
+            f.write("\n")
+
+    Log(f"{len(uses):,} editor names in {len(blocks):,} blocks: {comparisons:,} comparisons found {len(clusters):,} clusters", timestamp=True)
+
+
+# The canonical name of a cluster is one already used as a canonical name, if there is one, and otherwise the one used most often
+def CanonicalName(names: list[str], uses: Counter[str], known: set[str]) -> str:
+    return max(names, key=lambda x: (x in known, uses[x], len(x), x))
+
+
+#--------------------------------------------------------------------------------
+# Turn a name into its casefolded, unaccented words, and split off the surname
+def SplitName(name: str) -> tuple[list[str], str]:
+    name=unicodedata.normalize("NFKD", name)
+    name="".join(c for c in name if not unicodedata.combining(c)).casefold()
+    words=[w for w in re.split(r"[^a-z']+", name.replace(".", ". ")) if w.strip("'") != ""]
+    while len(words) > 1 and words[-1] in Suffixes:
+        words=words[:-1]
+    if len(words) == 0:
+        return [], ""
+    return words[:-1], words[-1]
+
+
+# Compare two names from the same block.  Returns "same" if they are variants, "initials" if they differ only by one using initials where the
+#   other has names, and "" otherwise.
+def Compare(parsed1: tuple[list[str], str], parsed2: tuple[list[str], str]) -> str:
+    given1, surname1=parsed1
+    given2, surname2=parsed2
+    if surname1 == surname2:
+        if given1 == given2:
+            return "same"
+        if len(given1) == len(given2) and all(g1 == g2 or (len(g1) == 1 and g2.startswith(g1)) or (len(g2) == 1 and g1.startswith(g2)) for g1, g2 in zip(given1, given2)):
+            return "initials"
+    if SequenceMatcher(None, " ".join(given1+[surname1]), " ".join(given2+[surname2])).ratio() >= SimilarityThreshold:
+        return "same"
+    return ""
+
+
+def Initials(parsed: tuple[list[str], str]) -> int:
+    return sum(1 for g in parsed[0] if len(g) == 1)
+
+
+def Find(parent: dict[str, str], name: str) -> str:
+    while parent.get(name, name) != name:
+        name=parent[name]
+    return name
+
+
+def Union(parent: dict[str, str], name1: str, name2: str) -> None:
+    r1, r2=Find(parent, name1), Find(parent, name2)
+    if r1 != r2:
+        parent[r2]=r1
+
+
+def Soundex(word: str) -> str:
+    codes={**dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"), **dict.fromkeys("dt", "3"), "l": "4", **dict.fromkeys("mn", "5"), "r": "6"}
+    word=re.sub(r"[^a-z]", "", word)
+    if word == "":
+        return ""
+    result=word[0]
+    last=codes.get(word[0], "")
+    for c in word[1:]:
+        code=codes.get(c, "")
+        if code != "" and code != last:
+            result+=code
+        if c not in "hw":
+            last=code
+    return (result+"000")[:4]
@@ -1,26 +1,33 @@
-from typing import Callable, Set
 from time import localtime, strftime
 
 import os
 import sys
+import copy
+import glob
 import re
-import math
 import html
-import datetime
-import csv
-import jsonpickle
-from collections import defaultdict
+# Note that the heavier modules (jsonpickle, csv, requests, tkinter, ...) are imported only where they are used,
+#   so that runs which generate reports from the saved fanzine list don't pay to load the GUI or the network stack.
 
 import FanacOrgReaders
-from SharedReaders import FetchFileFromServer
+import FanacStatistics
+import FanacTagIndex
+import DataQuality
+import DuplicateDetector
+import MailingIndex
+from SharedReaders import FetchFileFromServer, ParseCacheSummaryLines
+from LocaleCache import ResolveCountry
 
 from Settings import Settings
-from FanzineIssueSpecPackage import FanzineIssueInfo, FanzineCounts, FanzineDate
-from Log import Log, LogOpen, LogClose, LogFailureAndRaiseIfMissing, LogError
-from HelpersPackage import ReadList, FormatLink, RemoveArticles, UnicodeToHtml2
-from HelpersPackage import RemoveAllHTMLTags2, FlattenPersonsNameForSorting, FlattenTextForSorting
+from ReportRenderer import RenderReports, HTMLTableReport, TxtTableReport, LineReport, WriteHTMLTable
+from ReportRenderer import LoadFragmentCache, SaveFragmentCache
+from ReportOutput import OpenReport, OutputSummaryLines, ResetOutputSummary
+from FanzineIssueSpecPackage import FanzineIssueInfo
+from Log import Log, LogOpen, LogClose, LogError
+from LogLevels import LogNormal
+from HelpersPackage import ReadList, RemoveArticles
+from HelpersPackage import FlattenPersonsNameForSorting, FlattenTextForSorting
 from HelpersPackage import UnscrambleListOfNames, Pluralize
-from FanacFanzinesHelpers import ReadClassicFanzinesTable
 
 
 def main():
@@ -40,37 +47,39 @@ def main():
         os.mkdir(rootDir)
     Log("Root directory '"+rootDir+"' set")
 
-    # Create a Reports directory if needed.
-    reportDir=Settings().Get("Report Directory", "Reports")
-    reportFilePath=str(os.path.join(rootDir, reportDir))
-    if not os.path.isdir(reportFilePath):
-        try:
-            os.mkdir(reportFilePath)
-        except Exception as e:
-            LogError(f"***Fatal Error: Attempt to create directory {reportFilePath} yields exception: {e}")
-            exit(1)
-    if not os.path.isdir(os.path.join(reportFilePath, "Reports by year")):
-        os.mkdir(os.path.join(reportFilePath, "Reports by year"))
-    Log("Report directory '"+reportFilePath+"' created")
+    # In daemon mode the fanzine list is kept in memory and the reports are regenerated whenever the website or the control files change
+    if Settings().Get("Daemon Mode", "") != "":
+        import FanacDaemon
+        FanacDaemon.RunDaemon(rootDir, LoadFanzineList, SaveFanzineList, ReadAllFanacFanzineMainPages, GenerateReports)
+        LogClose()
+        return
 
-    # Get the control list of specific reports to be run
-    # If the list contains only comments, all reports will be run
-    reportsToRun=ReadList(os.path.join(rootDir, "control-OnlyThisReport.txt"))
+    fanacIssueList=LoadFanzineList(rootDir)
+    if fanacIssueList is None:
+        LogClose()
+        return
 
-    bogusEditors=ReadList(os.path.join(rootDir, "control-BogusEditors.txt"))
+    # In query server mode, the list is served as a JSON query API instead of being used to generate reports
+    queryServerPort=int(Settings().Get("Query Server Port", "0"))
+    if queryServerPort != 0:
+        import QueryServer
+        tagIndex=FanacTagIndex.BuildTagIndex(fanacIssueList)
+        tagIndex.AddSeriesList(ReadList(os.path.join(rootDir, "control-newszines.txt"), isFatal=True), "newszine")
+        QueryServer.Serve(fanacIssueList, ReadPeopleCanonicalNames(rootDir), tagIndex, queryServerPort)
+        LogClose()
+        return
 
-    # See if the file 'People Canonical Names.txt' exists.  If it does, read it.
-    peopleCanonicalNames={}
-    filepathname=os.path.join(rootDir, "People Canonical Names.txt") # This file is created by FancyAnalyzer and must be dragged over to FanacAnalyzer's directories
-    if os.path.exists(filepathname):
-        with open(filepathname, "r" ,encoding='utf8') as f:
-            for line in f:
-                loc=line.find("-->")
-                if loc > 0:
-                    n1=line[:loc-1].strip()
-                    n2=line[loc+3:].strip()
-                    peopleCanonicalNames[n1]=n2
+    GenerateReports(rootDir, fanacIssueList)
+
+    Log("FanacAnalyzer has Completed.")
+
+    LogClose()
 
+
+#==================================================================================
+# Get the list of fanzine issues, either from the website, the saved fanzine list, or a merge of shard files.
+# Returns None if there is nothing to report on.  (A sharded crawl just saves its shard file and returns None.)
+def LoadFanzineList(rootDir: str) -> list[FanzineIssueInfo]|None:
     # If the parameter "Use Saved Fanzine List" does not exist or
     #   if it does exist, but no saved fanzine list.json exists, we read a new list of fanzines
     useSavedList=len(Settings().Get("Use Saved Fanzine List", "")) > 0
@@ -80,24 +89,40 @@ def main():
     if savedListExists:
         Log(f"{savedListExists=}")
 
+    # A sharded crawl reads only part of the website and saves it to a shard file for later merging.  No reports are generated.
+    shard=FanacOrgReaders.ParseShardSpec(Settings().Get("Crawl Shard", ""))
+    if shard is not None:
+        k, n=shard
+        shardIssueList=FanacOrgReaders.ReadFanacFanzineIssues(rootDir, ReadAllFanacFanzineMainPages(), shard=shard, useCheckpoint=True)
+        FanacOrgReaders.WriteShardFile(f"Saved Fanzine List shard {k} of {n}.json", shardIssueList)
+        Log(f"Shard {k} of {n} complete", timestamp=True)
+        return None
+
+    # If a merge of shard files is requested, the merged shards replace reading the website
+    mergeShardFiles=Settings().Get("Merge Shard Files", "")
+    if mergeShardFiles != "":
+        shardFiles=glob.glob(mergeShardFiles)
+        if len(shardFiles) == 0:
+            LogError(f"***Fatal Error: No shard files match '{mergeShardFiles}'")
+            exit(1)
+
     # First, determine if we need to read the website.
     # This could because we're not making use of the saved list, or we want to use it, but it does not exist.
-    if useSavedList and savedListExists:
+    if mergeShardFiles != "":
+        fanacIssueList=FanacOrgReaders.MergeShardFiles(shardFiles)
+    elif useSavedList and savedListExists:
         Log("Loading the saved fanzine list", timestamp=True)
+        import jsonpickle
         with open("Saved Fanzine List.json", "r") as f:
             fanacIssueList=jsonpickle.decode(f.read())
             Log("Loading complete", timestamp=True)
     else:
         # Read the fanac.org fanzine index page structures and produce a list of all fanzine series directories
-        fanacIssueList=FanacOrgReaders.ReadFanacFanzineIssues(rootDir, ReadAllFanacFanzineMainPages())
+        fanacIssueList=FanacOrgReaders.ReadFanacFanzineIssues(rootDir, ReadAllFanacFanzineMainPages(), useCheckpoint=True)
         Log("Load of Fanzine list from website complete", timestamp=True)
         if useSavedList:
             # We need to save the fanzine list
-            Log("Saving the fanzine list", timestamp=True)
-            with open("Saved Fanzine List.json", "w+") as f:
-                dump=jsonpickle.encode(fanacIssueList, indent=2)
-                f.write(dump)
-                Log("Saving complete", timestamp=True)
+            SaveFanzineList(fanacIssueList)
 
 
     # Remove issues which have entries, but don't actually point to anything.
@@ -105,7 +130,85 @@ def main():
     fanacIssueList=[x for x in fanacIssueList if x.PageFilename != ""]
     if len(fanacIssueList) == 0:
         Log("Exiting: No fanzines found")
-        return
+        return None
+
+    return fanacIssueList
+
+
+def SaveFanzineList(fanacIssueList: list[FanzineIssueInfo]) -> None:
+    Log("Saving the fanzine list", timestamp=True)
+    import jsonpickle
+    with open("Saved Fanzine List.json", "w+") as f:
+        dump=jsonpickle.encode(fanacIssueList, indent=2)
+        f.write(dump)
+        Log("Saving complete", timestamp=True)
+
+
+#==================================================================================
+# See if the file 'People Canonical Names.txt' exists.  If it does, read it.
+# It is a dictionary of name --> canonical name
+def ReadPeopleCanonicalNames(rootDir: str) -> dict[str, str]:
+    peopleCanonicalNames={}
+    filepathname=os.path.join(rootDir, "People Canonical Names.txt") # This file is created by FancyAnalyzer and must be dragged over to FanacAnalyzer's directories
+    if os.path.exists(filepathname):
+        with open(filepathname, "r" ,encoding='utf8') as f:
+            for line in f:
+                loc=line.find("-->")
+                if loc > 0:
+                    n1=line[:loc-1].strip()
+                    n2=line[loc+3:].strip()
+                    peopleCanonicalNames[n1]=n2
+    return peopleCanonicalNames
+
+
+#==================================================================================
+# Make copies of the issues which can be changed freely.  The copies share the (unchanged) series info and issue specs with the originals.
+def WorkingCopy(fanacIssueList: list[FanzineIssueInfo]) -> list[FanzineIssueInfo]:
+    copies: list[FanzineIssueInfo]=[]
+    for fz in fanacIssueList:
+        fz2=copy.copy(fz)
+        fz2.Mailings=list(fz.Mailings)
+        fz2.Taglist=list(fz.Taglist)
+        copies.append(fz2)
+    return copies
+
+
+#==================================================================================
+# Generate all the reports from the list of fanzine issues.
+# The control files are read here (rather than in main()) so that a long-running process picks up any changes to them each time it regenerates the reports.
+def GenerateReports(rootDir: str, fanacIssueList: list[FanzineIssueInfo]) -> None:
+    ResetOutputSummary()
+
+    # The report generation changes the issues (canonicalizing editors, filling in page counts, merging duplicates...), so it works on copies
+    #   and the caller's list stays as it was read.  (In daemon mode that list is kept, saved, and used again for the next round of reports.)
+    fanacIssueList=WorkingCopy(fanacIssueList)
+
+    # Create a Reports directory if needed.
+    reportDir=Settings().Get("Report Directory", "Reports")
+    reportFilePath=str(os.path.join(rootDir, reportDir))
+    if not os.path.isdir(reportFilePath):
+        try:
+            os.mkdir(reportFilePath)
+        except Exception as e:
+            LogError(f"***Fatal Error: Attempt to create directory {reportFilePath} yields exception: {e}")
+            exit(1)
+    if not os.path.isdir(os.path.join(reportFilePath, "Reports by year")):
+        os.mkdir(os.path.join(reportFilePath, "Reports by year"))
+    Log("Report directory '"+reportFilePath+"' created")
+
+    # Deal with issues listed under more than one series (see DuplicateDetector.py)
+    fanacIssueList=DuplicateDetector.ApplyDuplicatePolicy(fanacIssueList, reportFilePath)
+
+    # Get the control list of specific reports to be run
+    # If the list contains only comments, all reports will be run
+    reportsToRun=ReadList(os.path.join(rootDir, "control-OnlyThisReport.txt"))
+
+    bogusEditors=ReadList(os.path.join(rootDir, "control-BogusEditors.txt"))
+
+    peopleCanonicalNames=ReadPeopleCanonicalNames(rootDir)
+    if Settings().Get("Propose Canonical Names", "") != "":
+        import EditorClustering
+        EditorClustering.ProposeCanonicalNames(fanacIssueList, peopleCanonicalNames, reportFilePath)
 
     # Sort the list of all fanzines issues by fanzine series name
     fanacIssueList.sort(key=lambda elem: RemoveArticles(elem.SeriesName.casefold()))  # Sorts in place on fanzine name
@@ -115,19 +218,35 @@ def main():
             return ""
         return s
 
-    # Create a dictionary with an entry for every year that turns up in the list of all fanzines
-    # The value is a tuple of all the information we need to write a line for that fanzines in the report
-    years: defaultdict[int, list[tuple[str, FanzineDate, str, str]]]=defaultdict(list)
-    for fz in fanacIssueList:
-        # For each fanzine issue, append a tuple describing it to the correct year
-        years[fz.FIS.FD.Year].append((fz.IssueName, fz.FIS.FD, fz.DirURL, fz.PageFilename))
+    # Build the index of series tags (newszine, apazine, collection, ...)
+    # This starts with the fanzine types and tags found on the series index pages
+    tagIndex=FanacTagIndex.BuildTagIndex(fanacIssueList)
+    with OpenReport(os.path.join(reportFilePath, "Items identified as newszines one way or another.txt"), "w+") as f:
+        for nz in sorted(tagIndex.SeriesWithTag("newszine")):
+            f.write(nz+"\n")
+
+    # And then adds the names from the file control-newszines.txt
+    tagIndex.AddSeriesList(ReadList(os.path.join(rootDir, "control-newszines.txt"), isFatal=True), "newszine")
+    isNewszine=lambda fz: tagIndex.HasTag(fz, "newszine")
+
+    # Read the page counts of PDFs which don't have one, so that they are included in the statistics
+    if Settings().Get("Fill In PDF Page Counts", "") != "":
+        import PdfPageCounts
+        PdfPageCounts.FillInPdfPageCounts(fanacIssueList, rootDir)
+
+    # Compute all the counts and statistics in a single pass.  All the count text in the reports comes from this.
+    stats=FanacStatistics.ComputeStatistics(fanacIssueList, isNewszine)
+
+    # Run all the data-quality checks in a single sweep.  The odd names and odd page counts reports below are selected from the findings.
+    quality=DataQuality.CheckDataQuality(fanacIssueList, rootDir, reportFilePath)
 
     # Generate a year report for every year that has a fanzine.
+    years=stats.Years
     for year in years.keys():
         # Sort the year into date order
         years[year].sort(key=lambda x: x[1])
         # Write the year's report
-        with open(os.path.join(os.path.join(reportFilePath, "Reports by year"), f"{year} fanac.org Fanzines.txt"), "w+", encoding="utf-8") as f:
+        with OpenReport(os.path.join(os.path.join(reportFilePath, "Reports by year"), f"{year} fanac.org Fanzines.txt"), "w+", encoding="utf-8") as f:
             for sel in years[year]:
                 try:
                     f.write(f"{sel[0]} || {NoNone(str(sel[1]))} || {sel[2]} || {sel[3]}\n")
@@ -135,56 +254,29 @@ def main():
                     LogError(f"UnicodeEncodeError {e} in: {sel}")
                     LogError("   ...skipped")
 
+    Log("Write the counts diagnostics file", timestamp=True)
+    FanacStatistics.WriteCountsDiagnostics(os.path.join(reportFilePath, "Counts diagnostics.txt"), stats)
 
-    # Count the number of pages, issues and PDFs
-    Log("Perform the general count", timestamp=True)
-    ignorePageCountErrors=ReadList(os.path.join(rootDir, "control-Ignore Page Count Errors.txt"))
-    countsGlobal=FanzineCounts()
-    for fzi in fanacIssueList:
-        if fzi.DirURL != "":
-            countsGlobal+=fzi.Pagecount
-            if os.path.splitext(fzi.PageFilename)[1].lower() == ".pdf":
-                countsGlobal.Pdfcount+=1
-                countsGlobal.Pdfpagecount+=fzi.Pagecount
-            if fzi.Pagecount == 0 and len(ignorePageCountErrors)> 0 and fzi.SeriesName not in ignorePageCountErrors:
-                Log(f"{fzi.IssueName} has no page count: {fzi}")
-
-    # Re-run the previous producing a counts diagnostic file
-    Log("Count again with a counts diagnostics file", timestamp=True)
-    with open(os.path.join(reportFilePath, "Counts diagnostics.txt"), "w") as f:
-        countsSeries=FanzineCounts()
-        lines: list[str]=[]  # We want to print everything about this series once we have completed going through the series
-        oldseries=fanacIssueList[0].SeriesName
-        for fzi in fanacIssueList:
+    # Export the catalogue to a database for analysis by other tools.  (This must precede the reports, since some of them modify the issues' editors.)
+    catalogDatabase=Settings().Get("Catalog Database", "")
+    if catalogDatabase != "":
+        import CatalogExport
+        CatalogExport.ExportCatalogToSQLite(os.path.join(rootDir, catalogDatabase), fanacIssueList, tagIndex)
+
+    # The search index for the static search page
+    if Settings().Get("Build Search Index", "") != "":
+        import SearchIndex
+        SearchIndex.BuildSearchIndex(fanacIssueList, reportFilePath)
 
-            if fzi.SeriesName != oldseries: # and len(lines) > 0:
-                # Dump what we know about the old series
-                print(f"{oldseries}      {countsSeries.Issuecount} issues   {countsSeries.Pagecount} pages  ", file=f)
-                for line in lines:
-                    print(line, file=f)
-                lines: list[str]=[]
-                countsSeries=FanzineCounts()
-            oldseries=fzi.SeriesName # Safe to do because any changes if fz.SeriesName was just handled
-
-            if fzi.DirURL != "":
-                countsSeries+=fzi.Pagecount
-                if os.path.splitext(fzi.PageFilename)[1].lower() == ".pdf":
-                    countsSeries.Pdfcount+=1
-                    countsSeries.Pdfpagecount+=fzi.Pagecount
-                lines.append(f"      {fzi.Pagecount:<4} {fzi.IssueName}")
-            else:
-                lines.append(f"Skipped for empty DirURL: {fzi.SeriesName}/{fzi.IssueName}")
-
-        if len(lines) > 0:
-            # Dump what we know about the old series
-            print(f"{oldseries}  {countsSeries.Issuecount} issues   {countsSeries.Pagecount} pages  ", file=f)
-            for line in lines:
-                print(line, file=f)
+    # Check that all the issue and series links actually work
+    if Settings().Get("Check Links", "") != "":
+        import LinkChecker
+        LinkChecker.CheckLinks(fanacIssueList, reportFilePath, rootDir)
 
     # Produce a report on the non-PDFed fanzines
     Log("Generate report on non-PDFed fanzines", timestamp=True)
     fanacIssueList.sort(key=lambda elem: elem.DirURL)
-    with open(os.path.join(reportFilePath, "Fanzines which are not PDFs.txt"), "w") as f:
+    with OpenReport(os.path.join(reportFilePath, "Fanzines which are not PDFs.txt"), "w") as f:
         for fzi in fanacIssueList:
             if not ".pdf" in fzi.URL.lower():
                 print(f"{fzi.DirURL}/{fzi.IssueName}", file=f)
@@ -200,22 +292,44 @@ def main():
     fanacIssueList.sort(key=lambda elem: elem.FIS.FormatYearMonthDayForSorting())
 
     timestamp="Indexed as of "+strftime("%Y-%m-%d %H:%M:%S", localtime())+" EST"
-    topcounttext=f"{countsGlobal.Issuecount:,} issues consisting of {countsGlobal.Pagecount:,} pages."
+    topcounttext=stats.TopCountText()
+
+    # If the parameter "Fragment Cache" names a file, rendered group boxes are reused from the previous run when their contents have not changed.
+    # It's off by default: the cache keys cover the report functions' code but not the helpers they call (e.g., FormatLink) or the values
+    #   they capture, so after changing those the cache file must be deleted.
+    fragmentCache=Settings().Get("Fragment Cache", "")
+    if fragmentCache != "":
+        LoadFragmentCache(os.path.join(rootDir, fragmentCache))
+
+    # Returns True if the report is to be generated.  (If control-OnlyThisReport.txt lists no reports, all reports are generated.)
+    def Wanted(report: str) -> bool:
+        return len(reportsToRun) == 0 or report in reportsToRun
+
+    # Make up a lists of newszines and non-newszines
+    newszinesSet=tagIndex.SeriesWithTag("newszine")
+    with OpenReport(os.path.join(reportFilePath, "Items identified as non-newszines.txt"), "w+") as f:
+        nonNewszines=sorted(list(tagIndex.AllSeries().difference(newszinesSet)))
+        for nnz in nonNewszines:
+            f.write(nnz+"\n")
+
+    newszines=[x+"\n" for x in sorted(list(newszinesSet))]
+    with OpenReport(os.path.join(reportFilePath, "Items identified as newszines (Should I drop this).txt"), "w+") as f:
+        f.writelines(newszines)
+
+    # All the reports in date order are generated from a single pass through fanacIssueList
+    reports: list=[]
 
     # List of dated issues
-    Log("Begin Report: 'Fanzines in date order.txt'", timestamp=True)
-    with open(os.path.join(reportFilePath, "Fanzines in date order.txt"), "w") as f:
-        for fzi in fanacIssueList:
-            f.write(f"{fzi.FIS.DateStr} -- {fzi} {fzi.Pagecount}pp   {fzi.FanzineType}   {fzi.Series.Keywords}\n")
+    reports.append(LineReport(os.path.join(reportFilePath, "Fanzines in date order.txt"),
+                              lambda fzi: f"{fzi.FIS.DateStr} -- {fzi} {fzi.Pagecount}pp   {fzi.FanzineType}   {fzi.Series.Keywords}"))
 
-    datedList=[f for f in fanacIssueList if not f.FIS.IsEmpty()]
+    isDated=lambda fz: not fz.FIS.IsEmpty()
 
     # Note that because things are sorted by date, for a given month+year, things with no day sort before things with a day
     report="Chronological_Listing_of_Fanzines.html"
-    if len(reportsToRun) == 0 or report in reportsToRun:
-        Log(f"Begin Report: '{report}'", timestamp=True)
-        WriteHTMLTable(os.path.join(reportFilePath, report),
-                       datedList,
+    if Wanted(report):
+        reports.append(HTMLTableReport(os.path.join(reportFilePath, report),
+                       fSelector=isDated,
                        fButtonText=lambda fz: ChronButtonText(fz),
                        #
                        fGroupText=lambda fz: fz.FIS.MonthYear,
@@ -226,112 +340,56 @@ def main():
                        #
                        topCountText=topcounttext+"\n"+timestamp+"\n",
                        #
-                       reportFilename='control-Header (Fanzine, chronological).html')
-        Log(f"Complete: {report}", timestamp=True)
+                       reportFilename='control-Header (Fanzine, chronological).html'))
 
     report="Chronological Listing of Fanzines.txt"
-    if len(reportsToRun) == 0 or report in reportsToRun:
-        Log(f"Begin Report: '{report}'", timestamp=True)
-        WriteTxtTable(os.path.join(reportFilePath, report),
-                      datedList,
+    if Wanted(report):
+        reports.append(TxtTableReport(os.path.join(reportFilePath, report),
+                      fSelector=isDated,
                       fRowText=lambda fz: fz.IssueName,
                       fGroupText=lambda fz: fz.FIS.MonthYear,
-                      topCountText=topcounttext+"\n"+timestamp+"\n")
-        Log(f"Complete: {report}", timestamp=True)
+                      topCountText=topcounttext+"\n"+timestamp+"\n"))
 
     # List of undated issues
     report="Undated Fanzine Issues.html"
-    if len(reportsToRun) == 0 or report in reportsToRun:
-        Log(f"Begin Report: '{report}'", timestamp=True)
-        undatedList=[f for f in fanacIssueList if f.FIS.IsEmpty()]
-        WriteHTMLTable(os.path.join(reportFilePath, report),
-                       undatedList,
+    if Wanted(report):
+        reports.append(HTMLTableReport(os.path.join(reportFilePath, report),
+                       fSelector=lambda fz: fz.FIS.IsEmpty(),
                        fRowText=lambda fz: fz.IssueName,
                        fGroupText=lambda fz: "fGroupText fake lambda",
                        topCountText=timestamp,
-                       reportFilename="control-Header (basic).html")
-
-        Log(f"Complete: {report}", timestamp=True)
-
-
-    # Generate a list of all the newszines (in lower case)
-    # This takes names from the file control-newszines.txt and adds fanzines tagged as newszines on their series index page
-
-    # Read the control-newszines.txt file
-    newszinesSet=set([x.casefold() for x in ReadList(os.path.join(rootDir, "control-newszines.txt"), isFatal=True)])
-
-    # Add in the newszines discovered in the <h2> blocks
-    newszinesFromH2Set=set([fii.SeriesName.casefold() for fii in fanacIssueList if "newszine" in fii.Taglist or fii.FanzineType.lower() == "newszine"])
-    with open(os.path.join(reportFilePath, "Items identified as newszines one way or another.txt"), "w+") as f:
-        newszinesFromH2List=sorted(list(newszinesFromH2Set))
-        for nz in newszinesFromH2List:
-            f.write(nz+"\n")
-
-    newszinesSet=newszinesSet.union(newszinesFromH2Set)
-
-    # Make up a lists of newszines and non-newszines
-    allzinesSet=set([fx.SeriesName.casefold() for fx in fanacIssueList])
+                       reportFilename="control-Header (basic).html"))
 
-    with open(os.path.join(reportFilePath, "Items identified as non-newszines.txt"), "w+") as f:
-        nonNewszines=sorted(list(allzinesSet.difference(newszinesSet)))
-        for nnz in nonNewszines:
-            f.write(nnz+"\n")
-
-    listOfNewszines=sorted(list(newszinesSet))
-    for fz in fanacIssueList:
-        if fz.SeriesName.casefold() in listOfNewszines:
-            fz.FanzineType="newszine"
-
-    # Count the number of issue and pages of all fanzines and of just newszines
-    newsCount=FanzineCounts()
-    for fz in fanacIssueList:
-        if fz.FanzineType == "newszine" and fz.PageFilename != "":
-            newsCount+=fz
-            if os.path.splitext(fz.PageFilename)[1].lower() == ".pdf":
-                newsCount.Pdfcount+=1
-
-    newszines=[x+"\n" for x in listOfNewszines]
-    with open(os.path.join(reportFilePath, "Items identified as newszines (Should I drop this).txt"), "w+") as f:
-        f.writelines(newszines)
-
-
-    # List of dated issues
-    with open(os.path.join(reportFilePath, "Newszines in date order.txt"), "w") as f:
-        for fzi in fanacIssueList:
-            if fzi.FanzineType.lower() == "newszine":
-                f.write(f"{fzi.FIS.DateStr} -- {fzi} {fzi.Pagecount}pp   {fzi.FanzineType}   {fzi.Series.Keywords}\n")
+    # List of dated newszines
+    reports.append(LineReport(os.path.join(reportFilePath, "Newszines in date order.txt"),
+                              lambda fzi: f"{fzi.FIS.DateStr} -- {fzi} {fzi.Pagecount}pp   {tagIndex.FanzineType(fzi)}   {fzi.Series.Keywords}",
+                              fSelector=isNewszine))
 
     report="Chronological_Listing_of_Newszines.html"
-    if len(reportsToRun) == 0 or report in reportsToRun:
-        Log(f"Begin Report: '{report}'", timestamp=True)
-        newscountText=f"{newsCount.Issuecount:,} issues consisting of {newsCount.Pagecount:,} pages."
-        WriteHTMLTable(os.path.join(reportFilePath, report),
-                       fanacIssueList,
-                       fSelector=lambda fz: fz.FanzineType.lower() == "newszine",
+    if Wanted(report):
+        newscountText=stats.NewszineCountText()
+        reports.append(HTMLTableReport(os.path.join(reportFilePath, report),
+                       fSelector=isNewszine,
                        fGroupText=lambda fz: fz.FIS.MonthYear,
                        fButtonText=lambda fz: ChronButtonText(fz),
                        fRowText=lambda fz: fz.IssueName,
                        fRowAnnot=lambda fz: f"ed. {fz.Editor}&nbsp;&nbsp;&nbsp;{Pluralize(fz.Pagecount, 'page')}",
                        topCountText=newscountText+"\n"+timestamp+"\n",
-                       reportFilename="control-Header (Newszine).html")
-        Log(f"Complete: {report}", timestamp=True)
+                       reportFilename="control-Header (Newszine).html"))
 
     report="Chronological Listing of Newszines.txt"
-    if len(reportsToRun) == 0 or report in reportsToRun:
-        Log(f"Begin Report: '{report}'", timestamp=True)
-        WriteTxtTable(os.path.join(reportFilePath, report),
-                      datedList,
-                      fSelector=lambda fz: fz.FanzineType.lower() == "newszine",
+    if Wanted(report):
+        reports.append(TxtTableReport(os.path.join(reportFilePath, report),
+                      fSelector=lambda fz: isDated(fz) and isNewszine(fz),
                       fRowText=lambda fz: fz.IssueName,
                       fGroupText=lambda fz: fz.FIS.MonthYear,
-                      topCountText=topcounttext+"\n"+timestamp+"\n")
+                      topCountText=topcounttext+"\n"+timestamp+"\n"))
 
-        Log(f"Complete: {report}", timestamp=True)
+    RenderReports(fanacIssueList, reports)
 
     #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
     #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
     # Generate Alphabetic lists by Fanzine title
-    topcounttext=f"{countsGlobal.Issuecount:,} issues consisting of {countsGlobal.Pagecount:,} pages."
 
     # Generate lists by title
     # For this pair of reports, we need to create a modified fanacIssueList, duplicating entries for all issues with multiple titles
@@ -355,21 +413,19 @@ def main():
     SortFanacIssueListByTitle(fanacIssueListByTitle)
     SortFanacIssueListByTitle(fanacIssueList)
 
+    # The reports in alphabetical order are generated from a single pass through fanacIssueList
+    reports=[]
+
     report="Alphabetical Listing of Fanzines.txt"
-    if len(reportsToRun) == 0 or report in reportsToRun:
-        Log(f"Begin Report: '{report}'", timestamp=True)
-        WriteTxtTable(os.path.join(reportFilePath, report),
-                      fanacIssueList,
+    if Wanted(report):
+        reports.append(TxtTableReport(os.path.join(reportFilePath, report),
                       fRowText=lambda fz: fz.IssueName,
                       fGroupText=lambda fz: fz.SeriesName,
-                      topCountText=topcounttext+"\n"+timestamp+"\n")
-        Log(f"Complete: {report}", timestamp=True)
+                      topCountText=topcounttext+"\n"+timestamp+"\n"))
 
     report="Alphabetical_Listing_of_Fanzines.html" #qwert
-    if len(reportsToRun) == 0 or report in reportsToRun:
-        Log(f"Begin Report: '{report}'", timestamp=True)
-        WriteHTMLTable(os.path.join(reportFilePath, report),
-                       fanacIssueList,
+    if Wanted(report):
+        reports.append(HTMLTableReport(os.path.join(reportFilePath, report),
                        fGroupURL=lambda fz: fz.Series.URL,
                        fButtonText=lambda fz: AlphaButtonText(fz),
                        fGroupText=lambda fz: fz.SeriesName,
@@ -379,10 +435,29 @@ def main():
                        fRowAnnot=lambda fz: AnnotateDate(fz),
                        topCountText=topcounttext+"\n"+timestamp+"\n",
                        reportFilename="control-Header (Fanzine, alphabetical).html",
-                       inAlphaOrder=True)
+                       inAlphaOrder=True))
+
+    #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+    #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
+    # Debug: Generate lists of fanzines with odd names and odd page counts.  These should be checked for errors.
+    # (See the rules in DataQuality.py.)
+    report="Fanzines with odd names.txt"
+    if Wanted(report):
+        reports.append(TxtTableReport(os.path.join(reportFilePath, report),
+                      fRowText=lambda fz: fz.IssueName,
+                      fGroupText=lambda fz: fz.SeriesName,
+                      topCountText=timestamp+"\n",
+                      fSelector=lambda fz: quality.Has(fz, "Odd name")))
 
-        Log(f"Complete: {report}", timestamp=True)
+    report="Fanzines with odd page counts.txt"
+    if Wanted(report):
+        reports.append(TxtTableReport(os.path.join(reportFilePath, report),
+                      fRowText=lambda fz: fz.IssueName,
+                      fGroupText=lambda fz: fz.SeriesName,
+                      topCountText=timestamp,
+                      fSelector=lambda fz: quality.Has(fz, "Odd page count")))
 
+    RenderReports(fanacIssueList, reports)
 
     #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
     #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
@@ -392,19 +467,20 @@ def main():
 
     # Create a properly ordered flat list suitable for WriteTable
     bodyRowGroupBy=lambda elem: FlattenTextForSorting(elem.Series.SeriesName.strip())
+    # Each issue's locale is resolved once here and then shared by the sort and the report's button and group text
+    countryOf={id(fz): ResolveCountry(fz.Locale.CountryName) for fz in fanacIssueList}
     fanacIssueList.sort(key=bodyRowGroupBy)   # Sort by series name
-    fanacIssueList.sort(key=lambda elem: elem.Locale.CountryName.lower())      # Sort by country
+    fanacIssueList.sort(key=lambda elem: countryOf[id(elem)].SortKey)      # Sort by country
 
 
     report="Series_by_Country.html"
-    if len(reportsToRun) == 0 or report in reportsToRun:
-        Log(f"Begin Report: '{report}'", timestamp=True)
+    if Wanted(report):
         WriteHTMLTable(os.path.join(reportFilePath, report),
                        fanacIssueList,
                        fBodyURL=lambda elem: elem.Series.DirURL,
-                       fButtonText=lambda elem: CapIt(elem.Locale.CountryName),
+                       fButtonText=lambda elem: countryOf[id(elem)].DisplayName,
                        #
-                       fGroupText=lambda elem: CapIt(elem.Locale.CountryName),
+                       fGroupText=lambda elem: countryOf[id(elem)].DisplayName,
                        includeRowHeaderCounts=True,
                        #
                        fRowText=lambda elem: elem.Series.SeriesName,
@@ -415,8 +491,6 @@ def main():
                        reportFilename="control-Header (Fanzine, by country).html",
                        inAlphaOrder=True)
 
-        Log(f"Complete: {report}", timestamp=True)
-
     #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
     #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
     # Generate lists by editor
@@ -452,11 +526,11 @@ def main():
     # Remove those editors we have skipped in control-BogusEditors.txt
     fanacIssueListByEditor=[fz for fz in fanacIssueListByEditor if fz.Editor.strip() not in bogusEditors ]
 
+    # The two alphabetical by-editor reports are generated from a single pass through fanacIssueListByEditor
+    reports=[]
     report="Alphabetical_Listing_of_Fanzines_by_Editor.html"
-    if len(reportsToRun) == 0 or report in reportsToRun:
-        Log(f"Begin Report: '{report}'", timestamp=True)
-        WriteHTMLTable(os.path.join(reportFilePath, report),
-                       fanacIssueListByEditor,
+    if Wanted(report):
+        reports.append(HTMLTableReport(os.path.join(reportFilePath, report),
                        fButtonText=lambda fz: FlattenPersonsNameForSorting(fz.Editor)[0].upper(),
                        #
                        fGroupText=lambda fz: fz.Editor,
@@ -469,14 +543,11 @@ def main():
                        #
                        topCountText=topcounttext+"\n"+timestamp+"\n",
                        reportFilename="control-Header (Fanzine, by editor).html",
-                       inAlphaOrder=True)
-        Log(f"Complete: {report}", timestamp=True)
+                       inAlphaOrder=True))
 
     report="Alphabetical_Listing_of_Fanzine_Series_by_Editor.html"
-    if len(reportsToRun) == 0 or report in reportsToRun:
-        Log(f"Begin Report: '{report}'", timestamp=True)
-        WriteHTMLTable(os.path.join(reportFilePath, report),
-                       fanacIssueListByEditor,
+    if Wanted(report):
+        reports.append(HTMLTableReport(os.path.join(reportFilePath, report),
                        fBodyURL=lambda fz: fz.Series.DirURL,
                        fButtonText=lambda fz: FlattenPersonsNameForSorting(fz.Editor)[0].upper(),
                        #
@@ -491,16 +562,16 @@ def main():
                        #
                        topCountText=topcounttext+"\n"+timestamp+"\n",
                        reportFilename="control-Header (Fanzine, by editor).html",
-                       inAlphaOrder=True)
-        Log(f"Complete: {report}", timestamp=True)
+                       inAlphaOrder=True))
+
+    RenderReports(fanacIssueListByEditor, reports)
 
     # Sort the Alphabetic lists by Editor, but with fanzines in date order
     fanacIssueListByEditor.sort(key=lambda elem: elem.FIS.FormatYearMonthForSorting())
     fanacIssueListByEditor.sort(key=lambda elem: FlattenPersonsNameForSorting(elem.Editor))  # Sorts by editor
 
     report="Chronological_Listing_of_Fanzines_by_Editor.html"
-    if len(reportsToRun) == 0 or report in reportsToRun:
-        Log(f"Begin Report: '{report}'", timestamp=True)
+    if Wanted(report):
         WriteHTMLTable(os.path.join(reportFilePath, report),
                        fanacIssueListByEditor,
                        fButtonText=lambda fz: FlattenPersonsNameForSorting(fz.Editor)[0].upper(),
@@ -515,133 +586,35 @@ def main():
                        topCountText=topcounttext+"\n"+timestamp+"\n",
                        reportFilename="control-Header (Fanzine, by editor).html",
                        inAlphaOrder=True)
-        Log(f"Complete: {report}", timestamp=True)
-
-    #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
-    #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
-    # Debug: Generate lists of fanzines with odd names.  These should be checked for errors.
-    # Note that we're being real simple and picky here!
-
-    # Read through the alphabetic list and generate a flag file of cases where the issue name doesn't match the serial name
-    # This function is used only in the lambda expression following immediately afterwards.
-    def OddNames(n1: str, n2: str) -> bool:
-        n1=RemoveArticles(n1).casefold().strip()
-        n2=RemoveArticles(n2).casefold().strip()
-        # We'd like them to match to the length of the shorter name
-        length=min(len(n1), len(n2))
-        return n1[:length] != n2[:length]
-
-    report="Fanzines with odd names.txt"
-    if len(reportsToRun) == 0 or report in reportsToRun:
-        Log(f"Begin Report: '{report}'", timestamp=True)
-        WriteTxtTable(os.path.join(reportFilePath, report),
-                      fanacIssueList,
-                      fRowText=lambda fz: fz.IssueName,
-                      fGroupText=lambda fz: fz.SeriesName,
-                      topCountText=timestamp+"\n",
-                      fSelector=lambda fx: OddNames(fx.IssueName, fx.SeriesName))
-        Log(f"Complete: {report}", timestamp=True)
-
 
     #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
     #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
     # More general stuff: statistics and the like
-    # Count the number of distinct fanzine names (not issue names, but names of runs of fanzines.)
-    # Create a set of all fanzines run names (the set to eliminate suploicates) and then get its size.
-    fzCount=len(set([fz.SeriesName.casefold() for fz in fanacIssueList]))
-    nzCount=len(set([fz.SeriesName.casefold() for fz in fanacIssueList if fz.FanzineType == "newszine"]))
-
     # Print to the console and also the statistics file
     Log("\n")
-    Log(f"All fanzines: Titles: {fzCount:,}  Issues: {countsGlobal.Issuecount:,}  Pages: {countsGlobal.Pagecount:,}  PDFs: {countsGlobal.Pdfcount:,}")
-    Log(f"Newszines:  Titles: {nzCount:,}  Issues: {newsCount.Issuecount:,}  Pages: {newsCount.Pagecount:,}  PDFs: {newsCount.Pdfcount:,}")
-    Log(f"All PDF fanzines: Issues: {countsGlobal.Pdfcount:,}   Pages: {countsGlobal.Pdfpagecount:,}")
-    # for selectedYear in selectedYears:
-    #     Log(f"{selectedYear[0]} Fanzines: {selectedYear[1]}")
-
-    with open(os.path.join(reportFilePath, "Statistics.txt"), "w+") as f:
-        print(timestamp)
-        print(f"All fanzines: Titles: {fzCount:,}  Issues: {countsGlobal.Issuecount:,}  Pages: {countsGlobal.Pagecount:,}  PDFs: {countsGlobal.Pdfcount:,}", file=f)
-        print(f"Newszines:  Titles: {nzCount:,}  Issues: {newsCount.Issuecount:,}  Pages: {newsCount.Pagecount:,}  PDFs: {newsCount.Pdfcount:,}", file=f)
-        print(f"All PDF fanzines: Issues: {countsGlobal.Pdfcount:,}   Pages: {countsGlobal.Pdfpagecount:,}", file=f)
-        yearcounts: list[tuple[int, int]]=[]
-        for year, val in years.items():
-            if year is None:
-                year=0
-            yearcounts.append((year, len(val)))
-        yearcounts.sort(key=lambda x: x[0])
-        for year, count in yearcounts:
-            print(f"{year} Fanzines: {count}", file=f)
-
-    report="Fanzines with odd page counts.txt"
-    if len(reportsToRun) == 0 or report in reportsToRun:
-        Log(f"Begin Report: '{report}'", timestamp=True)
-        WriteTxtTable(os.path.join(reportFilePath, report),
-                      fanacIssueList,
-                      fRowText=lambda fz: fz.IssueName,
-                      fGroupText=lambda fz: fz.SeriesName,
-                      topCountText=timestamp,
-                      fSelector=lambda fz: fz.Pagecount > 250)
-
-        Log("Reports complete.", timestamp=True)
+    for line in stats.SummaryLines():
+        Log(line)
+    for line in ParseCacheSummaryLines():
+        Log(line)
+    FanacStatistics.WriteStatistics(os.path.join(reportFilePath, "Statistics.txt"), stats, timestamp)
+    SaveFragmentCache()
+    Log("Reports complete.", timestamp=True)
 
     #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
     #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
-    # Compute counts of issues and series by decade.
-    # We get the issue numbers by simply going through the list and adding one to the appropriate decade.
-    # For series, we create a set of series found for that decade
-
-    # issueDecadeCount and seriesDecadeCount are  dictionaries keyed by decade: 190, 191, ...199, 200...
-    # For issueDecadeCount, the value is a count for that decade
-    # For seriesDecadeCount, the value is a set of series names which we will count in the end.
-    issueDecadeCount: dict[int, int]={}
-    seriesDecadeCount: dict[int, Set[str]]={}
-    for issue in fanacIssueList:
-        year=0
-        if issue.FIS is not None and issue.FIS.Year is not None:
-            year=issue.FIS.Year
-        decade=math.floor(year/10)
-
-        issueDecadeCount.setdefault(decade, 0)
-        seriesDecadeCount.setdefault(decade, set())
-
-        issueDecadeCount[decade]+=1
-        seriesDecadeCount[decade].add(issue.SeriesName)
-
-    # Print the report
-    with open(os.path.join(reportFilePath, "Decade counts.txt"), "w+") as f:
-        f.write(str(datetime.date.today())+"\n")
-        f.write("Counts of fanzines and fanzine series by decade\n\n")
-        f.write(" Decade  Series  Issues\n")
-        decades=sorted([x for x in issueDecadeCount.keys()])
-        for decade in decades:
-            counts=f"{len(seriesDecadeCount[decade]):5}   {issueDecadeCount[decade]:5}"
-            if decade == 0:
-                print(f"undated   {counts}", file=f)
-            else:
-                print(f"  {decade:3}0s   {counts}", file=f)
+    # Write the counts of issues and series by decade.
+    FanacStatistics.WriteDecadeCounts(os.path.join(reportFilePath, "Decade counts.txt"), stats)
 
     #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
     #-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
     # Generate lists of mailings
     # Files are created in reports/APAs
     mailingsCSVFile=Settings().Get("mailings csv file", "mailings.csv")
+    MailingIndex.WriteMailingReports(MailingIndex.BuildMailingIndex(fanacIssueList), reportFilePath, os.path.join(rootDir, mailingsCSVFile))
 
-    with open(os.path.join(rootDir, mailingsCSVFile), 'w', newline="", encoding="utf-8") as csvfile:
-        filewriter=csv.writer(csvfile, delimiter=',', quotechar='"', escapechar=r'£', quoting=csv.QUOTE_MINIMAL)
-
-        columnheaders=["IssueName", "Series", "SeriesName", "DisplayName", "DirURL", "PageName", "FIS", "Locale", "PageCount", "Editor", "TagList", "Mailings"]
-        filewriter.writerow(columnheaders)
-
-        for issue in fanacIssueList:
-            # Select only issues which have an entry in the mailings column
-            if len(issue.Mailings) > 0:
-                for mailing in issue.Mailings:
-                    filewriter.writerow([issue.IssueName, issue.Series, issue.SeriesName, issue.DisplayName, issue.DirURL, issue.PageFilename, issue.FIS, issue.Locale, issue.Pagecount, issue.Editor, issue.Taglist, mailing])
-
-    Log("FanacAnalyzer has Completed.")
-
-    LogClose()
+    # Report files whose contents have not changed are not rewritten
+    for line in OutputSummaryLines():
+        Log(line)
 
 
 def SortFanacIssueListByTitle(fanacIssueListByTitle):
@@ -678,8 +651,15 @@ def ReadAllFanacFanzineMainPages() -> list[tuple[str, str]]:
     directories=ReadList("control-topleveldirectories.txt")
     if len(directories) == 0:
         directories=["https://www.fanac.org/fanzines/Classic_Fanzines.html"]
-    for dir in directories:
-        fanacFanzineDirectoriesList.extend(ExtractTitlesFromClassicFanzinePage(dir))
+
+    # The top-level pages are independent of each other, so fetch and parse them concurrently.
+    # executor.map() hands back each page's rows in the order of control-topleveldirectories.txt as soon as that page (and the ones before it) are done,
+    # so the resulting list is the same no matter which page finishes downloading first.
+    from concurrent.futures import ThreadPoolExecutor
+    numThreads=max(1, min(len(directories), int(Settings().Get("Fetch Threads", "8"))))
+    with ThreadPoolExecutor(max_workers=numThreads) as executor:
+        for rows in executor.map(ExtractTitlesFromClassicFanzinePage, directories):
+            fanacFanzineDirectoriesList.extend(rows)
 
     Log("----Done reading Classic table")
     return fanacFanzineDirectoriesList
@@ -688,7 +668,11 @@ def ReadAllFanacFanzineMainPages() -> list[tuple[str, str]]:
 # ======================================================================
 # Read one of the main fanzine directory listings and append all the fanzines directories found to the dictionary
 def ExtractTitlesFromClassicFanzinePage(url: str) -> list[tuple[str, str]]:
+    from FanacFanzinesHelpers import ReadClassicFanzinesTable
     contents=FetchFileFromServer(url)
+    if contents is None:
+        LogError(f"ExtractTitlesFromClassicFanzinePage: Unable to load {url}")
+        return []
     # Extract a table of the html for all the rows in the Classic Fanzines table
     rows=ReadClassicFanzinesTable(contents)
     if rows is None:
@@ -720,367 +704,6 @@ def ExtractTitlesFromClassicFanzinePage(url: str) -> list[tuple[str, str]]:
 
 
 
-def ReadFile(filename: str) -> list[str]:
-    try:
-        with open(filename, "r") as f2:
-            return f2.readlines()
-    except:
-        # If the expected control header is unavailable, bail out, otherwise return an empty list.
-        LogFailureAndRaiseIfMissing(filename)
-    return []
-
-
-#================================================================================
-# The basic notion is that a report has four levels:
-#   The totality
-#   The Groups -- a group of rows with a common header in the left column
-#   The Rows -- one or more entries grouped together by a common thing. Each will be one of the rows under some group.
-#                       All the entries collected under this row generate a single line in the right column of the report.
-#   We use a bunch of lambdas to assemble the various parts. The lambdas are designated by a leading "f" followed by a UC letter
-#   fSelector decides if this fanzine is to be listed and returns True for fanzines to be listed, and False for ones to be skipped. (If None, nothing will be skipped)
-#   fButtonText operates on an issue and selects the character (or whatever) that will be used for button grouping
-#   fGroupText and fRowText are functions which pull information out of a fanzineIssue from fanzineIssueList
-#   fGroupText is the item used to decide when to start a new subsection
-#   fRowText is what is listed in the subsection
-def WriteHTMLTable(
-                filename: str,   # Filename of report to be generated. Must be supplied
-
-                fanacIssueList: list[FanzineIssueInfo],  # The already-sorted input list. Most be supplied
-                fSelector: Callable[[FanzineIssueInfo], bool]|None = None,    # If present, selects fanzines to be included in report.  Default for None is to include all.
-                #
-                fGroupURL: Callable[[FanzineIssueInfo], str]|None=None,    # Function to supply the URL for the header text if one is wanted
-                fBodyURL: Callable[[FanzineIssueInfo], str]|None=lambda fz: fz.URL, # Required: Function to supply the URL for the specific item
-                fButtonText: Callable[[FanzineIssueInfo], str]|None = None,  # Function to supply the button text
-                # A set of individual items (appearing in the right column) are collected under a header in the left column
-                fGroupText: Callable[[FanzineIssueInfo], str]|None = None,  # Required: Function to supply the text which appears in the left column of each group.
-                fGroupAnnot: Callable[[FanzineIssueInfo], str]|None = None,    # Function to supply annotation to the header text/link
-                fRowHeaderSelect: Callable[[FanzineIssueInfo], str]|None = None,  # Function to supply an individual items text to be used to decide its header
-                fCompareRowHeaderText: Callable[[str, str], bool]|None = None,  # If present, is used to determine two header texts to see if they are different.
-                includeRowHeaderCounts: bool = True,  # Include counts in header block!
-                includeRowTitleCount: bool=False,    # (Only if includeRowHeaderCounts is True) also include count of series.
-                #
-                fRowText: Callable[[FanzineIssueInfo], str]|None = None,  # Required: Function to supply the row's body text
-                fRowAnnot: Callable[[FanzineIssueInfo], str]|None = None,  # Function to supply annotation to the rows
-                fCompareRowBodyText: Callable[[str, str], bool]|None = None,    # If present, is used to compare two fRowBodyGroupBy()s to see if they are identical
-                fRowBodyGroupBy: Callable[[FanzineIssueInfo], str]|None = None,   # If present, generates the text to compare body rows so that duplicates can be skipped
-                #
-                topCountText: str = "",
-                reportFilename: str = "",
-                inAlphaOrder: bool = False,
-                showDuplicateBodyRows: bool=True,
-
-                debugflag=False)\
-                -> None:
-
-    if fCompareRowHeaderText is None:
-        fCompareRowHeaderText=lambda f1, f2: f1.casefold() == f2.casefold()
-    if fCompareRowBodyText is None:
-        fCompareRowBodyText=lambda f1, f2: f1.casefold() == f2.casefold()
-    if fGroupText is None:
-        LogError(f"WriteTable: critical parameter 'fGroupText' is None in call to generate {filename}")
-        return
-    if fRowHeaderSelect is None:  # The default is for the header selection rule to be the same as the header; but sometimes this is not the case
-        fRowHeaderSelect=fGroupText  # Note that this may also be None
-    if fRowText is None:
-        LogError(f"WriteTable: critical parameter 'fRowBodyText' is None in call to generate {filename}")
-        return
-    if fBodyURL is None:
-        LogError(f"WriteTable: critical parameter 'fURL' is None in call to generate {filename}")
-        return
-    if (not showDuplicateBodyRows) and fRowBodyGroupBy is None:
-        LogError(f"WriteTable: showDuplicateBodyRows is False, yet fRowBodySelect is None in call to generate {filename}")
-        return
-
-
-    #--------------------------
-    #....... Header .......
-    # HTML needs to include a header.
-    # It will be a combination of the contents of "control-Header (basic).html" with headerInfoFilename
-    basicHeadertext=ReadFile("control-Header (basic).html")
-    if not basicHeadertext:
-        LogError(f"WriteTable: critical parameter basicHeadertext is None in call to generate {filename}")
-        return
-
-    # Read the specialized control.html file for this type of report
-    specialText=ReadFile(reportFilename)
-    if specialText:
-        specialText=[s for s in specialText if len(s) > 0 and s[0] !="#"]   # Ignore comments
-        title=specialText[0]
-        del specialText[0]
-
-        # Do the substitutions
-        for i in range(0, len(basicHeadertext)):
-            if basicHeadertext[i].strip() == "<title>title</title>":
-                basicHeadertext[i]=f"<title>{title}</title>"
-            if basicHeadertext[i].strip() == "<h1>title</h1>":
-                basicHeadertext[i]=f"<h1>{title}</h1>"
-        basicHeadertext.extend(specialText)
-
-    # Initialize the output variable which will eventually be written to the file
-    output="\n".join(basicHeadertext)
-
-    # Externally supplied summary count text
-    if topCountText:
-        topCountText=topCountText.replace("\n", "<p>")
-        topCountText=f"<p>{topCountText}</p>\n"
-        output+=topCountText
-
-    #--------------------------
-    # -- Jump buttons --
-    # If we have an HTML header, we need to create a set of jump buttons.
-    # If it's alpha, the buttons are by 1st letter; if date it's by decade
-    # First, we determine the potential button names.  There are two choices: Letters of the alphabet or decades
-
-    headers=set()
-    for fz in fanacIssueList:
-        if fSelector is None or fSelector(fz):
-            if fButtonText is not None:
-                if fButtonText(fz) is not None:
-                    headers.add(fButtonText(fz))
-
-
-    headerlist=list(headers)
-    headerlist.sort(key=lambda elem: elem.lower())
-    buttonlist=""
-    for item in headerlist:
-        if buttonlist:
-            buttonlist=buttonlist+" &mdash; "
-        buttonlist+=FormatLink("#"+ item, item)
-
-    # Write out the button bar
-    output+=f"{buttonlist}<p><p>\n"
-
-    #--------------------------
-    #....... Main table .......
-    # Start the table if this is HTML
-    # The structure is
-    #   <div class="row border">        # This starts a new bordered box (a fanzine, a month)
-    #       <div class=col_md_2> (1st col: box title) </div>
-    #       <div class=col_md_10> (2nd col, a list of fanzine issues)
-    #           <a>issue</a> <br>
-    #           <a>issue</a> <br>
-    #           <a>issue</a> <br>
-    #       </div>
-    #   </div>
-
-    output+='<div>\n'  # Begin the main table
-
-    lastRowHeaderSelect: str=""
-    lastRowBodySelect: str=""
-    lastButtonLinkString: str=""
-
-    # We walk fanacIssueList by index so we can run a sub-loop for the secondary boxes in the 2nd column.
-    for i in range(len(fanacIssueList)):
-        fz=fanacIssueList[i]
-
-        # Do we skip this fanzine completely?
-        if fSelector is not None and not fSelector(fz):
-            continue
-        if fBodyURL is not None and fBodyURL(fz) is None:        #TODO: Why do we skip when fBodyURL(fz) is None ??
-            continue
-
-        # Start a new main row
-        # Deal with Column 1
-
-        # We start a new main row when fCompareRowHeaderText() thinks that fRowHeaderSelect() has changed
-        # Note that they have defaults, so they do not need to be checked for None
-        if not fCompareRowHeaderText(lastRowHeaderSelect, fRowHeaderSelect(fz)):
-            if lastRowHeaderSelect != "":  # If this is not the first sub-box, we must end the previous sub-box by ending its col 2
-                output+='    </div></div>\n'
-
-            if includeRowHeaderCounts:
-                # Count the issues in this block.
-                fc=CountSublist(fCompare=fCompareRowHeaderText, fRowSelect=fRowHeaderSelect, fSelector=fSelector, fanacIssueList=fanacIssueList[i:], CountTitles=True)
-
-            # Since this is a new main row, we write the row header in col 1
-            # Col 1 will contain just one cell while col2 may -- and usually will -- have multiple.
-
-            # Get the button link string, and check if we have a new decade (or 1st letter) and need to create a new jump anchor
-            buttonLinkString: str=""
-            if fButtonText is not None:
-                if fButtonText(fz) is not None:
-                    buttonLinkString=fButtonText(fz)
-            if buttonLinkString != lastButtonLinkString:
-                output+=f'<a name="{buttonLinkString}"></a>'
-                lastButtonLinkString=buttonLinkString
-
-            output+='<div class="row border">\n'  # Start a new sub-box
-            # Write the 1st column header for a bunch of 2nd column fz's
-            # We sometimes have a very long single word in a fanzine name which does not wrap, but which collides with the second column.
-            # Detect it and, if necessary, add a wrap to the HTML
-            wrapper=""
-            if max([len(x) for x in fGroupText(fz).split(" ")]) > 20:
-                wrapper=" text-break"
-            output+=f'  <div class="col-md-3{wrapper}">'
-            if fGroupURL is not None:
-                if inAlphaOrder:
-                    output+=FormatLink(fGroupURL(fz), fGroupText(fz))
-                else:
-                    output+=fGroupText(fz)
-                if fGroupAnnot is not None:
-                    output+=fGroupAnnot(fz)
-            else:
-                output+=fGroupText(fz)
-
-            if includeRowHeaderCounts:
-                if includeRowTitleCount:        #TODO:  What's this??
-                    output+=f"<br><small>{fc}</small>"
-                else:
-                    output+=f"<br><small>{fc}</small>"
-
-            output+='</div>\n'
-            output+='    <div class=col-md-9>\n' # Start col 2
-
-        # We sometimes print only the 1st row of column 2 of a block, skipping the rest.
-        # These are treated as two separate cases
-        # Deal with Column 2
-        if showDuplicateBodyRows:
-            # The hyperlink goes in column 2, in this case a link to the specific fanzine
-            # There are two kinds of hyperlink: Those with just a filename (xyz.html) and those with a full URL (http://xxx.vvv.zzz.html)
-            # The former are easy, but the latter need to be processed
-            bodytext=fRowText(fz)
-            if fBodyURL is not None:
-                # if there is a pipe character in the string, we only link the part before the pipe and delete the pipe
-                splitext=bodytext.split("|", 2)
-                if len(splitext) == 2:
-                    bodytext=splitext[0]
-                link=fBodyURL(fz)
-                output+='        '+FormatLink(link, bodytext)
-
-            fc=None
-
-            annot=""
-            if fRowAnnot is not None:
-                annot=fRowAnnot(fz)
-                if annot is not None:
-                    annot=annot.strip()
-            if fc is not None:
-                if annot != "":
-                    annot+="&nbsp;&nbsp;&nbsp;&nbsp;"
-                annot+=str(fc)
-            if annot != "":
-                output+=Smallify(f"&nbsp;&nbsp;&nbsp;({annot})")
-
-            output+='<br>\n'
-        else:
-            # We're NOT showing duplicate body rows
-            # The hyperlink goes in column 2 and is a hyperlink to the *series* since there is only one row for the whole series
-            # There are two kinds of hyperlink: Those with just a filename (xyz.html) and those with a full URL (http://xxx.vvv.zzz.html)
-            # The former are easy, but the latter need to be processed
-            if not fCompareRowBodyText(lastRowBodySelect, fRowBodyGroupBy(fz)):
-                bodytext=fRowText(fz)
-                if fBodyURL is not None:
-
-                    link=fBodyURL(fz)
-                    if fz.Series.AlphabetizeIndividually:
-                        link=fz.URL
-                    # if there is a pipe character in the string, we only link the part before the pipe and delete the pipe
-                    splitext=bodytext.split("|", 2)
-                    if len(splitext) == 2:
-                        bodytext=splitext[0]
-                    output+='        '+FormatLink(link, bodytext)
-
-                fc=CountSublist(fCompare=fCompareRowBodyText, fRowSelect=fRowBodyGroupBy, fanacIssueList=fanacIssueList[i:])
-
-                annot=""
-                if fRowAnnot is not None:
-                    annot=fRowAnnot(fz)
-                    if annot is not None:
-                        annot=annot.strip()
-                if fc is not None:
-                    if annot != "":
-                        annot+="&nbsp;&nbsp;&nbsp;"
-                    annot+=str(fc)
-                if annot != "":
-                    output+=Smallify(f"&nbsp;&nbsp;&nbsp;({annot})")
-
-                output+='<br>\n'
-                lastRowBodySelect=fRowBodyGroupBy(fz)
-
-        if fRowHeaderSelect is not None:
-            lastRowHeaderSelect=fRowHeaderSelect(fz)
-
-    #....... Cleanup .......
-    output+='</div>\n</div>\n'
-    output+="\n".join(ReadFile("control-Default.Footer"))
-
-    # The file being created.
-    output=UnicodeToHtml2(output)
-    with open(filename, "w+") as f:
-        f.write(output)
-
-
-def CountSublist(fCompare: Callable[[str, str], bool], fRowSelect: Callable[[FanzineIssueInfo], str], fSelector: Callable[[FanzineIssueInfo], str]|None=None, fanacIssueList: list[FanzineIssueInfo]|None=None, CountTitles: bool=False) -> FanzineCounts:
-    fc=FanzineCounts()
-    tempLastRowHeaderSelect=fRowSelect(fanacIssueList[0])
-    for fz in fanacIssueList:  # Loop through fanacIssueList starting at the current position which is the start of a block.
-        if fSelector is not None and not fSelector(fz):
-            continue
-        if not fCompare(tempLastRowHeaderSelect, fRowSelect(fz)):
-            break  # Bail when the block selection changes
-        fc+=fz
-        if CountTitles:
-            fc+=fz.SeriesName
-    return fc
-
-
-#================================================================================
-# fGroupText and fRowText and fSelector are all lambdas
-#   fSelector decides if this fanzine is to be listed and returns True for fanzines to be listed, and False for ones to be skipped. (If None, nothing will be skipped)
-#   fButtonText operates on an issue and selects the character (or whatever) that will be used for button grouping
-#   fGroupText and fRowText are functions which pull information out of a fanzineIssue from fanzineIssueList
-#   fGroupText is the item used to decide when to start a new subsection
-#   fRowText is what is listed in the subsection
-def WriteTxtTable(filename: str,
-               fanacIssueList: list,  # The sorted input list
-               fRowText: Callable[[FanzineIssueInfo], str],  # Function to supply the row's body text
-               fGroupText: Callable[[FanzineIssueInfo], str]|None = None,  # Function to supply the header text
-               fRowHeaderSelect: Callable[[FanzineIssueInfo], str]|None = None,  # Function to supply the header text to be used to separate headers. (Needed to disambiguate fanzines series with the same title
-               fGroupAnnot: Callable[[FanzineIssueInfo], str]|None = None,  # Function to supply annotation to the headers
-               fCompareRowHeaderText: Callable[[str, str], bool]|None = None,        # If present, is used to determine if the row header text has changed
-               topCountText: str= "",
-               fSelector: Callable[[FanzineIssueInfo], bool]|None = None)\
-                -> None:
-    Log(f"WriteTxtTable({filename} called")
-    if fCompareRowHeaderText is None:
-        fCompareRowHeaderText=lambda f1, f2: f1 == f2
-    if fRowHeaderSelect is None:  # The default is for the header selection rule to be the same as the header; but sometimes this is not the case
-        fRowHeaderSelect=fGroupText     # Note that this may also be None
-
-    with open(filename, "w+") as f:
-
-        #....... Header .......
-        if topCountText:
-            f.write(topCountText)
-
-        lastRowHeaderSelect: str=""
-        # We walk fanacIssueList by index so we can run a sub-loop for the secondary boxes in the 2nd column.
-        for fz in fanacIssueList:
-            # Do we skip this fanzine?
-            if fSelector is not None and not fSelector(fz):
-                continue
-
-            # Start a new main row?
-            # Deal with Column 1
-            if fGroupText is not None:
-                # We start a new main row when fCompareRowHeaderText() thinks that fRowHeaderSelect() has changed
-                # Note that they have defaults, so they do not need to be checked for None
-                if not fCompareRowHeaderText(lastRowHeaderSelect, fRowHeaderSelect(fz)):
-                    lastRowHeaderSelect=fRowHeaderSelect(fz)
-
-                    f.write("\n"+fGroupText(fz))
-                    if fGroupAnnot is not None and fGroupAnnot(fz) is not None:
-                        f.write("    "+RemoveAllHTMLTags2(fGroupAnnot(fz)))
-                    f.write("\n")
-
-            # Deal with "Column 2" (the indented stuff)
-            bodytext=fRowText(fz)
-            bodytext=bodytext.replace("|", "", 1)  # Ignore the first  embedded "|" character
-            f.write("   "+bodytext+"\n")
-    Log(f"WriteTxtTable({filename} completed")
-
-
-
 # -------------------------------------------------------------------------
 # We have a name and a dirname from the fanac.org Classic and Modern pages.
 # The dirname *might* be a URL in which case it needs to be handled as a foreign directory reference
@@ -1097,7 +720,7 @@ def AddFanacDirectory(fanacFanzineDirectoriesList: list[tuple[str, str]], name:
         return
 
     # Add name and directory reference
-    Log(f"   AddFanacDirectory: added to fanacFanzineDirectories:  {name=}  {dirname=}")
+    LogNormal(f"   AddFanacDirectory: added to fanacFanzineDirectories:  {name=}  {dirname=}")
     fanacFanzineDirectoriesList.append((name, dirname))
     return
 
@@ -1121,32 +744,6 @@ def AnnotateDate(fz: FanzineIssueInfo) -> str:
         return ""
     return str(fz.FIS.FD.LongDates).strip()
 
-# -------------------------------------------------------------------------
-# Take a string which is lower case and turn it to City, State, US sort of capitalization -- used in calls to WriteTable
-def CapIt(s: str) -> str:
-    if len(s) == 0:
-        return s
-    if len(s) == 2:
-        return s.upper()
-    ret=""
-    splits=s.split()
-    for split in splits:
-        if ret:
-            ret+=" "
-        ret+=split[0].upper()+split[1:]
-    return ret
-
-
-#----------------------------------------
-# Surround the contents by <small>...</small> if it is non-empty
-def Smallify(s1: str, s2: str="") -> str:
-    if s1 == "":
-        return ""
-    if s2 == "":
-        return f"<small>{s1}</small>"
-
-    return f"<small>{s1}&nbsp;&nbsp;&nbsp;{s2}</small>"
-
 #.........................................................
 # Compute the button text and links for chronological listings -- used in calls to WriteTable
 def ChronButtonText(fz: FanzineIssueInfo) -> str:
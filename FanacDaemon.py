@@ -0,0 +1,346 @@
+from typing import Callable
+
+import os
+import glob
+import time
+import queue
+import threading
+import hashlib
+import socketserver
+
+import FanacOrgReaders
+from CrawlFrontier import NormalizeIndexUrl
+from FanzineIssueSpecPackage import FanzineIssueInfo
+from Settings import Settings
+from Log import Log, LogError
+from LogLevels import LogNormal, ResetLogLevel
+
+
+#================================================================================
+# Daemon mode: keep the fanzine list in memory and regenerate the reports when something changes.
+# Turned on by setting the parameters.txt value "Daemon Mode" to anything non-blank.  Other parameters:
+#   Daemon Refresh Minutes  -- how often the fanzine index pages on fanac.org are checked for changes (default 60)
+#   Daemon Poll Seconds     -- how often the control files are checked for changes (default 10)
+#   Daemon Port             -- the port of the control socket on localhost (default 8765).  0 means no control socket.
+# The control socket accepts one-line commands:
+#   refresh -- check the index pages now (e.g., right after an upload to fanac.org)
+#   reports -- regenerate the reports now
+#   status  -- report on the daemon's state
+#   stop    -- shut the daemon down
+# All the work is done on the main thread; the socket and the timers just queue commands for it.
+def RunDaemon(rootDir: str,
+              fLoadFanzineList: Callable[[str], list[FanzineIssueInfo]|None],
+              fSaveFanzineList: Callable[[list[FanzineIssueInfo]], None],
+              fReadDirectories: Callable[[], list[tuple[str, str]]],
+              fGenerateReports: Callable[[str, list[FanzineIssueInfo]], None]) -> None:
+    daemon=FanacDaemon(rootDir, fLoadFanzineList, fSaveFanzineList, fReadDirectories, fGenerateReports)
+    daemon.Run()
+
+
+class FanacDaemon:
+    def __init__(self, rootDir: str,
+                 fLoadFanzineList: Callable[[str], list[FanzineIssueInfo]|None],
+                 fSaveFanzineList: Callable[[list[FanzineIssueInfo]], None],
+                 fReadDirectories: Callable[[], list[tuple[str, str]]],
+                 fGenerateReports: Callable[[str, list[FanzineIssueInfo]], None]):
+        self._rootDir=rootDir
+        self._fLoadFanzineList=fLoadFanzineList
+        self._fSaveFanzineList=fSaveFanzineList
+        self._fReadDirectories=fReadDirectories
+        self._fGenerateReports=fGenerateReports
+
+        self._commands: queue.Queue[tuple[str, Callable[[str], None]|None]]=queue.Queue()
+        self._fanacIssueList: list[FanzineIssueInfo]=[]
+        # The index pages watched are keyed by their normalized URL (see NormalizeIndexUrl()).  They are the pages listed in the Classic and Modern
+        #   tables plus the sub-index pages reached from them.
+        self._pages: dict[str, tuple[str, str]]={}          # Index page --> its (title, dirname)
+        self._topLevel: set[str]=set()                      # The index pages listed in the Classic and Modern tables
+        self._subIndexes: dict[str, set[str]]={}            # Index page --> the sub-index pages reached from it when it was last read
+        self._fingerprints: dict[str, str]={}               # Index page --> fingerprint of the page when it was last read
+        self._controlFileTimes: dict[str, float]={}
+        self._lastRefresh: float=0
+        self._lastReports: float=0
+        self._running: bool=True
+
+
+    def Run(self) -> None:
+        Log("Daemon mode: loading the fanzine list", timestamp=True)
+        fanacIssueList=self._fLoadFanzineList(self._rootDir)
+        if fanacIssueList is None:
+            LogError("Daemon mode: no fanzine list could be loaded.  Exiting.")
+            return
+        self._fanacIssueList=fanacIssueList
+
+        # The list just loaded is taken to be current, so record the index pages' present state to compare against later
+        self._controlFileTimes=self.ControlFileTimes()
+        self._pages=self.DirectoryPages(self._fReadDirectories())
+        self._topLevel=set(self._pages.keys())
+        # The issues read from sub-index pages are in the list, too.  The list doesn't record which page a sub-index page was reached from, so until
+        #   that page is next re-read each sub-index page is watched on its own.
+        for fz in fanacIssueList:
+            key=NormalizeIndexUrl(fz.Series.DirURL)
+            if key not in self._pages:
+                self._pages[key]=(fz.SeriesName, FanacOrgReaders.FanacDirname(fz.Series.DirURL))
+        self._fingerprints=self.PageFingerprints({key: FanacOrgReaders.FanacDirectoryURL(dirname) for key, (_, dirname) in self._pages.items()})
+        self._lastRefresh=time.time()
+        self.GenerateReports()
+
+        server=self.StartControlServer()
+        refreshSeconds=60*float(Settings().Get("Daemon Refresh Minutes", "60"))
+        pollSeconds=float(Settings().Get("Daemon Poll Seconds", "10"))
+        try:
+            while self._running:
+                try:
+                    command, fReply=self._commands.get(timeout=pollSeconds)
+                except queue.Empty:
+                    command, fReply=None, None
+
+                # A command or a cycle of scheduled work which fails is logged and the daemon carries on.  (The caller is always replied to, so it
+                #   doesn't wait forever.)
+                if command is not None:
+                    try:
+                        reply=self.DoCommand(command)
+                    except Exception as e:
+                        LogError(f"Daemon mode: command '{command}' failed: {e!r}")
+                        reply=f"Error: {e!r}"
+                    if fReply is not None:
+                        fReply(reply)
+
+                # Scheduled work
+                try:
+                    if self.ControlFilesChanged():
+                        self.GenerateReports()
+                    if time.time()-self._lastRefresh > refreshSeconds:
+                        self.Refresh()
+                except Exception as e:
+                    LogError(f"Daemon mode: scheduled work failed: {e!r}")
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        Log("Daemon mode: stopped", timestamp=True)
+
+
+    def DoCommand(self, command: str) -> str:
+        command=command.strip().lower()
+        Log(f"Daemon mode: command '{command}'", timestamp=True)
+        if command == "refresh":
+            changed=self.Refresh()
+            return f"Refreshed: {changed} index pages changed"
+        if command == "reports":
+            self.GenerateReports()
+            return "Reports regenerated"
+        if command == "status":
+            return (f"{len(self._fanacIssueList):,} issues; {len(self._fingerprints):,} index pages watched; "
+                    f"last refresh {time.ctime(self._lastRefresh)}; last reports {time.ctime(self._lastReports)}")
+        if command == "stop":
+            self._running=False
+            return "Stopping"
+        return f"Unknown command '{command}'.  Use refresh, reports, status or stop."
+
+
+    #--------------------------------
+    # Regenerate the reports from the list in memory.
+    # If the fragment cache is turned on (the parameter "Fragment Cache"), groups which are unchanged since the last time are taken from it, so only
+    #   what has changed is rendered again.
+    def GenerateReports(self) -> None:
+        Log("Daemon mode: generating reports", timestamp=True)
+        self._fGenerateReports(self._rootDir, self._fanacIssueList)
+        self._lastReports=time.time()
+        Log("Daemon mode: reports complete", timestamp=True)
+
+
+    #--------------------------------
+    # Check the fanac.org index pages (including the sub-index pages reached from them) for changes and re-read just the ones which have changed
+    #   (or are new).  A page is re-read along with its sub-index pages, so a sub-index page which has changed is re-read by re-reading its parent.
+    # Series which have disappeared from the Classic and Modern tables are dropped, along with their sub-index pages, and so are sub-index pages
+    #   which are no longer linked to.
+    # Returns the number of index pages which changed.
+    def Refresh(self) -> int:
+        Log("Daemon mode: checking the index pages for changes", timestamp=True)
+        self._lastRefresh=time.time()
+        directories=self.DirectoryPages(self._fReadDirectories())
+        if len(directories) == 0:
+            LogError("Daemon mode: unable to read the list of fanzine directories.  Refresh skipped.")
+            return 0
+
+        removed=self.Unlinked(self.WithSubIndexes(self._topLevel.difference(directories.keys())), set(directories.keys()))
+        pages={key: page for key, page in self._pages.items() if key not in removed}
+        pages.update(directories)
+        changed: list[str]=[]
+        fingerprints=self.PageFingerprints({key: FanacOrgReaders.FanacDirectoryURL(dirname) for key, (_, dirname) in pages.items()})
+        for key in pages.keys():
+            if fingerprints[key] == "" or fingerprints[key] != self._fingerprints.get(key):
+                changed.append(key)
+
+        if len(changed) == 0 and len(removed) == 0:
+            Log("Daemon mode: no changes found", timestamp=True)
+            return 0
+        LogNormal(lambda: f"Daemon mode: changed index pages: {', '.join(pages[key][1] for key in changed)}")
+
+        # Replace the issues of the changed series with a fresh read of their index pages.
+        # A changed page whose parent has also changed isn't read directly: it is reached again by reading its parent.
+        parents={sub: key for key, subs in self._subIndexes.items() for sub in subs}
+        seeds=[key for key in changed if not self.HasAncestorIn(key, set(changed), parents)]
+        crawled: dict[str, tuple[str, str, str]]={}
+        newIssues=FanacOrgReaders.ReadFanacFanzineIssues(self._rootDir, [pages[key] for key in seeds], askOnFailure=False, crawledPages=crawled)
+        newIssues=[x for x in newIssues if x.PageFilename != ""]
+        # A page which came back with no issues probably failed to load, so its old issues are kept and it is tried again next time
+        reread=set(NormalizeIndexUrl(fz.Series.DirURL) for fz in newIssues)
+        newPages={key: url for key, (_, url, _) in crawled.items() if key not in pages}     # Sub-index pages not seen before
+        fingerprints.update(self.PageFingerprints({key: url for key, url in newPages.items() if key in reread}))
+        for key, url in newPages.items():
+            pages[key]=(crawled[key][0], FanacOrgReaders.FanacDirname(url))
+            fingerprints.setdefault(key, "")
+        for key in set(changed).union(crawled.keys()):
+            if key not in reread and fingerprints[key] != "":
+                LogError(f"Daemon mode: no issues read from {pages[key][1]}; keeping its old issues")
+                fingerprints[key]=""
+
+        # Record the sub-index pages reached from each page re-read.  Those it no longer reaches are dropped, unless they were reached some other way.
+        unlinked: set[str]=set()
+        for key in reread:
+            subIndexes=set(sub for sub, (_, _, parent) in crawled.items() if parent == key)
+            unlinked.update(self._subIndexes.get(key, set()).difference(subIndexes))
+            self._subIndexes[key]=subIndexes
+        unlinked=self.Unlinked(self.WithSubIndexes(unlinked), set(crawled.keys()).union(directories.keys()))
+        removed.update(unlinked)
+
+        urls=reread.union(removed)
+        self._fanacIssueList=[fz for fz in self._fanacIssueList if NormalizeIndexUrl(fz.Series.DirURL) not in urls]+newIssues
+        self._fanacIssueList=FanacOrgReaders.RemoveDuplicateIssues(self._fanacIssueList)
+        for key in removed:
+            pages.pop(key, None)
+            fingerprints.pop(key, None)
+            self._subIndexes.pop(key, None)
+        self._pages=pages
+        self._topLevel=set(directories.keys())
+        self._fingerprints=fingerprints
+        Log(f"Daemon mode: {len(changed)} index pages changed, {len(crawled)} re-read, {len(removed)} dropped; {len(self._fanacIssueList):,} issues", timestamp=True)
+
+        if len(Settings().Get("Use Saved Fanzine List", "")) > 0:
+            self._fSaveFanzineList(self._fanacIssueList)
+        self.GenerateReports()
+        return len(changed)
+
+
+    # Map each index page listed in the Classic and Modern tables to its (title, dirname)
+    def DirectoryPages(self, directories: list[tuple[str, str]]) -> dict[str, tuple[str, str]]:
+        return {NormalizeIndexUrl(FanacOrgReaders.FanacDirectoryURL(dirname)): (title, dirname) for title, dirname in directories
+                if dirname is not None and not dirname.startswith("http")}
+
+
+    # The pages, plus all the sub-index pages reached from them, and from those, ...
+    def WithSubIndexes(self, keys: set[str]) -> set[str]:
+        result=set(keys)
+        pending=list(keys)
+        while len(pending) > 0:
+            for sub in self._subIndexes.get(pending.pop(), set()):
+                if sub not in result:
+                    result.add(sub)
+                    pending.append(sub)
+        return result
+
+
+    # Those of the pages which aren't still reached some other way: from a page that's staying, or directly
+    def Unlinked(self, keys: set[str], staying: set[str]) -> set[str]:
+        linked=set(staying)
+        for key, subs in self._subIndexes.items():
+            if key not in keys:
+                linked.update(subs)
+        return set(keys).difference(linked)
+
+
+    def HasAncestorIn(self, key: str, keys: set[str], parents: dict[str, str]) -> bool:
+        seen: set[str]=set()
+        while key in parents and key not in seen:
+            seen.add(key)
+            key=parents[key]
+            if key in keys:
+                return True
+        return False
+
+
+    # Fingerprint a set of pages (key --> URL), "Fetch Threads" (default 8) at a time on a shared session.  Returns key --> fingerprint.
+    def PageFingerprints(self, urls: dict[str, str]) -> dict[str, str]:
+        if len(urls) == 0:
+            return {}
+        import requests     # Imported here so that daemon mode is the only part of the program to need it at this point
+        threads=max(1, min(len(urls), int(Settings().Get("Fetch Threads", "8"))))
+        session=requests.Session()
+        adapter=requests.adapters.HTTPAdapter(pool_connections=threads, pool_maxsize=threads)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            return dict(zip(urls.keys(), executor.map(lambda url: self.PageFingerprint(session, url), urls.values())))
+
+
+    # A cheap fingerprint of a page: its ETag or Last-Modified date if the server supplies one, otherwise a hash of its contents.
+    # Returns "" if the page can't be read, which forces it to be re-read.
+    def PageFingerprint(self, session, url: str) -> str:
+        import requests
+        try:
+            h=session.head(url, timeout=4, allow_redirects=True)
+            if h.status_code == 200:
+                for header in ["ETag", "Last-Modified"]:
+                    if header in h.headers:
+                        return f"{header}: {h.headers[header]}"
+            h=session.get(url, timeout=8, headers={'Cache-Control': 'no-cache'})
+            if h.status_code == 200:
+                return "md5: "+hashlib.md5(h.content).hexdigest()
+        except requests.RequestException as e:
+            LogError(f"Daemon mode: unable to check {url}: {e}")
+        return ""
+
+
+    #--------------------------------
+    # The modification times of all the files which control how the reports are generated
+    def ControlFileTimes(self) -> dict[str, float]:
+        files=["parameters.txt", os.path.join(self._rootDir, "People Canonical Names.txt")]
+        for directory in {".", self._rootDir}:
+            files.extend(glob.glob(os.path.join(directory, "control-*")))
+        return {f: os.path.getmtime(f) for f in files if os.path.exists(f)}
+
+
+    # Have any of the control files changed since last time?  If parameters.txt has changed, it is reloaded.
+    def ControlFilesChanged(self) -> bool:
+        times=self.ControlFileTimes()
+        if times == self._controlFileTimes:
+            return False
+        changed=[f for f in set(times.keys()).union(self._controlFileTimes.keys()) if times.get(f) != self._controlFileTimes.get(f)]
+        Log(f"Daemon mode: control files changed: {', '.join(sorted(changed))}", timestamp=True)
+        if times.get("parameters.txt") != self._controlFileTimes.get("parameters.txt"):
+            Settings().Load("parameters.txt", MustExist=True)
+            ResetLogLevel()
+        self._controlFileTimes=times
+        return True
+
+
+    #--------------------------------
+    # The control socket runs on its own thread and hands each command to the main loop, waiting for the reply
+    def StartControlServer(self) -> socketserver.ThreadingTCPServer|None:
+        port=int(Settings().Get("Daemon Port", "8765"))
+        if port == 0:
+            return None
+        daemon=self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                command=self.rfile.readline().decode("utf-8", errors="replace").strip()
+                done=threading.Event()
+                reply: list[str]=[]
+
+                def Reply(s: str) -> None:
+                    reply.append(s)
+                    done.set()
+
+                daemon._commands.put((command, Reply))
+                done.wait()
+                self.wfile.write((reply[0]+"\n").encode("utf-8"))
+
+        server=socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler)
+        server.daemon_threads=True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        Log(f"Daemon mode: listening for commands on localhost:{port}", timestamp=True)
+        return server
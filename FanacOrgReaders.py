@@ -1,18 +1,21 @@
 import os
 import re
 import time
-import tkinter as tk
-from tkinter import messagebox
+import hashlib
+import threading
+import urllib.parse
 
 from SharedReaders import TextAndHref, FetchFileFromServer, DecodeTableRow
+from CrawlFrontier import CrawlFrontier
+from CrawlCheckpoint import CrawlCheckpoint
 
 from FanzineIssueSpecPackage import FanzineIssueInfo, FanzineSeriesInfo
-from FanzineIssueSpecPackage import FanzineCounts
-from Locale import Locale
+from LocaleCache import ResolveLocale
 from Settings import Settings
 
 from Log import Log, LogSetHeader, LogError
-from HelpersPackage import ReadList, FindBracketedText, ParseFirstStringBracketedText, ExtractHTMLUsingFanacStartEndCommentPair, MessageBox
+from LogLevels import LogNormal, LogVerbose
+from HelpersPackage import ReadList, FindBracketedText, ParseFirstStringBracketedText, ExtractHTMLUsingFanacStartEndCommentPair
 from HelpersPackage import ExtractBetweenHTMLComments, RemoveHyperlink
 from HelpersPackage import CanonicizeColumnHeaders
 from HelpersPackage import ExtractInvisibleTextInsideFanacComment
@@ -20,12 +23,23 @@ from HelpersPackage import ParmDict
 
 
 # ============================================================================================
-def ReadFanacFanzineIssues(rootDir: str, fanacDirectories: list[tuple[str, str]]) -> list[FanzineIssueInfo]:
+def ReadFanacFanzineIssues(rootDir: str, fanacDirectories: list[tuple[str, str]], shard: tuple[int, int]|None=None, askOnFailure: bool=True,
+                           useCheckpoint: bool=False, crawledPages: dict[str, tuple[str, str, str]]|None=None) -> list[FanzineIssueInfo]:
     # Read index.html files on fanac.org
     # We do this by reading the fanzines/<name>/index.html file and then decoding the table in it.
     # What we get out of this is a list of fanzines with name, URL, and issue info.
     # Loop over the list of all fanzines, building up a list of those on fanac.org
+    # If shard is (k, N), only the directories falling in shard k of N (see InShard()) are read.
+    # If askOnFailure is False (e.g., when running unattended), pages which fail to load are logged and skipped rather than asking whether to continue.
+    # Index pages linked to from the index pages read are crawled, too, down to a depth of "Crawl Depth Limit" (default 2; 0 to not follow links).
+    #   (Some fanzine index pages are listed only on another index page and not on Classic_Fanzines.html.)
+    # If crawledPages is given, it is filled in with every index page crawled (see CrawlFrontier.Pages), so the caller knows which sub-index pages
+    #   were reached from which page.
+    # If useCheckpoint is True (a full or sharded crawl, not a partial re-read), the pages read are checkpointed so that if this run dies a rerun
+    #   can pick up where it left off.  (See CrawlCheckpoint.py.)
     Log("----Begin reading index.html files on fanac.org")
+    if shard is not None:
+        Log(f"----Reading only shard {shard[0]} of {shard[1]}")
 
     fanacIssueInfo: list[FanzineIssueInfo]=[]
     issuesNotSuccessfullyRead: list[tuple[str, str]]=[]
@@ -39,6 +53,7 @@ def ReadFanacFanzineIssues(rootDir: str, fanacDirectories: list[tuple[str, str]]
         skippers=[]     # The unskippers list trumps the skippers list
 
     # Read the starter -- if present, we scan through classic fanzines until we find this one.
+    # (A crawl which died partway is resumed automatically from its checkpoint, so this is no longer needed for that.)
     starter=ReadList(os.path.join(rootDir, "control-startat.txt"))
     # Remove any trailing slash
     starter=[x.removesuffix("/") for x in starter]
@@ -49,6 +64,8 @@ def ReadFanacFanzineIssues(rootDir: str, fanacDirectories: list[tuple[str, str]]
     offsite=ReadList(os.path.join(rootDir, "control-offsite.txt"))
 
     fanacDirectories.sort(key=lambda tup: tup[1])
+    frontier=CrawlFrontier(maxDepth=int(Settings().Get("Crawl Depth Limit", "2")), threads=int(Settings().Get("Fetch Threads", "8")))
+    seedUrls: list[str]=[]
     starterFound=False
     for title, dirname in fanacDirectories:
 
@@ -60,12 +77,13 @@ def ReadFanacFanzineIssues(rootDir: str, fanacDirectories: list[tuple[str, str]]
             if not starterFound:    # Skip until we find it
                 continue
 
+        if shard is not None and not InShard(dirname, shard):
+            continue
+
         if len(unskippers) > 0:
             if dirname not in unskippers and (dirname[-1] == "/" and dirname[:-1] not in unskippers):   # Handle dirnames ending in "/"
                 continue     # If and only if there are unskippers present, skip any directory NOT in unskippers
 
-        LogSetHeader("'"+dirname+"'      '"+title+"'")
-
         if dirname in skippers or (dirname[-1] == "/" and dirname[:-1] in skippers):     # Deal with terminal "/"
             LogError(f"...Skipping because it is in skippers: {dirname}")
             continue
@@ -83,9 +101,8 @@ def ReadFanacFanzineIssues(rootDir: str, fanacDirectories: list[tuple[str, str]]
             continue
         if dirname.startswith("http"):  # We don't want to mess with foreign URLs
             continue
-        websiteurl=Settings().Get("Website URL", default="")
-        url="https://"+os.path.normpath(os.path.join(websiteurl, dirname)).replace("\\", "/")
-        Log(f"{url=}")
+        url=FanacDirectoryURL(dirname)
+        LogNormal(f"{url=}")
         if url is None:
             continue
         m=re.match(r"https://(www.)?fanac.org", url)     # The www. is optional
@@ -93,79 +110,201 @@ def ReadFanacFanzineIssues(rootDir: str, fanacDirectories: list[tuple[str, str]]
             LogError(f"...Skipped because not a fanac.org url: {url}")
             continue
 
-        stuff=ReadFanacFanzineIndexPage(title, url)
+        frontier.Add(title, url)
+        seedUrls.append(url)
+
+    # Now read the pages, and the index pages they link to.
+    # A linked page is read even if it is outside this run's shard: it can only be found through the page linking to it.  (If it is also read by
+    #   another shard, the duplicates are removed when the shards are merged.)
+    # A checkpoint is only used by a crawl of the same set of directories (so one from a different shard, or from before the directory list changed,
+    #   is not used).
+    checkpointFilename=""
+    if useCheckpoint:
+        checkpointFilename=Settings().Get("Crawl Checkpoint", "Crawl checkpoint.json")
+        if shard is not None:
+            base, ext=os.path.splitext(checkpointFilename)
+            checkpointFilename=f"{base} (shard {shard[0]} of {shard[1]}){ext}"
+        checkpointFilename=os.path.join(rootDir, checkpointFilename)
+    runKey=hashlib.md5("\n".join(sorted(seedUrls)+[str(shard)]).encode("utf-8")).hexdigest()
+    checkpoint=CrawlCheckpoint(checkpointFilename, float(Settings().Get("Crawl Checkpoint Minutes", "2")), runKey,
+                               float(Settings().Get("Crawl Checkpoint Max Age Hours", "48")))
+
+    def Read(title: str, url: str) -> tuple[list[FanzineIssueInfo], list[tuple[str, str]]]:
+        recorded=checkpoint.Get(url)
+        if recorded is not None:
+            return recorded
+        subIndexes: list[tuple[str, str]]=[]
+        stuff=ReadFanacFanzineIndexPage(title, url, subIndexes)
         if stuff is not None and len(stuff) > 0:
-            fanacIssueInfo.extend(stuff)
-        else:
-            issuesNotSuccessfullyRead.append((title, url))
-
-    # Now that we've completed the scan, do a retry on all that failed to load the first time
-    failedASecondTime: list[str]=[]
-    if len(issuesNotSuccessfullyRead) > 0:
-        for title, url in issuesNotSuccessfullyRead:
-            stuff=ReadFanacFanzineIndexPage(title, url)
+            checkpoint.Record(url, stuff, subIndexes)
+        return stuff, subIndexes
+
+    def Admit(url: str) -> bool:
+        dirname=FanacDirname(url)
+        if dirname in skippers or dirname in offsite:
+            LogNormal(f"...Not following link to {url}: it is in skippers or offsite")
+            return False
+        if len(unskippers) > 0 and dirname not in [x.removesuffix("/") for x in unskippers]:
+            LogNormal(f"...Not following link to {url}: it is not in unskippers")
+            return False
+        return True
+
+    try:
+        for title, url, stuff in frontier.Crawl(Read, Admit):
             if stuff is not None and len(stuff) > 0:
                 fanacIssueInfo.extend(stuff)
             else:
-                failedASecondTime.append(title)
-        if len(failedASecondTime) > 0:
-            msg=f"The following {len(failedASecondTime)} fanzines failed to download after a tedious number of retries:\n"
-            msg=msg+", ".join(failedASecondTime)
-            msg=msg+"\nThis is probably due to Sirian infiltration of the website."
-            msg=msg+f"\n\nContinue with the {len(fanacIssueInfo)} items that did download?"
-            root=tk.Tk()
-            root.withdraw()
-            response=messagebox.askokcancel("Alien activity detected!", msg)
-            if not response:
-                return []
-
-    # TODO Drop external links which duplicate Fanac.org  (What exactly does this mean??)
-
-    # Remove duplicate FIIs
-    deDupDict: dict[str, FanzineIssueInfo]={}
-    for fz in fanacIssueInfo:
-        deDupDict[fz.DirURL+fz.PageFilename]=fz
-    fanacIssueInfo=[x for x in deDupDict.values()]
-
+                issuesNotSuccessfullyRead.append((title, url))
+        Log(f"----{frontier.Count} index pages read")
+
+        # Now that we've completed the scan, do a retry on all that failed to load the first time
+        failedASecondTime: list[str]=[]
+        if len(issuesNotSuccessfullyRead) > 0:
+            for title, url in issuesNotSuccessfullyRead:
+                stuff, subIndexes=Read(title, url)
+                if stuff is not None and len(stuff) > 0:
+                    fanacIssueInfo.extend(stuff)
+                    frontier.AddLinks(url, subIndexes, Admit)
+                else:
+                    failedASecondTime.append(title)
+            # Read any index pages found only on the pages which succeeded the second time
+            for title, url, stuff in frontier.Crawl(Read, Admit):
+                if stuff is not None and len(stuff) > 0:
+                    fanacIssueInfo.extend(stuff)
+                else:
+                    failedASecondTime.append(title)
+            if len(failedASecondTime) > 0 and not askOnFailure:
+                LogError(f"The following {len(failedASecondTime)} fanzines failed to download and were skipped: {', '.join(failedASecondTime)}")
+            elif len(failedASecondTime) > 0:
+                msg=f"The following {len(failedASecondTime)} fanzines failed to download after a tedious number of retries:\n"
+                msg=msg+", ".join(failedASecondTime)
+                msg=msg+"\nThis is probably due to Sirian infiltration of the website."
+                msg=msg+f"\n\nContinue with the {len(fanacIssueInfo)} items that did download?"
+                import tkinter as tk
+                from tkinter import messagebox
+                root=tk.Tk()
+                root.withdraw()
+                response=messagebox.askokcancel("Alien activity detected!", msg)
+                if not response:
+                    return []
+    finally:
+        checkpoint.Save()      # Whether the crawl finished or died, keep what was read
+    checkpoint.Remove()
+    if crawledPages is not None:
+        crawledPages.update(frontier.Pages)
+    if checkpoint.Resumed > 0:
+        Log(f"----{checkpoint.Resumed:,} index pages were taken from the checkpoint rather than read again")
+
+    # Only exact duplicates are removed here.  Issues listed under more than one series are dealt with by DuplicateDetector when the reports are generated.
+    fanacIssueInfo=RemoveDuplicateIssues(fanacIssueInfo)
     if len(fanacIssueInfo) == 0:
         LogError("ReadFanacFanzineIssues: No fanzines found")
         return []
 
-    # Now process the list, doing page and issue counts for each series and adding them to the FanzineSeriesInfo object.
-    fanacIssueInfo.sort(key=lambda el: el.Series.SeriesName)
-    # With the list in series order, run through and sum up each series
-    lastSeries=fanacIssueInfo[0].Series
-    count=FanzineCounts()+fanacIssueInfo[0].Pagecount
-    for fii in fanacIssueInfo[1:]:
-        if lastSeries.SeriesName == fii.Series.SeriesName:
-            count+=fii.Pagecount
-        else:
-            lastSeries.Counts=count
-            count=FanzineCounts()+fii.Pagecount
-            lastSeries=fii.Series
-    lastSeries.Counts=count  # Gotta save that last series count
+    # Note that the series' Counts are computed later along with all the other statistics.  (See FanacStatistics.ComputeStatistics().)
 
     # Now fanacIssueList is a list of all the issues of fanzines on fanac.org
     Log("----Done reading index.html files on fanac.org")
     return fanacIssueInfo
 
 
+# ============================================================================================
+# Turn a directory name from the Classic and Modern fanzine tables (which is relative to fanac.org/fanzines) into the URL of its index page
+def FanacDirectoryURL(dirname: str) -> str:
+    websiteurl=Settings().Get("Website URL", default="")
+    return "https://"+os.path.normpath(os.path.join(websiteurl, dirname)).replace("\\", "/")
+
+
+# The reverse: turn the URL of an index page on fanac.org into its directory name relative to fanac.org/fanzines
+def FanacDirname(url: str) -> str:
+    return urllib.parse.urlparse(url).path.split("/fanzines/", 1)[-1].strip("/")
+
+
+# ============================================================================================
+# Remove duplicate FIIs.  Two FIIs are duplicates if they point to the same file.
+def RemoveDuplicateIssues(fanacIssueInfo: list[FanzineIssueInfo]) -> list[FanzineIssueInfo]:
+    deDupDict: dict[str, FanzineIssueInfo]={}
+    for fz in fanacIssueInfo:
+        deDupDict[fz.DirURL+fz.PageFilename]=fz
+    return [x for x in deDupDict.values()]
+
+
+# ============================================================================================
+# A sharded crawl splits the fanac.org directories among several machines.
+# Each directory is assigned to a shard by a hash of its name.  We use md5 rather than hash() since hash() is randomized for each Python process
+#   and every worker must agree on the partition.
+# shard is (k, N) with k running from 1 to N
+def InShard(dirname: str, shard: tuple[int, int]) -> bool:
+    k, n=shard
+    digest=hashlib.md5(dirname.removesuffix("/").encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % n == k-1
+
+
+# Interpret a shard specification of the form "k/N" (or "k of N").  Returns None if the spec is empty or uninterpretable.
+def ParseShardSpec(spec: str) -> tuple[int, int]|None:
+    m=re.match(r"^\s*([0-9]+)\s*(?:/|of)\s*([0-9]+)\s*$", spec, flags=re.IGNORECASE)
+    if m is None:
+        if spec.strip() != "":
+            LogError(f"ParseShardSpec: Can't interpret shard specification '{spec}'. It should look like '2/5'")
+        return None
+    k, n=int(m.groups()[0]), int(m.groups()[1])
+    if n < 1 or k < 1 or k > n:
+        LogError(f"ParseShardSpec: Shard specification '{spec}' is out of range")
+        return None
+    return k, n
+
+
+# Write the partial result of a sharded crawl
+def WriteShardFile(filename: str, fanacIssueInfo: list[FanzineIssueInfo]) -> None:
+    Log(f"Writing {len(fanacIssueInfo)} issues to shard file {filename}", timestamp=True)
+    import jsonpickle
+    with open(filename, "w+") as f:
+        f.write(jsonpickle.encode(fanacIssueInfo, indent=2))
+
+
+# ============================================================================================
+# Combine the partial results from a sharded crawl into a single list of issues.
+# The merged list is de-duped just as if it had come from a single ReadFanacFanzineIssues() call.  (As always, the series counts are computed by
+#   FanacStatistics.ComputeStatistics().)
+def MergeShardFiles(filenames: list[str]) -> list[FanzineIssueInfo]:
+    Log(f"----Begin merging {len(filenames)} shard files")
+    import jsonpickle
+    fanacIssueInfo: list[FanzineIssueInfo]=[]
+    for filename in sorted(filenames):
+        with open(filename, "r") as f:
+            shardIssues=jsonpickle.decode(f.read())
+        Log(f"   {filename}: {len(shardIssues)} issues")
+        fanacIssueInfo.extend(shardIssues)
+
+    fanacIssueInfo=RemoveDuplicateIssues(fanacIssueInfo)
+    if len(fanacIssueInfo) == 0:
+        LogError("MergeShardFiles: No fanzines found")
+        return []
+
+    Log(f"----Done merging shard files: {len(fanacIssueInfo)} issues")
+    return fanacIssueInfo
+
+
 # ============================================================================================
 def ExtractHeaderCountry(h: str) -> str:
     temp=FindBracketedText(h, "fanac-type")
     if temp[0] is None or len(temp[0]) == 0:
         return ""
 
-    loc=Locale(temp[0])
-    Log(f'ExtractCountry: "{temp[0]}" --> {loc}')
+    loc=ResolveLocale(temp[0])
+    LogNormal(lambda: f'ExtractCountry: "{temp[0]}" --> {loc.CountryName}')
     return loc.CountryName
 
 
 # ============================================================================================
+_parseLock=threading.Lock()
+
+
 # Function to extract fanzine information from a fanac.org fanzine index.html page
-def ReadFanacFanzineIndexPage(fanzineName: str, directoryUrl: str) -> list[FanzineIssueInfo]:
+# If subIndexes is given, the (title, URL) of each row which links to another fanzine index page is appended to it.
+def ReadFanacFanzineIndexPage(fanzineName: str, directoryUrl: str, subIndexes: list[tuple[str, str]]|None=None) -> list[FanzineIssueInfo]:
 
-    Log(f"ReadFanacFanzineIndexPage: {fanzineName}  from  {directoryUrl}")
+    LogNormal(f"ReadFanacFanzineIndexPage: {fanzineName}  from  {directoryUrl}")
 
     # It looks like this is a single level directory.
     count=1
@@ -174,7 +313,7 @@ def ReadFanacFanzineIndexPage(fanzineName: str, directoryUrl: str) -> list[Fanzi
     while count < 3:
         html=FetchFileFromServer(directoryUrl)
         if html is None:
-            LogError(f"\n****ReadFanacFanzineIndexPage: Failed to fetch {directoryUrl}. Not processed.")
+            LogError(f"****ReadFanacFanzineIndexPage: Failed to fetch {directoryUrl}. Not processed.")
             return []
         msg="520: Web server is returning an unknown error"     # This is a message returned when Cloudflare blocked the page. Try again.
         if msg not in html:
@@ -184,25 +323,30 @@ def ReadFanacFanzineIndexPage(fanzineName: str, directoryUrl: str) -> list[Fanzi
         time.sleep(1)
 
     if msg != "":
-       LogError(f"\n****ReadFanacFanzineIndexPage: attempt to load {directoryUrl} returned '{msg}'")
+       LogError(f"****ReadFanacFanzineIndexPage: attempt to load {directoryUrl} returned '{msg}'")
        return []
 
     if html is None or len(html) == 0:
-        LogError(f"\n****ReadFanacFanzineIndexPage: Unable to read {fanzineName}'s html  from  {directoryUrl}")
+        LogError(f"****ReadFanacFanzineIndexPage: Unable to read {fanzineName}'s html  from  {directoryUrl}")
         return []
 
-    # Get the FIP version
-    version=ExtractInvisibleTextInsideFanacComment(html, "fanzine index page V")       #<!-- fanac-fanzine index page V2-->
+    # The pages are fetched concurrently, but parsed one at a time: the log header is global, and parsing gains nothing from threads anyway.
+    # This way, everything logged while parsing a page is logged under that page's header.
+    with _parseLock:
+        LogSetHeader(f"'{directoryUrl}'      '{fanzineName}'")
+
+        # Get the FIP version
+        version=ExtractInvisibleTextInsideFanacComment(html, "fanzine index page V")       #<!-- fanac-fanzine index page V2-->
 
-    if version == "":
-        # Old style
-        return ReadFanacFanzineIndexPageOld(fanzineName, directoryUrl, html)
+        if version == "":
+            # Old style
+            return ReadFanacFanzineIndexPageOld(fanzineName, directoryUrl, html, subIndexes)
 
-    return ReadFanacFanzineIndexPageNew(fanzineName, directoryUrl, html)
+        return ReadFanacFanzineIndexPageNew(fanzineName, directoryUrl, html, subIndexes)
 
 
 #-------------------------------------------------------------
-def ReadFanacFanzineIndexPageNew(fanzineName: str, directoryUrl: str, html: str) -> list[FanzineIssueInfo]:
+def ReadFanacFanzineIndexPageNew(fanzineName: str, directoryUrl: str, html: str, subIndexes: list[tuple[str, str]]|None=None) -> list[FanzineIssueInfo]:
     if html is None:
         return []
 
@@ -237,7 +381,7 @@ def ReadFanacFanzineIndexPageNew(fanzineName: str, directoryUrl: str, html: str)
     # m=re.match(r".*<!-- fanac-table-headers start-->(.*)<!-- fanac-table-rows end-->", html, flags=re.IGNORECASE|re.DOTALL)
     # if m is None:
     #     assert False
-    fiiList=ExtractFanzineIndexTableInfo(directoryUrl, html, editors, country, fztype, alphabetizeIndividually=True, useNewTableStructure=True)
+    fiiList=ExtractFanzineIndexTableInfo(directoryUrl, html, editors, country, fztype, alphabetizeIndividually=True, useNewTableStructure=True, subIndexes=subIndexes)
 
     # Some series pages have the fanzine type "Collection".  If present, we create a series entry for *each* individual issue on the page.
     # Some early series pages have the keyword "Alphabetize individually".  This is the same as being a Collection, but is otherwise ignored.
@@ -260,7 +404,7 @@ def ReadFanacFanzineIndexPageNew(fanzineName: str, directoryUrl: str, html: str)
     return fiiList
 
 
-def ReadFanacFanzineIndexPageOld(fanzineName: str, directoryUrl: str, html: str) -> list[FanzineIssueInfo]:
+def ReadFanacFanzineIndexPageOld(fanzineName: str, directoryUrl: str, html: str, subIndexes: list[tuple[str, str]]|None=None) -> list[FanzineIssueInfo]:
     # By elimination, this must be an ordinary page, so read it.
     # Locate the Index Table on this page.
 
@@ -403,7 +547,7 @@ def ReadFanacFanzineIndexPageOld(fanzineName: str, directoryUrl: str, html: str)
         Log(f"No country found for {fanzineName}")
 
     # Walk the table and extract the fanzines in it
-    fiiList=ExtractFanzineIndexTableInfo(directoryUrl, html, editors, country, fanzineType, alphabetizeIndividually=True)
+    fiiList=ExtractFanzineIndexTableInfo(directoryUrl, html, editors, country, fanzineType, alphabetizeIndividually=True, subIndexes=subIndexes)
 
     # Some old-style pages may have a hand-edited "alphabetize individually" keywork.  Test for that as well as for type=Collection.
     if kwds["Alphabetize individually"] is not None or fanzineType == "Collection":
@@ -427,9 +571,9 @@ def ReadFanacFanzineIndexPageOld(fanzineName: str, directoryUrl: str, html: str)
 #=========================================================================================
 # Read a fanzine's page of any format
 def ExtractFanzineIndexTableInfo(directoryUrl: str, html: str, editor: str, defaultcountry: str, fanzineType: str= "",
-    alphabetizeIndividually: bool=False, useNewTableStructure: bool=False) -> list[FanzineIssueInfo]:
+    alphabetizeIndividually: bool=False, useNewTableStructure: bool=False, subIndexes: list[tuple[str, str]]|None=None) -> list[FanzineIssueInfo]:
 
-    Log(directoryUrl+"\n")
+    LogNormal(directoryUrl+"\n")
 
     # OK, we probably have the issue table.  Now decode it.
     # The first row is the column headers
@@ -478,14 +622,13 @@ def ExtractFanzineIndexTableInfo(directoryUrl: str, html: str, editor: str, defa
 
         rows.append(row)
 
-#TODO: We need to skip entries which point to a directory: E.g., Axe in Irish_Fandom  (This comment appears to be obsolete??)
     # Now we process the table rows, extracting the information for each fanzine issue.
     fiiList: list[FanzineIssueInfo]=[]
     for iRow, tableRow in enumerate(rows):
         # Skip null rows
         if len(tableRow) == 0 or (len(tableRow) == 1 and len(tableRow[0].Text.strip()) == 0):
             continue
-        Log(f"   {tableRow=}")
+        LogVerbose(lambda: f"   {tableRow=}")
 
         # The first element of the table sometimes comes in with embedded non-breaking spaces which must be turned to real spaces.
         # (They were apparently put there deliberately some time in the past.)
@@ -494,16 +637,13 @@ def ExtractFanzineIndexTableInfo(directoryUrl: str, html: str, editor: str, defa
 
         # We need to extract the name, url, year, and vol/issue info for each fanzine
         # We have to treat the Text column specially, since it contains the critical href we need.
-        fi=DecodeTableRow(columnHeaders, tableRow, iRow, defaultcountry, editor, fanzineType, alphabetizeIndividually, directoryUrl)
+        fi=DecodeTableRow(columnHeaders, tableRow, iRow, defaultcountry, editor, fanzineType, alphabetizeIndividually, directoryUrl, subIndexes)
         if fi is None:
             continue
 
         # Append it and log it.
-        Log(f"   {fi=}")
-        urlT=""
-        if fi.PageFilename == "":
-            urlT="*No PageName*"
-        Log(f"Row {iRow}  '{fi.IssueName}'  [{fi.FIS}]  {urlT}")
+        LogVerbose(lambda: f"   {fi=}")
+        LogNormal(lambda: f"Row {iRow}  '{fi.IssueName}'  [{fi.FIS}]  {'*No PageName*' if fi.PageFilename == '' else ''}")
         fiiList.append(fi)
 
     return fiiList
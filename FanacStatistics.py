@@ -0,0 +1,145 @@
+from typing import Callable
+from dataclasses import dataclass, field
+from collections import defaultdict
+
+import os
+import math
+import datetime
+
+from FanzineIssueSpecPackage import FanzineIssueInfo, FanzineCounts, FanzineDate
+from ReportOutput import OpenReport
+from Log import Log
+
+
+#================================================================================
+# All the aggregate statistics about the list of fanzine issues.
+# This is filled in by a single sweep through the list (see ComputeStatistics()) and then all the statistics reports are rendered from it,
+#   so the numbers in the various reports are guaranteed to agree.
+@dataclass
+class CatalogStatistics:
+    Global: FanzineCounts=field(default_factory=FanzineCounts)      # Issues, pages and PDFs for everything with a DirURL
+    Newszines: FanzineCounts=field(default_factory=FanzineCounts)   # Issues, pages and PDFs for newszines
+
+    TitleCount: int=0               # Number of distinct series names
+    NewszineTitleCount: int=0       # Number of distinct newszine series names
+
+    # Keyed by year (None for undated).  The value is a list of (issue name, date, DirURL, PageFilename) tuples for the year's report
+    Years: defaultdict[int|None, list[tuple[str, FanzineDate, str, str]]]=field(default_factory=lambda: defaultdict(list))
+
+    # Keyed by decade: 190, 191, ...199, 200...  (0 for undated)
+    IssueDecadeCount: dict[int, int]=field(default_factory=dict)
+    SeriesDecadeCount: dict[int, set[str]]=field(default_factory=dict)
+
+    # Keyed by series name.  SeriesLines holds the per-issue lines for the counts diagnostics file
+    SeriesCounts: dict[str, FanzineCounts]=field(default_factory=dict)
+    SeriesLines: dict[str, list[str]]=field(default_factory=dict)
+
+
+    def TopCountText(self) -> str:
+        return f"{self.Global.Issuecount:,} issues consisting of {self.Global.Pagecount:,} pages."
+
+    def NewszineCountText(self) -> str:
+        return f"{self.Newszines.Issuecount:,} issues consisting of {self.Newszines.Pagecount:,} pages."
+
+    def SummaryLines(self) -> list[str]:
+        return [f"All fanzines: Titles: {self.TitleCount:,}  Issues: {self.Global.Issuecount:,}  Pages: {self.Global.Pagecount:,}  PDFs: {self.Global.Pdfcount:,}",
+                f"Newszines:  Titles: {self.NewszineTitleCount:,}  Issues: {self.Newszines.Issuecount:,}  Pages: {self.Newszines.Pagecount:,}  PDFs: {self.Newszines.Pdfcount:,}",
+                f"All PDF fanzines: Issues: {self.Global.Pdfcount:,}   Pages: {self.Global.Pdfpagecount:,}"]
+
+
+#================================================================================
+# Make one pass through the list of issues computing everything in CatalogStatistics.
+# The series' Counts are also set here.
+#   fIsNewszine decides if an issue belongs to a newszine
+def ComputeStatistics(fanacIssueList: list[FanzineIssueInfo], fIsNewszine: Callable[[FanzineIssueInfo], bool]) -> CatalogStatistics:
+    Log("Compute the statistics", timestamp=True)
+    stats=CatalogStatistics()
+    titles: set[str]=set()
+    newszineTitles: set[str]=set()
+
+    for fz in fanacIssueList:
+        isPdf=os.path.splitext(fz.PageFilename)[1].lower() == ".pdf"
+
+        # Per-year lists
+        stats.Years[fz.FIS.FD.Year].append((fz.IssueName, fz.FIS.FD, fz.DirURL, fz.PageFilename))
+
+        # Global and per-series counts
+        seriesCounts=stats.SeriesCounts.get(fz.SeriesName, FanzineCounts())
+        lines=stats.SeriesLines.setdefault(fz.SeriesName, [])
+        if fz.DirURL != "":
+            stats.Global+=fz.Pagecount
+            seriesCounts+=fz.Pagecount
+            if isPdf:
+                stats.Global.Pdfcount+=1
+                stats.Global.Pdfpagecount+=fz.Pagecount
+                seriesCounts.Pdfcount+=1
+                seriesCounts.Pdfpagecount+=fz.Pagecount
+            lines.append(f"      {fz.Pagecount:<4} {fz.IssueName}")
+        else:
+            lines.append(f"Skipped for empty DirURL: {fz.SeriesName}/{fz.IssueName}")
+        stats.SeriesCounts[fz.SeriesName]=seriesCounts
+
+        # Newszines
+        titles.add(fz.SeriesName.casefold())
+        if fIsNewszine(fz):
+            newszineTitles.add(fz.SeriesName.casefold())
+            if fz.PageFilename != "":
+                stats.Newszines+=fz
+                if isPdf:
+                    stats.Newszines.Pdfcount+=1
+
+        # Decades
+        year=0
+        if fz.FIS is not None and fz.FIS.Year is not None:
+            year=fz.FIS.Year
+        decade=math.floor(year/10)
+        stats.IssueDecadeCount[decade]=stats.IssueDecadeCount.get(decade, 0)+1
+        stats.SeriesDecadeCount.setdefault(decade, set()).add(fz.SeriesName)
+
+    stats.TitleCount=len(titles)
+    stats.NewszineTitleCount=len(newszineTitles)
+
+    # Hang the totals on the series
+    for fz in fanacIssueList:
+        fz.Series.Counts=stats.SeriesCounts[fz.SeriesName]
+
+    return stats
+
+
+#================================================================================
+def WriteStatistics(filename: str, stats: CatalogStatistics, timestamp: str) -> None:
+    with OpenReport(filename, "w+") as f:
+        print(timestamp)
+        for line in stats.SummaryLines():
+            print(line, file=f)
+        yearcounts: list[tuple[int, int]]=[]
+        for year, val in stats.Years.items():
+            if year is None:
+                year=0
+            yearcounts.append((year, len(val)))
+        yearcounts.sort(key=lambda x: x[0])
+        for year, count in yearcounts:
+            print(f"{year} Fanzines: {count}", file=f)
+
+
+def WriteDecadeCounts(filename: str, stats: CatalogStatistics) -> None:
+    with OpenReport(filename, "w+") as f:
+        f.write(str(datetime.date.today())+"\n")
+        f.write("Counts of fanzines and fanzine series by decade\n\n")
+        f.write(" Decade  Series  Issues\n")
+        decades=sorted([x for x in stats.IssueDecadeCount.keys()])
+        for decade in decades:
+            counts=f"{len(stats.SeriesDecadeCount[decade]):5}   {stats.IssueDecadeCount[decade]:5}"
+            if decade == 0:
+                print(f"undated   {counts}", file=f)
+            else:
+                print(f"  {decade:3}0s   {counts}", file=f)
+
+
+def WriteCountsDiagnostics(filename: str, stats: CatalogStatistics) -> None:
+    with OpenReport(filename, "w") as f:
+        for seriesName, lines in stats.SeriesLines.items():
+            countsSeries=stats.SeriesCounts[seriesName]
+            print(f"{seriesName}      {countsSeries.Issuecount} issues   {countsSeries.Pagecount} pages  ", file=f)
+            for line in lines:
+                print(line, file=f)
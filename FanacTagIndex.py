@@ -0,0 +1,71 @@
+from collections import defaultdict
+
+from FanzineIssueSpecPackage import FanzineIssueInfo
+
+
+#================================================================================
+# An index of the tags (newszine, apazine, collection, ...) which apply to each fanzine series.
+# Tags come from the series pages themselves (the fanzine type and any tags on the issues) and from control lists such as control-newszines.txt.
+# Tags are stored on the series (by casefolded series name), so deciding if an issue has a tag is a single dictionary lookup.
+class TagIndex:
+    def __init__(self):
+        self._seriesTags: defaultdict[str, set[str]]=defaultdict(set)      # Casefolded series name --> set of tags
+        self._tagSeries: defaultdict[str, set[str]]=defaultdict(set)       # Tag --> set of casefolded series names
+
+
+    # Tags are always lower case
+    def AddSeriesTag(self, seriesName: str, tag: str) -> None:
+        seriesName=seriesName.casefold()
+        tag=tag.lower()
+        self._seriesTags[seriesName].add(tag)
+        self._tagSeries[tag].add(seriesName)
+
+
+    # Add a tag to every series in a list of series names.  (E.g., the contents of control-newszines.txt)
+    def AddSeriesList(self, seriesNames: list[str], tag: str) -> None:
+        for seriesName in seriesNames:
+            self.AddSeriesTag(seriesName, tag)
+
+
+    # Does this issue's series have the tag?
+    def HasTag(self, fz: FanzineIssueInfo, tag: str) -> bool:
+        return self.SeriesHasTag(fz.SeriesName, tag)
+
+    def SeriesHasTag(self, seriesName: str, tag: str) -> bool:
+        tags=self._seriesTags.get(seriesName.casefold())
+        return tags is not None and tag in tags
+
+
+    # The issue's fanzine type, except that an issue of a series tagged as a newszine (e.g., by control-newszines.txt) is a newszine
+    def FanzineType(self, fz: FanzineIssueInfo) -> str:
+        if self.HasTag(fz, "newszine"):
+            return "newszine"
+        return fz.FanzineType
+
+
+    # Return the tags of a series
+    def SeriesTags(self, seriesName: str) -> set[str]:
+        return set(self._seriesTags.get(seriesName.casefold(), set()))
+
+    # Return the (casefolded) names of all series with the tag
+    def SeriesWithTag(self, tag: str) -> set[str]:
+        return set(self._tagSeries.get(tag.lower(), set()))
+
+    # Return the (casefolded) names of all series in the index, tagged or not
+    def AllSeries(self) -> set[str]:
+        return set(self._seriesTags.keys())
+
+
+#================================================================================
+# Build the tag index with a single pass over the issue list
+# Each issue contributes its series' fanzine type and any tags on the issue.
+def BuildTagIndex(fanacIssueList: list[FanzineIssueInfo]) -> TagIndex:
+    index=TagIndex()
+    for fz in fanacIssueList:
+        seriesName=fz.SeriesName.casefold()
+        index._seriesTags[seriesName]        # Make sure every series appears, even if untagged
+        if fz.FanzineType.strip() != "":
+            index.AddSeriesTag(seriesName, fz.FanzineType.strip())
+        for tag in fz.Taglist:
+            index.AddSeriesTag(seriesName, tag)
+    return index
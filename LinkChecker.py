@@ -0,0 +1,161 @@
+from collections import defaultdict
+
+import os
+import json
+import time
+import threading
+
+from FanzineIssueSpecPackage import FanzineIssueInfo
+from Settings import Settings
+from ReportOutput import OpenReport
+from Log import Log, LogError
+from LogLevels import LogNormal, LogVerbose
+
+
+#================================================================================
+# Check that every issue URL and series index page URL in the catalogue actually loads.
+# Links are checked concurrently with pooled HEAD requests, falling back to a one-byte ranged GET for servers which don't handle HEAD.
+# Parameters:
+#   Check Links               -- turns the link check on
+#   Link Check Threads        -- number of concurrent requests (default 8)
+#   Link Check Rate           -- maximum requests per second, over all threads (default 10)
+#   Link Check TTL Hours      -- a link found good is not rechecked for this long (default 168, i.e., a week).  Broken links are rechecked every run.
+#   Link Check Cache          -- the file the results are kept in between runs (default "Link check cache.json")
+#   Link Check Server         -- if set, (e.g., http://localhost:8000) the fanac.org part of each URL is replaced by this, so a local stand-in server
+#                                  can be used for testing
+def CheckLinks(fanacIssueList: list[FanzineIssueInfo], reportFilePath: str, rootDir: str) -> None:
+    Log("Checking links", timestamp=True)
+
+    # Collect the URLs to be checked and who refers to them
+    referrers: defaultdict[str, list[tuple[str, str]]]=defaultdict(list)     # URL --> list of (series name, issue name or "" for the series page)
+    for fz in fanacIssueList:
+        if fz.URL.startswith("http"):
+            referrers[fz.URL].append((fz.SeriesName, fz.IssueName))
+        if fz.Series is not None and fz.Series.DirURL.startswith("http") and len(referrers[fz.Series.DirURL]) == 0:
+            referrers[fz.Series.DirURL].append((fz.SeriesName, ""))
+
+    cache=LinkCache(os.path.join(rootDir, Settings().Get("Link Check Cache", "Link check cache.json")),
+                    ttl=3600*float(Settings().Get("Link Check TTL Hours", "168")))
+    toCheck=[url for url in referrers.keys() if cache.Get(url) is None]
+    Log(f"   {len(referrers):,} links, of which {len(toCheck):,} need to be checked")
+
+    checker=LinkCheckerSession(server=Settings().Get("Link Check Server", ""),
+                               threads=int(Settings().Get("Link Check Threads", "8")),
+                               rate=float(Settings().Get("Link Check Rate", "10")))
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=checker.Threads) as executor:
+        for url, status in zip(toCheck, executor.map(checker.Check, toCheck)):
+            cache.Put(url, status)
+    cache.Save()
+
+    # Write the report of broken links, grouped by series
+    broken: defaultdict[str, list[str]]=defaultdict(list)
+    count=0
+    for url, refs in referrers.items():
+        status=cache.Get(url, ignoreTTL=True)
+        if status is None or LinkOK(status):
+            continue
+        count+=1
+        for seriesName, issueName in refs:
+            broken[seriesName].append(f"   {issueName if issueName != '' else '(series index page)'}   {url}   [{status}]")
+
+    with OpenReport(os.path.join(reportFilePath, "Broken links.txt"), "w", encoding="utf-8") as f:
+        f.write(f"{count:,} broken links out of {len(referrers):,}\n")
+        for seriesName in sorted(broken.keys(), key=lambda x: x.casefold()):
+            f.write(f"\n{seriesName}\n")
+            f.writelines(line+"\n" for line in broken[seriesName])
+    Log(f"Link check complete: {count:,} broken links", timestamp=True)
+
+
+# The status is an HTTP status code or the name of the exception raised
+def LinkOK(status: int|str) -> bool:
+    return isinstance(status, int) and status < 400
+
+
+#================================================================================
+# The results of previous link checks
+class LinkCache:
+    def __init__(self, filename: str, ttl: float):
+        self.Filename: str=filename
+        self._ttl: float=ttl
+        self._results: dict[str, list]={}       # URL --> [status, time checked]
+        if os.path.exists(filename):
+            try:
+                with open(filename, "r", encoding="utf-8") as f:
+                    self._results=json.load(f)
+            except (OSError, ValueError) as e:
+                LogError(f"LinkCache: unable to read {filename}: {e}")
+
+    # Return the cached status, or None if the link needs to be checked
+    def Get(self, url: str, ignoreTTL: bool=False) -> int|str|None:
+        result=self._results.get(url)
+        if result is None:
+            return None
+        status, checked=result
+        if not ignoreTTL and (not LinkOK(status) or time.time()-checked > self._ttl):
+            return None
+        return status
+
+    def Put(self, url: str, status: int|str) -> None:
+        self._results[url]=[status, time.time()]
+
+    def Save(self) -> None:
+        tempname=self.Filename+".tmp"
+        with open(tempname, "w", encoding="utf-8") as f:
+            json.dump(self._results, f)
+        os.replace(tempname, self.Filename)
+
+
+#================================================================================
+# A pool of HTTP connections shared by the checking threads, with a limit on the overall request rate
+class LinkCheckerSession:
+    def __init__(self, server: str="", threads: int=8, rate: float=10):
+        import requests     # Imported here so that runs which don't check links don't pay for loading it
+        self.Threads: int=max(1, threads)
+        self._server: str=server.rstrip("/")
+        self._session=requests.Session()
+        adapter=requests.adapters.HTTPAdapter(pool_connections=self.Threads, pool_maxsize=self.Threads)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._interval: float=1/rate if rate > 0 else 0
+        self._lock=threading.Lock()
+        self._next: float=0
+
+
+    # Wait until the rate limit allows another request
+    def Throttle(self) -> None:
+        with self._lock:
+            now=time.monotonic()
+            wait=self._next-now
+            self._next=max(now, self._next)+self._interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+    # Point a fanac.org URL at the stand-in server, if there is one
+    def Rewrite(self, url: str) -> str:
+        if self._server == "":
+            return url
+        for prefix in ["https://www.fanac.org", "https://fanac.org", "http://www.fanac.org", "http://fanac.org"]:
+            if url.startswith(prefix):
+                return self._server+url[len(prefix):]
+        return url
+
+
+    def Check(self, url: str) -> int|str:
+        import requests
+        target=self.Rewrite(url)
+        try:
+            self.Throttle()
+            h=self._session.head(target, timeout=10, allow_redirects=True)
+            if h.status_code < 400:
+                LogVerbose(lambda: f"   {url}: {h.status_code}")
+                return h.status_code
+            # Some servers refuse or mishandle HEAD, so try fetching the first byte before deciding the link is broken
+            self.Throttle()
+            with self._session.get(target, timeout=10, allow_redirects=True, headers={"Range": "bytes=0-0"}, stream=True) as g:
+                LogNormal(lambda: f"   {url}: HEAD {h.status_code}, GET {g.status_code}")
+                return g.status_code
+        except requests.RequestException as e:
+            LogNormal(lambda: f"   {url}: {type(e).__name__}")
+            return type(e).__name__
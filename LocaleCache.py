@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+import sys
+
+from Locale import Locale
+
+
+#================================================================================
+# A cache of resolved locations.
+# Each distinct location text ("Melbourne, Australia", "UK", ...) is resolved by Locale once, and each distinct country maps to a single shared,
+#   immutable ResolvedLocale carrying everything the readers and the reports need from it, so nothing is resolved or re-derived per issue.
+@dataclass(frozen=True)
+class ResolvedLocale:
+    CountryName: str        # As returned by Locale
+    SortKey: str            # For sorting by country
+    DisplayName: str        # Capitalized for display in the reports
+
+
+# Resolve a raw location text (e.g., from a fanac-type header)
+@lru_cache(maxsize=None)
+def ResolveLocale(locationText: str) -> ResolvedLocale:
+    return ResolveCountry(Locale(locationText.strip()).CountryName)
+
+
+# Get the shared ResolvedLocale for a country name which has already been resolved (e.g., fz.Locale.CountryName)
+@lru_cache(maxsize=None)
+def ResolveCountry(countryName: str) -> ResolvedLocale:
+    countryName=sys.intern(countryName)
+    return ResolvedLocale(CountryName=countryName, SortKey=countryName.lower(), DisplayName=CapIt(countryName))
+
+
+# -------------------------------------------------------------------------
+# Take a string which is lower case and turn it to City, State, US sort of capitalization -- used in calls to WriteTable
+def CapIt(s: str) -> str:
+    if len(s) == 0:
+        return s
+    if len(s) == 2:
+        return s.upper()
+    ret=""
+    splits=s.split()
+    for split in splits:
+        if ret:
+            ret+=" "
+        ret+=split[0].upper()+split[1:]
+    return ret
@@ -0,0 +1,49 @@
+from typing import Callable
+
+from Log import Log
+from Settings import Settings
+
+
+#================================================================================
+# Level-gated logging for the high-volume messages (per-row, per-fetch) in the readers.
+# The level is set by the parameters.txt value "Log Level":
+#   quiet   -- only the messages which are always logged via Log() and LogError()
+#   normal  -- also log a line per page fetched and per issue found
+#   verbose -- also log the full contents of each table row and issue  (This is the default.)
+# The message may be passed as a lambda so that the f-string (and the reprs it contains) is only built if the message is actually logged.
+
+Quiet=0
+Normal=1
+Verbose=2
+
+_levelNames: dict[str, int]={"quiet": Quiet, "normal": Normal, "verbose": Verbose}
+_level: int|None=None
+
+
+def LogLevel() -> int:
+    global _level
+    if _level is None:      # Look it up the first time it is needed, by which time parameters.txt has been loaded
+        _level=_levelNames.get(Settings().Get("Log Level", "verbose").strip().lower(), Verbose)
+    return _level
+
+
+# Force the level to be re-read from the parameters the next time it is needed (or set it explicitly)
+def ResetLogLevel(level: int|None=None) -> None:
+    global _level
+    _level=level
+
+
+def LogAtLevel(level: int, msg: str|Callable[[], str], **kwargs) -> None:
+    if level > LogLevel():
+        return
+    if callable(msg):
+        msg=msg()
+    Log(msg, **kwargs)
+
+
+def LogNormal(msg: str|Callable[[], str], **kwargs) -> None:
+    LogAtLevel(Normal, msg, **kwargs)
+
+
+def LogVerbose(msg: str|Callable[[], str], **kwargs) -> None:
+    LogAtLevel(Verbose, msg, **kwargs)
@@ -0,0 +1,111 @@
+from collections import defaultdict
+
+import os
+import re
+
+from FanzineIssueSpecPackage import FanzineIssueInfo
+from ReportRenderer import RenderReports, HTMLTableReport, TxtTableReport
+from ReportOutput import OpenReport
+from Log import Log
+from HelpersPackage import Pluralize
+
+
+#================================================================================
+# An index of the APA mailings: APA --> mailing number --> the issues (contributions) in that mailing.
+# The mailings come from the Mailings column of the index pages (see ExtractMailings()), which holds entries like "FAPA 23" or "SAPS 12A".
+class MailingIndex:
+    def __init__(self):
+        self.APAs: defaultdict[str, defaultdict[str, list[FanzineIssueInfo]]]=defaultdict(lambda: defaultdict(list))
+
+    def Add(self, mailing: str, fz: FanzineIssueInfo) -> None:
+        apa, number=SplitMailing(mailing)
+        self.APAs[apa][number].append(fz)
+
+    # The mailing numbers of an APA in numerical order
+    def Mailings(self, apa: str) -> list[str]:
+        return sorted(self.APAs[apa].keys(), key=MailingSortKey)
+
+
+# Build the mailing index with a single pass over the issue list
+def BuildMailingIndex(fanacIssueList: list[FanzineIssueInfo]) -> MailingIndex:
+    index=MailingIndex()
+    for fz in fanacIssueList:
+        for mailing in fz.Mailings:
+            if mailing.strip() != "":
+                index.Add(mailing, fz)
+    return index
+
+
+# Split "FAPA 23" into ("FAPA", "23").  A mailing without a recognizable number is filed under the APA "" with the whole text as its number.
+def SplitMailing(mailing: str) -> tuple[str, str]:
+    m=re.match(r"^(.*?)\s+([0-9]+[a-zA-Z]*)$", mailing.strip())
+    if m is None:
+        return "", mailing.strip()
+    return m.group(1).strip(), m.group(2)
+
+
+def MailingSortKey(number: str) -> tuple[int, str]:
+    m=re.match(r"^([0-9]+)(.*)$", number)
+    if m is None:
+        return 0, number
+    return int(m.group(1)), m.group(2)
+
+
+#================================================================================
+# Write the per-APA reports in reportFilePath/APAs (an HTML and a text listing of each APA's mailings and their contents)
+#   and a CSV of all the contributions.
+# The APAs are independent, so their reports are rendered concurrently.
+def WriteMailingReports(index: MailingIndex, reportFilePath: str, csvFilename: str) -> None:
+    apaPath=os.path.join(reportFilePath, "APAs")
+    if not os.path.isdir(apaPath):
+        os.mkdir(apaPath)
+    apas=sorted([apa for apa in index.APAs.keys() if apa != ""], key=lambda x: x.casefold())
+    Log(f"Writing mailing reports for {len(apas)} APAs", timestamp=True)
+
+    def WriteAPA(apa: str) -> None:
+        # Each contribution is a copy of the issue with the mailing stored in the Temp member, since an issue can be in more than one mailing
+        contributions: list[FanzineIssueInfo]=[]
+        for number in index.Mailings(apa):
+            for fz in index.APAs[apa][number]:
+                fz2=fz.DeepCopy()
+                fz2.Temp=f"{apa} {number}"
+                contributions.append(fz2)
+
+        filename=re.sub(r'[\\/:*?"<>|]', "_", apa)
+        RenderReports(contributions,
+                      [HTMLTableReport(os.path.join(apaPath, filename+".html"),
+                                       fGroupText=lambda fz: fz.Temp,
+                                       fRowText=lambda fz: fz.IssueName,
+                                       fRowAnnot=lambda fz: f"ed. {fz.Editor}&nbsp;&nbsp;&nbsp;{Pluralize(fz.Pagecount, 'page')}",
+                                       title=f"{apa} mailings on Fanac.org"),
+                       TxtTableReport(os.path.join(apaPath, filename+".txt"),
+                                      fGroupText=lambda fz: fz.Temp,
+                                      fRowText=lambda fz: f"{fz.IssueName}  (ed. {fz.Editor}, {Pluralize(fz.Pagecount, 'page')})")])
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(WriteAPA, apas))
+
+    # The CSV is written row by row straight from the index
+    import csv
+    with OpenReport(csvFilename, "w", newline="", encoding="utf-8") as csvfile:
+        filewriter=csv.writer(csvfile, delimiter=',', quotechar='"', escapechar=r'£', quoting=csv.QUOTE_MINIMAL)
+        filewriter.writerow(["APA", "Mailing", "IssueName", "SeriesName", "Editor", "Date", "PageCount", "Country", "URL", "Mailings"])
+        for apa in [""]+apas:
+            if apa not in index.APAs:
+                continue
+            for number in index.Mailings(apa):
+                for fz in index.APAs[apa][number]:
+                    filewriter.writerow([apa, number, fz.IssueName, fz.SeriesName, fz.Editor, fz.FIS.DateStr, fz.Pagecount, fz.Locale.CountryName, fz.URL, "; ".join(fz.Mailings)])
+
+    # A summary of what is in each APA
+    with OpenReport(os.path.join(apaPath, "APA summary.txt"), "w", encoding="utf-8") as f:
+        for apa in apas:
+            mailings=index.Mailings(apa)
+            contributions=sum(len(index.APAs[apa][number]) for number in mailings)
+            f.write(f"{apa}: {Pluralize(len(mailings), 'mailing')} ({mailings[0]}-{mailings[-1]}), {Pluralize(contributions, 'contribution')}\n")
+        if "" in index.APAs:
+            f.write(f"\nMailings not recognized: {', '.join(index.Mailings(''))}\n")
+
+    count=sum(len(issues) for mailings in index.APAs.values() for issues in mailings.values())
+    Log(f"Mailing reports complete: {count:,} contributions", timestamp=True)
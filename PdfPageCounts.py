@@ -0,0 +1,254 @@
+import os
+import re
+import json
+
+from FanzineIssueSpecPackage import FanzineIssueInfo
+from Settings import Settings
+from Log import Log, LogError
+from LogLevels import LogNormal
+
+
+#================================================================================
+# Fill in the page counts of PDF issues which don't have one by reading the count from the PDF itself.
+# Only the parts of the PDF which are needed are fetched (using HTTP range requests):
+#   * If the PDF is linearized, the page count is in the first kilobyte.
+#   * Otherwise, the trailer at the end of the file points to the cross-reference table, which locates the document catalog,
+#       which locates the root of the page tree, which holds the page count.
+# If any of that fails (e.g., the PDF uses a compressed cross-reference stream, or the server ignores range requests) the whole PDF is read instead,
+#   unless it is bigger than "PDF Page Count Max Download MB".
+# Results are cached by URL and ETag (or Last-Modified and length, if the server gives no ETag), so each PDF is read only once unless it changes.
+#   That includes PDFs whose page count couldn't be found (which are cached with a count of None); only those which couldn't be fetched at all
+#   are tried again next time.
+# Parameters:
+#   Fill In PDF Page Counts   -- turns this on
+#   PDF Page Count Threads    -- number of PDFs read concurrently (default 8)
+#   PDF Page Count Cache      -- the file the results are kept in between runs (default "PDF page counts.json")
+#   PDF Page Count Max Download MB -- the biggest PDF which will be read whole (default 100)
+def FillInPdfPageCounts(fanacIssueList: list[FanzineIssueInfo], rootDir: str) -> None:
+    missing=[fz for fz in fanacIssueList if fz.Pagecount == 0 and os.path.splitext(fz.PageFilename)[1].lower() == ".pdf" and fz.URL.startswith("http")]
+    if len(missing) == 0:
+        return
+    Log(f"Reading page counts for {len(missing):,} PDFs with no page count", timestamp=True)
+
+    cacheFilename=os.path.join(rootDir, Settings().Get("PDF Page Count Cache", "PDF page counts.json"))
+    cache: dict[str, list]={}       # URL --> [version, page count or None]
+    if os.path.exists(cacheFilename):
+        try:
+            with open(cacheFilename, "r", encoding="utf-8") as f:
+                cache=json.load(f)
+        except (OSError, ValueError) as e:
+            LogError(f"FillInPdfPageCounts: unable to read {cacheFilename}: {e}")
+
+    import requests     # Imported here so that runs which don't need it don't pay for loading it
+    session=requests.Session()
+    threads=max(1, int(Settings().Get("PDF Page Count Threads", "8")))
+    adapter=requests.adapters.HTTPAdapter(pool_connections=threads, pool_maxsize=threads)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    maxBytes=int(float(Settings().Get("PDF Page Count Max Download MB", "100"))*1024*1024)
+
+    # Returns the PDF's version and page count, or a version of "" if it couldn't be fetched
+    def Work(url: str) -> tuple[str, int|None]:
+        version=""
+        try:
+            h=session.head(url, timeout=10, allow_redirects=True)
+            if not 200 <= h.status_code < 300:        # Not cached, so that a broken link is tried again next time
+                LogError(f"FillInPdfPageCounts: unable to read {url}: status {h.status_code}")
+                return "", None
+            version=h.headers.get("ETag", "") or f"{h.headers.get('Last-Modified', '')}/{h.headers.get('Content-Length', '')}"
+            cached=cache.get(url)
+            if cached is not None and cached[0] == version and version != "/":
+                return version, cached[1]
+            return version, RemotePdf(session, url, maxBytes).PageCount()
+        except requests.RequestException as e:
+            LogError(f"FillInPdfPageCounts: unable to read {url}: {e}")
+            return "", None
+        except (ValueError, IndexError, OverflowError) as e:        # A malformed PDF
+            LogError(f"FillInPdfPageCounts: unable to find the page count of {url}: {e}")
+            return version, None
+
+    urls=sorted(set(fz.URL for fz in missing))
+    counts: dict[str, int]={}
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for url, (version, count) in zip(urls, executor.map(Work, urls)):
+            if version == "":
+                continue
+            cache[url]=[version, count]
+            if count is not None:
+                counts[url]=count
+
+    filled=0
+    for fz in missing:
+        count=counts.get(fz.URL)
+        if count is not None and count > 0:
+            fz.Pagecount=count
+            filled+=1
+            LogNormal(lambda: f"   {fz.IssueName}: {count} pages")
+
+    tempname=cacheFilename+".tmp"
+    with open(tempname, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tempname, cacheFilename)
+    Log(f"Page counts filled in for {filled:,} of {len(missing):,} PDFs", timestamp=True)
+
+
+#================================================================================
+# A PDF on a web server, read piecemeal
+class RemotePdf:
+    def __init__(self, session, url: str, maxBytes: int):
+        self._session=session
+        self._url: str=url
+        self._maxBytes: int=maxBytes    # The most that will be downloaded in one request
+        self._full: bytes|None=None     # The whole file, once it has had to be read
+
+
+    # GET the PDF (or a range of it), streaming the reply so that no more than maxBytes is ever held.
+    # Returns the status and the contents, or None for the contents if there were more than maxBytes of them.
+    def Get(self, timeout: float, headers: dict[str, str]|None=None) -> tuple[int, bytes|None]:
+        with self._session.get(self._url, timeout=timeout, headers=headers, stream=True) as h:
+            length=h.headers.get("Content-Length", "")
+            if length.isdigit() and int(length) > self._maxBytes:
+                LogNormal(lambda: f"   {self._url} is too big to read ({int(length):,} bytes)")
+                return h.status_code, None
+            chunks: list[bytes]=[]
+            size=0
+            for chunk in h.iter_content(chunk_size=65536):
+                size+=len(chunk)
+                if size > self._maxBytes:
+                    LogNormal(lambda: f"   {self._url} is too big to read (more than {self._maxBytes:,} bytes)")
+                    return h.status_code, None
+                chunks.append(chunk)
+            return h.status_code, b"".join(chunks)
+
+
+    # Fetch bytes start..end (inclusive).  If the server ignores the range and sends the whole file, keep it.
+    def Range(self, start: int, end: int) -> bytes|None:
+        if self._full is not None:
+            return self._full[start:end+1]
+        status, content=self.Get(30, headers={"Range": f"bytes={start}-{end}"})
+        if status == 206:
+            return content
+        if status == 200 and content is not None:
+            self._full=content
+            return self._full[start:end+1]
+        return None
+
+    def Tail(self, length: int) -> bytes|None:
+        if self._full is not None:
+            return self._full[-length:]
+        status, content=self.Get(30, headers={"Range": f"bytes=-{length}"})
+        if status == 206:
+            return content
+        if status == 200 and content is not None:
+            self._full=content
+            return self._full[-length:]
+        return None
+
+    def Full(self) -> bytes|None:
+        if self._full is None:
+            status, content=self.Get(120)
+            if status != 200:
+                return None
+            self._full=content
+        return self._full
+
+
+    def PageCount(self) -> int|None:
+        count=self.PageCountFromRanges()
+        if count is not None:
+            return count
+        LogNormal(lambda: f"   Reading all of {self._url}")
+        full=self.Full()
+        if full is None:
+            return None
+        return PageCountFromBytes(full)
+
+
+    # Follow the trail from the trailer to the page tree root, reading only what is needed.  Returns None if the trail can't be followed.
+    def PageCountFromRanges(self) -> int|None:
+        head=self.Range(0, 1023)
+        if head is None:
+            return None
+        m=re.search(rb"/Linearized.*?/N\s+(\d+)", head, flags=re.DOTALL)
+        if m is not None:
+            return int(m.group(1))
+
+        tail=self.Tail(2048)
+        if tail is None:
+            return None
+        m=re.findall(rb"startxref\s+(\d+)", tail)
+        if len(m) == 0:
+            return None
+        xrefOffset=int(m[-1])
+
+        # Only a classic cross-reference table is handled here
+        xref=self.Range(xrefOffset, xrefOffset+65535)
+        if xref is None or not xref.startswith(b"xref"):
+            return None
+        loc=xref.find(b"trailer")
+        if loc < 0:
+            return None
+        offsets=ParseXrefTable(xref[:loc])
+        m=re.search(rb"/Root\s+(\d+)\s+\d+\s+R", xref[loc:])
+        if m is None:
+            return None
+
+        root=self.ReadObject(offsets, int(m.group(1)))
+        if root is None:
+            return None
+        m=re.search(rb"/Pages\s+(\d+)\s+\d+\s+R", root)
+        if m is None:
+            return None
+        pages=self.ReadObject(offsets, int(m.group(1)))
+        if pages is None:
+            return None
+        m=re.search(rb"/Count\s+(\d+)", pages)
+        if m is None:
+            return None
+        return int(m.group(1))
+
+
+    def ReadObject(self, offsets: dict[int, int], num: int) -> bytes|None:
+        offset=offsets.get(num)
+        if offset is None:
+            return None
+        data=self.Range(offset, offset+4095)
+        if data is None:
+            return None
+        m=re.match(rb"\s*\d+\s+\d+\s+obj(.*?)endobj", data, flags=re.DOTALL)
+        if m is None:
+            return None
+        return m.group(1)
+
+
+# Turn the body of a classic cross-reference table into a dictionary of object number --> file offset
+def ParseXrefTable(xref: bytes) -> dict[int, int]:
+    offsets: dict[int, int]={}
+    lines=xref.split(b"\n")
+    num=0
+    for line in lines[1:]:
+        fields=line.split()
+        if len(fields) == 2:        # Start of a subsection: first object number, number of entries
+            num=int(fields[0])
+        elif len(fields) == 3:      # An entry: offset, generation, n (in use) or f (free)
+            if fields[2] == b"n":
+                offsets[num]=int(fields[0])
+            num+=1
+    return offsets
+
+
+# Find the page count by scanning the whole PDF: the root of the page tree is the /Pages object with no /Parent.
+# If the page tree is inside a compressed object stream this won't find it, so as a last resort count the /Page objects which are visible.
+def PageCountFromBytes(data: bytes) -> int|None:
+    counts=[]
+    for m in re.finditer(rb"obj\s*<<(.*?)>>\s*endobj", data, flags=re.DOTALL):
+        obj=m.group(1)
+        if re.search(rb"/Type\s*/Pages\b", obj) and b"/Parent" not in obj:
+            c=re.search(rb"/Count\s+(\d+)", obj)
+            if c is not None:
+                counts.append(int(c.group(1)))
+    if len(counts) > 0:
+        return max(counts)
+    pages=len(re.findall(rb"/Type\s*/Page\b(?!s)", data))
+    return pages if pages > 0 else None
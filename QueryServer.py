@@ -0,0 +1,233 @@
+from collections import defaultdict
+from bisect import bisect_left, bisect_right
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import sys
+import json
+import time
+import urllib.parse
+
+from FanzineIssueSpecPackage import FanzineIssueInfo
+from FanacTagIndex import TagIndex
+from Log import Log
+from HelpersPackage import UnscrambleListOfNames
+
+
+#================================================================================
+# A local HTTP service answering ad-hoc JSON queries about the catalogue.
+# Turned on by setting the parameters.txt value "Query Server Port".  The catalogue is loaded once and indexed, and then queries are answered from the indexes.
+#
+#   GET /issues?editor=...&series=...&country=...&mailing=...&type=...&yearfrom=...&yearto=...&offset=0&limit=100
+#       Issues matching all the given conditions, in date order.  Text matches are case-insensitive and exact.
+#       mailing matches either a whole mailing ("FAPA 23") or an APA ("FAPA").
+#   GET /series?country=...&editor=...&type=...&minpages=...&minissues=...&offset=0&limit=100
+#       Series matching all the given conditions, with their issue and page counts, in alphabetical order.
+#
+# The reply is {"Total": n, "Offset": n, "Items": [...]}.  Errors (including an unknown parameter, or a negative offset or limit) are replied to
+#   with status 400 and {"Error": "..."}.
+#
+# Run "python QueryServer.py loadtest <url> [<requests> [<threads>]]" to load-test a running server.
+class CatalogIndex:
+    # The query parameters each kind of query understands (besides offset and limit)
+    IssueParams={"series", "editor", "country", "mailing", "type", "yearfrom", "yearto"}
+    SeriesParams={"country", "editor", "type", "minpages", "minissues"}
+
+    def __init__(self, fanacIssueList: list[FanzineIssueInfo], peopleCanonicalNames: dict[str, str], tagIndex: TagIndex):
+        Log(f"Indexing {len(fanacIssueList):,} issues", timestamp=True)
+        self._tagIndex: TagIndex=tagIndex
+        # Keep the issues in date order, so that every list of issue numbers below is in date order, too
+        self.Issues: list[FanzineIssueInfo]=sorted(fanacIssueList, key=lambda fz: fz.FIS.FormatYearMonthDayForSorting())
+
+        # Hash indexes: casefolded key --> list of issue numbers
+        self.BySeries: defaultdict[str, list[int]]=defaultdict(list)
+        self.ByEditor: defaultdict[str, list[int]]=defaultdict(list)
+        self.ByCountry: defaultdict[str, list[int]]=defaultdict(list)
+        self.ByMailing: defaultdict[str, list[int]]=defaultdict(list)
+        self.ByType: defaultdict[str, list[int]]=defaultdict(list)
+        # Sorted index: (year, issue number) for the issues which have a year
+        self.ByYear: list[tuple[int, int]]=[]
+
+        # The series, keyed by casefolded name: [name, editors, country, types, issue count, page count]
+        self.Series: dict[str, list]={}
+
+        for i, fz in enumerate(self.Issues):
+            self.BySeries[fz.SeriesName.casefold()].append(i)
+
+            editors=[peopleCanonicalNames.get(ed.strip(), ed.strip()) for ed in UnscrambleListOfNames(fz.Editor)]
+            editors=[ed.removesuffix(" et al") for ed in editors if ed != ""]
+            for ed in set(ed.casefold() for ed in editors):
+                self.ByEditor[ed].append(i)
+
+            country=fz.Locale.CountryName
+            self.ByCountry[country.casefold()].append(i)
+
+            for mailing in fz.Mailings:
+                mailing=mailing.strip()
+                self.ByMailing[mailing.casefold()].append(i)
+                apa=mailing.split()[0].casefold() if mailing != "" else ""
+                if apa != mailing.casefold():
+                    self.ByMailing[apa].append(i)
+
+            types=set(t.casefold() for t in fz.Taglist)
+            if tagIndex.FanzineType(fz).strip() != "":
+                types.add(tagIndex.FanzineType(fz).strip().casefold())
+            for t in types:
+                self.ByType[t].append(i)
+
+            if fz.FIS.Year is not None:
+                self.ByYear.append((fz.FIS.Year, i))
+
+            series=self.Series.setdefault(fz.SeriesName.casefold(), [fz.SeriesName, set(), country, set(), 0, 0])
+            series[1].update(ed.casefold() for ed in editors)
+            series[3].update(types)
+            series[4]+=1
+            series[5]+=fz.Pagecount
+
+        self.ByYear.sort()
+        self.SeriesNames: list[str]=sorted(self.Series.keys())
+        Log("Indexing complete", timestamp=True)
+
+
+    # Return the issues matching all the conditions in the query as a list of issue numbers in date order
+    def FindIssues(self, query: dict[str, str]) -> list[int]:
+        candidates: list[list[int]|range]=[]
+        for param, index in [("series", self.BySeries), ("editor", self.ByEditor), ("country", self.ByCountry), ("mailing", self.ByMailing), ("type", self.ByType)]:
+            if param in query:
+                candidates.append(index.get(query[param].casefold(), []))
+        if "yearfrom" in query or "yearto" in query:
+            yearFrom=int(query.get("yearfrom", -sys.maxsize))
+            yearTo=int(query.get("yearto", sys.maxsize))
+            lo=bisect_left(self.ByYear, (yearFrom, -1))
+            hi=bisect_right(self.ByYear, (yearTo, sys.maxsize))
+            candidates.append(sorted(i for _, i in self.ByYear[lo:hi]))
+        if len(candidates) == 0:
+            return list(range(len(self.Issues)))
+
+        # Intersect, starting with the smallest
+        candidates.sort(key=len)
+        result=candidates[0]
+        for other in candidates[1:]:
+            others=set(other)
+            result=[i for i in result if i in others]
+        return list(result)
+
+
+    def FindSeries(self, query: dict[str, str]) -> list[list]:
+        minPages=int(query.get("minpages", 0))
+        minIssues=int(query.get("minissues", 0))
+        country=query.get("country", "").casefold()
+        editor=query.get("editor", "").casefold()
+        fanzineType=query.get("type", "").casefold()
+        result=[]
+        for key in self.SeriesNames:
+            series=self.Series[key]
+            if series[5] < minPages or series[4] < minIssues:
+                continue
+            if country != "" and series[2].casefold() != country:
+                continue
+            if editor != "" and editor not in series[1]:
+                continue
+            if fanzineType != "" and fanzineType not in series[3]:
+                continue
+            result.append(series)
+        return result
+
+
+    def IssueJson(self, i: int) -> dict:
+        fz=self.Issues[i]
+        return {"Issue": fz.IssueName, "Series": fz.SeriesName, "Editor": fz.Editor, "Date": fz.FIS.DateStr, "Year": fz.FIS.Year,
+                "Country": fz.Locale.CountryName, "Pages": fz.Pagecount, "Mailings": fz.Mailings, "Type": self._tagIndex.FanzineType(fz), "URL": fz.URL}
+
+    @staticmethod
+    def SeriesJson(series: list) -> dict:
+        return {"Series": series[0], "Country": series[2], "Types": sorted(series[3]), "Issues": series[4], "Pages": series[5]}
+
+
+#================================================================================
+# tagIndex classifies the series (see FanacTagIndex), so that series listed in control-newszines.txt are served as newszines
+def Serve(fanacIssueList: list[FanzineIssueInfo], peopleCanonicalNames: dict[str, str], tagIndex: TagIndex, port: int) -> None:
+    catalog=CatalogIndex(fanacIssueList, peopleCanonicalNames, tagIndex)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url=urllib.parse.urlparse(self.path)
+            query={k.lower(): v[-1] for k, v in urllib.parse.parse_qs(url.query).items()}
+            if url.path not in ["/issues", "/series"]:
+                self.Reply(404, {"Error": f"Unknown path {url.path}.  Use /issues or /series"})
+                return
+            try:
+                offset=int(query.pop("offset", 0))
+                limit=min(int(query.pop("limit", 100)), 10000)
+                if offset < 0 or limit < 0:
+                    raise ValueError("offset and limit can't be negative")
+                known=CatalogIndex.IssueParams if url.path == "/issues" else CatalogIndex.SeriesParams
+                unknown=sorted(set(query.keys()).difference(known))
+                if len(unknown) > 0:
+                    raise ValueError(f"Unknown parameter(s) {', '.join(unknown)}.  {url.path} understands {', '.join(sorted(known))}, offset and limit")
+                if url.path == "/issues":
+                    found=catalog.FindIssues(query)
+                    items=[catalog.IssueJson(i) for i in found[offset:offset+limit]]
+                else:
+                    found=catalog.FindSeries(query)
+                    items=[catalog.SeriesJson(s) for s in found[offset:offset+limit]]
+            except ValueError as e:
+                self.Reply(400, {"Error": str(e)})
+                return
+            self.Reply(200, {"Total": len(found), "Offset": offset, "Items": items})
+
+        def Reply(self, status: int, contents: dict) -> None:
+            body=json.dumps(contents, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass        # Don't log every request
+
+    server=ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    Log(f"Query server listening on http://localhost:{port}", timestamp=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    Log("Query server stopped", timestamp=True)
+
+
+#================================================================================
+# Load test: send a mix of queries to a running server from several threads and report the throughput and latencies
+def LoadTest(baseUrl: str, numRequests: int=1000, numThreads: int=8) -> None:
+    import urllib.request
+    from concurrent.futures import ThreadPoolExecutor
+
+    queries=["/issues?yearfrom=1950&yearto=1959&limit=50",
+             "/issues?type=newszine&limit=100",
+             "/issues?country=uk&yearfrom=1960&yearto=1969",
+             "/issues?mailing=fapa&offset=100&limit=100",
+             "/series?minpages=500",
+             "/series?country=usa&minissues=20"]
+
+    def Get(n: int) -> float:
+        start=time.perf_counter()
+        with urllib.request.urlopen(baseUrl.rstrip("/")+queries[n % len(queries)]) as h:
+            h.read()
+        return time.perf_counter()-start
+
+    start=time.perf_counter()
+    with ThreadPoolExecutor(max_workers=numThreads) as executor:
+        latencies=sorted(executor.map(Get, range(numRequests)))
+    elapsed=time.perf_counter()-start
+
+    print(f"{numRequests:,} requests from {numThreads} threads in {elapsed:.2f} sec: {numRequests/elapsed:,.0f} requests/sec")
+    for pct in [50, 90, 99]:
+        print(f"   {pct}th percentile latency: {1000*latencies[min(len(latencies)-1, numRequests*pct//100)]:.1f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "loadtest":
+        print("Usage: python QueryServer.py loadtest <url> [<requests> [<threads>]]")
+        sys.exit(1)
+    LoadTest(sys.argv[2], *[int(x) for x in sys.argv[3:5]])
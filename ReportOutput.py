@@ -0,0 +1,104 @@
+import io
+import os
+import re
+import gzip
+import hashlib
+
+from Settings import Settings
+from Log import Log
+from LogLevels import LogNormal
+
+
+#================================================================================
+# Write-if-changed output for the reports.
+# A report is rendered into a buffer and is only written if its contents differ from the file already on disk.  Lines which change on every run
+#   (the "Indexed as of..." timestamp and bare dates) are ignored in the comparison, so an unchanged report keeps its old file and mtime
+#   and an upload which compares mtimes (e.g., rsync) will skip it.
+# Use OpenReport() as a drop-in replacement for open() when writing a report:
+#       with OpenReport(filename, "w", encoding="utf-8") as f:
+#           f.write(...)
+
+_timestampPatterns=[re.compile(r"Indexed as of \d{4}-\d\d-\d\d \d\d:\d\d:\d\d( EST)?"),    # The timestamp in the reports' top matter
+                    re.compile(r"^\d{4}-\d\d-\d\d$", flags=re.MULTILINE)]                     # A line which is just today's date
+
+_written: list[str]=[]
+_unchanged: list[str]=[]
+_compressed: list[tuple[str, int, int]]=[]      # (filename, size, compressed size)
+
+
+def ContentHash(contents: str) -> str:
+    for pattern in _timestampPatterns:
+        contents=pattern.sub("", contents)
+    return hashlib.sha1(contents.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+# Write contents to the file unless the file already holds the same contents (ignoring timestamps)
+# Returns True if the file was written
+def WriteIfChanged(filename: str, contents: str, encoding: str|None=None, newline: str|None=None) -> bool:
+    if os.path.exists(filename):
+        try:
+            with open(filename, "r", encoding=encoding, newline=newline) as f:
+                old=f.read()
+            if ContentHash(old) == ContentHash(contents):
+                _unchanged.append(filename)
+                return False
+        except (OSError, UnicodeDecodeError):
+            pass    # If the old file can't be read, just overwrite it
+
+    with open(filename, "w", encoding=encoding, newline=newline) as f:
+        f.write(contents)
+    _written.append(filename)
+    return True
+
+
+# If compress is True and the parameter "Precompress Reports" is set, a maximally compressed .gz copy is written alongside the report
+#   so that the web server can serve it as is rather than compressing the report on every request.
+class OpenReport(io.StringIO):
+    def __init__(self, filename: str, mode: str="w", encoding: str|None=None, newline: str|None=None, compress: bool=False):
+        super().__init__()
+        assert mode in ["w", "w+"]
+        self.Filename: str=filename
+        self.Changed: bool=False
+        self._encoding=encoding
+        self._newline=newline
+        self._compress=compress
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.Changed=WriteIfChanged(self.Filename, self.getvalue(), encoding=self._encoding, newline=self._newline)
+            if self._compress and Settings().Get("Precompress Reports", "") != "":
+                if self.Changed or not os.path.exists(self.Filename+".gz"):
+                    WriteCompressedCopy(self.Filename)
+        return super().__exit__(exc_type, exc_val, exc_tb)
+
+
+# Write filename.gz at maximum compression.  The gzip header carries the report's mtime, so an unchanged report always yields the same .gz
+def WriteCompressedCopy(filename: str) -> None:
+    with open(filename, "rb") as f:
+        data=f.read()
+    gzname=filename+".gz"
+    with open(gzname+".tmp", "wb") as raw:
+        with gzip.GzipFile(filename=os.path.basename(filename), mode="wb", compresslevel=9, fileobj=raw, mtime=int(os.path.getmtime(filename))) as gz:
+            gz.write(data)
+    os.replace(gzname+".tmp", gzname)
+
+    compressedSize=os.path.getsize(gzname)
+    _compressed.append((filename, len(data), compressedSize))
+    LogNormal(lambda: f"   Compressed {os.path.basename(filename)}: {len(data):,} --> {compressedSize:,} bytes")
+
+
+#================================================================================
+# Summary of the files written and left alone since the last call
+def OutputSummaryLines() -> list[str]:
+    lines=[f"Report files: {len(_written):,} written, {len(_unchanged):,} unchanged"]
+    if len(_compressed) > 0:
+        size=sum(x[1] for x in _compressed)
+        compressedSize=sum(x[2] for x in _compressed)
+        lines.append(f"Precompressed {len(_compressed):,} reports: {size:,} --> {compressedSize:,} bytes ({100*(1-compressedSize/max(size, 1)):.1f}% smaller)")
+    return lines
+
+
+def ResetOutputSummary() -> None:
+    _written.clear()
+    _unchanged.clear()
+    _compressed.clear()
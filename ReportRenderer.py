@@ -0,0 +1,676 @@
+from typing import Callable
+from types import CodeType
+
+import os
+import re
+import glob
+import json
+import hashlib
+import unicodedata
+
+from FanzineIssueSpecPackage import FanzineIssueInfo, FanzineCounts
+from ReportOutput import OpenReport
+from Settings import Settings
+from Log import Log, LogError, LogFailureAndRaiseIfMissing
+from HelpersPackage import FormatLink, UnicodeToHtml2, RemoveAllHTMLTags2
+
+
+#================================================================================
+# Reports are declared as report objects (HTMLTableReport, TxtTableReport, LineReport) and then rendered by RenderReports().
+# All the reports which share a sort order are fed from a single walk of the list: each report is handed each issue in turn via Add()
+#   and writes its file when Finish() is called.
+def RenderReports(fanacIssueList: list[FanzineIssueInfo], reports: list) -> None:
+    reports=[r for r in reports if r is not None]
+    if len(reports) == 0:
+        return
+
+    for report in reports:
+        Log(f"Begin Report: '{report.Filename}'", timestamp=True)
+    for fz in fanacIssueList:
+        for report in reports:
+            report.Add(fz)
+    for report in reports:
+        report.Finish()
+        Log(f"Complete: {report.Filename}", timestamp=True)
+
+
+#================================================================================
+# A cache of rendered HTML group boxes which is kept between runs.
+# Most groups are unchanged from one run to the next, so an HTMLTableReport looks each group up by a hash of the group's issues and
+#   of the report's parameters and only renders the groups which are not found.
+# The cache is a JSON file; only the fragments used in a run are kept when it is saved, so it does not accumulate stale entries.
+class FragmentCache:
+    Version=1       # Bump this when a change to the rendering code means the old fragments must be discarded
+
+    def __init__(self, filename: str):
+        self.Filename: str=filename
+        self._fragments: dict[str, list[str]]={}       # Key --> [rendered HTML, value of lastRowBodySelect after the group]
+        self._used: dict[str, list[str]]={}
+
+        if not os.path.exists(filename):
+            return
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                contents=json.load(f)
+        except (OSError, ValueError) as e:
+            LogError(f"FragmentCache: unable to read {filename}: {e}")
+            return
+        if contents.get("Version") == FragmentCache.Version:
+            self._fragments=contents.get("Fragments", {})
+
+
+    def Get(self, key: str) -> tuple[str, str]|None:
+        val=self._fragments.get(key)
+        if val is None:
+            return None
+        self._used[key]=val
+        return val[0], val[1]
+
+    def Put(self, key: str, output: str, lastRowBodySelect: str) -> None:
+        self._used[key]=[output, lastRowBodySelect]
+
+
+    def Save(self) -> None:
+        tempname=self.Filename+".tmp"
+        with open(tempname, "w", encoding="utf-8") as f:
+            json.dump({"Version": FragmentCache.Version, "Fragments": self._used}, f)
+        os.replace(tempname, self.Filename)
+        Log(f"Fragment cache: saved {len(self._used):,} fragments to {self.Filename}")
+
+
+_fragmentCache: FragmentCache|None=None
+
+
+# Load the fragment cache that the HTML reports will use.  (If this is not called, every group is rendered from scratch.)
+def LoadFragmentCache(filename: str) -> None:
+    global _fragmentCache
+    _fragmentCache=FragmentCache(filename)
+
+
+def SaveFragmentCache() -> None:
+    if _fragmentCache is not None:
+        _fragmentCache.Save()
+
+
+# A signature of a function's code which is stable from run to run.  (The repr of a nested code object includes its address, so recurse instead.)
+def CodeSignature(f: Callable|None) -> str:
+    if f is None:
+        return "None"
+    code=f.__code__ if hasattr(f, "__code__") else None
+    if code is None:
+        return repr(f)
+    return CodeObjectSignature(code)
+
+def CodeObjectSignature(code: CodeType) -> str:
+    consts=[CodeObjectSignature(c) if isinstance(c, CodeType) else repr(c) for c in code.co_consts]
+    return f"{code.co_code.hex()}|{consts}|{code.co_names}"
+
+
+# The values of an issue which can affect how it is rendered in a group box
+def IssueRenderKey(fz: FanzineIssueInfo) -> str:
+    return "\x1f".join(str(x) for x in (fz.SeriesName, fz.SeriesEditor, fz.IssueName, fz.Editor, fz.URL, fz.DirURL, fz.PageFilename, fz.Pagecount,
+                                        fz.FIS, fz.FIS.DateStr, fz.FIS.FD.LongDates, fz.Series.SeriesName, fz.Series.URL, fz.Series.DirURL,
+                                        fz.Series.AlphabetizeIndividually, fz.Locale.CountryName, getattr(fz, "Temp", None)))
+
+
+#================================================================================
+# A report which is just one line of text per selected issue
+class LineReport:
+    def __init__(self, filename: str, fLineText: Callable[[FanzineIssueInfo], str], fSelector: Callable[[FanzineIssueInfo], bool]|None=None):
+        self.Filename: str=filename
+        self._fLineText=fLineText
+        self._fSelector=fSelector
+        self._lines: list[str]=[]
+
+    def Add(self, fz: FanzineIssueInfo) -> None:
+        if self._fSelector is not None and not self._fSelector(fz):
+            return
+        self._lines.append(self._fLineText(fz)+"\n")
+
+    def Finish(self) -> None:
+        with OpenReport(self.Filename, "w") as f:
+            f.writelines(self._lines)
+
+
+#================================================================================
+# fGroupText and fRowText and fSelector are all lambdas
+#   fSelector decides if this fanzine is to be listed and returns True for fanzines to be listed, and False for ones to be skipped. (If None, nothing will be skipped)
+#   fButtonText operates on an issue and selects the character (or whatever) that will be used for button grouping
+#   fGroupText and fRowText are functions which pull information out of a fanzineIssue from fanzineIssueList
+#   fGroupText is the item used to decide when to start a new subsection
+#   fRowText is what is listed in the subsection
+class TxtTableReport:
+    def __init__(self,
+                 filename: str,
+                 fRowText: Callable[[FanzineIssueInfo], str],  # Function to supply the row's body text
+                 fGroupText: Callable[[FanzineIssueInfo], str]|None = None,  # Function to supply the header text
+                 fRowHeaderSelect: Callable[[FanzineIssueInfo], str]|None = None,  # Function to supply the header text to be used to separate headers. (Needed to disambiguate fanzines series with the same title
+                 fGroupAnnot: Callable[[FanzineIssueInfo], str]|None = None,  # Function to supply annotation to the headers
+                 fCompareRowHeaderText: Callable[[str, str], bool]|None = None,        # If present, is used to determine if the row header text has changed
+                 topCountText: str= "",
+                 fSelector: Callable[[FanzineIssueInfo], bool]|None = None):
+        self.Filename: str=filename
+        self._fRowText=fRowText
+        self._fGroupText=fGroupText
+        self._fRowHeaderSelect=fRowHeaderSelect
+        self._fGroupAnnot=fGroupAnnot
+        self._fCompareRowHeaderText=fCompareRowHeaderText
+        self._fSelector=fSelector
+
+        if self._fCompareRowHeaderText is None:
+            self._fCompareRowHeaderText=lambda f1, f2: f1 == f2
+        if self._fRowHeaderSelect is None:  # The default is for the header selection rule to be the same as the header; but sometimes this is not the case
+            self._fRowHeaderSelect=fGroupText     # Note that this may also be None
+
+        #....... Header .......
+        self._output: list[str]=[]
+        if topCountText:
+            self._output.append(topCountText)
+        self._lastRowHeaderSelect: str=""
+
+
+    def Add(self, fz: FanzineIssueInfo) -> None:
+        # Do we skip this fanzine?
+        if self._fSelector is not None and not self._fSelector(fz):
+            return
+
+        # Start a new main row?
+        # Deal with Column 1
+        if self._fGroupText is not None:
+            # We start a new main row when fCompareRowHeaderText() thinks that fRowHeaderSelect() has changed
+            # Note that they have defaults, so they do not need to be checked for None
+            rowHeaderSelect=self._fRowHeaderSelect(fz)
+            if not self._fCompareRowHeaderText(self._lastRowHeaderSelect, rowHeaderSelect):
+                self._lastRowHeaderSelect=rowHeaderSelect
+
+                self._output.append("\n"+self._fGroupText(fz))
+                if self._fGroupAnnot is not None and self._fGroupAnnot(fz) is not None:
+                    self._output.append("    "+RemoveAllHTMLTags2(self._fGroupAnnot(fz)))
+                self._output.append("\n")
+
+        # Deal with "Column 2" (the indented stuff)
+        bodytext=self._fRowText(fz)
+        bodytext=bodytext.replace("|", "", 1)  # Ignore the first  embedded "|" character
+        self._output.append("   "+bodytext+"\n")
+
+
+    def Finish(self) -> None:
+        with OpenReport(self.Filename, "w+") as f:
+            f.writelines(self._output)
+
+
+#================================================================================
+# The basic notion is that a report has four levels:
+#   The totality
+#   The Groups -- a group of rows with a common header in the left column
+#   The Rows -- one or more entries grouped together by a common thing. Each will be one of the rows under some group.
+#                       All the entries collected under this row generate a single line in the right column of the report.
+#   We use a bunch of lambdas to assemble the various parts. The lambdas are designated by a leading "f" followed by a UC letter
+#   fSelector decides if this fanzine is to be listed and returns True for fanzines to be listed, and False for ones to be skipped. (If None, nothing will be skipped)
+#   fButtonText operates on an issue and selects the character (or whatever) that will be used for button grouping
+#   fGroupText and fRowText are functions which pull information out of a fanzineIssue from fanzineIssueList
+#   fGroupText is the item used to decide when to start a new subsection
+#   fRowText is what is listed in the subsection
+# Issues are collected a group at a time; when the group is complete (because an issue with a new header arrives or the list ends) the group's box is rendered.
+class HTMLTableReport:
+    def __init__(self,
+                filename: str,   # Filename of report to be generated. Must be supplied
+
+                fSelector: Callable[[FanzineIssueInfo], bool]|None = None,    # If present, selects fanzines to be included in report.  Default for None is to include all.
+                #
+                fGroupURL: Callable[[FanzineIssueInfo], str]|None=None,    # Function to supply the URL for the header text if one is wanted
+                fBodyURL: Callable[[FanzineIssueInfo], str]|None=lambda fz: fz.URL, # Required: Function to supply the URL for the specific item
+                fButtonText: Callable[[FanzineIssueInfo], str]|None = None,  # Function to supply the button text
+                # A set of individual items (appearing in the right column) are collected under a header in the left column
+                fGroupText: Callable[[FanzineIssueInfo], str]|None = None,  # Required: Function to supply the text which appears in the left column of each group.
+                fGroupAnnot: Callable[[FanzineIssueInfo], str]|None = None,    # Function to supply annotation to the header text/link
+                fRowHeaderSelect: Callable[[FanzineIssueInfo], str]|None = None,  # Function to supply an individual items text to be used to decide its header
+                fCompareRowHeaderText: Callable[[str, str], bool]|None = None,  # If present, is used to determine two header texts to see if they are different.
+                includeRowHeaderCounts: bool = True,  # Include counts in header block!
+                includeRowTitleCount: bool=False,    # (Only if includeRowHeaderCounts is True) also include count of series.
+                #
+                fRowText: Callable[[FanzineIssueInfo], str]|None = None,  # Required: Function to supply the row's body text
+                fRowAnnot: Callable[[FanzineIssueInfo], str]|None = None,  # Function to supply annotation to the rows
+                fCompareRowBodyText: Callable[[str, str], bool]|None = None,    # If present, is used to compare two fRowBodyGroupBy()s to see if they are identical
+                fRowBodyGroupBy: Callable[[FanzineIssueInfo], str]|None = None,   # If present, generates the text to compare body rows so that duplicates can be skipped
+                #
+                topCountText: str = "",
+                reportFilename: str = "",
+                inAlphaOrder: bool = False,
+                showDuplicateBodyRows: bool=True,
+                paginate: bool|None = None,     # Split the report into a page per button value plus an index page.  (None: use the parameter "Paginate Reports")
+                title: str = ""):       # The report's title, if there is no reportFilename to get it from
+
+        self.Filename: str=filename
+        self._fSelector=fSelector
+        self._fGroupURL=fGroupURL
+        self._fBodyURL=fBodyURL
+        self._fButtonText=fButtonText
+        self._fGroupText=fGroupText
+        self._fGroupAnnot=fGroupAnnot
+        self._fRowHeaderSelect=fRowHeaderSelect
+        self._fCompareRowHeaderText=fCompareRowHeaderText
+        self._includeRowHeaderCounts=includeRowHeaderCounts
+        self._includeRowTitleCount=includeRowTitleCount
+        self._fRowText=fRowText
+        self._fRowAnnot=fRowAnnot
+        self._fCompareRowBodyText=fCompareRowBodyText
+        self._fRowBodyGroupBy=fRowBodyGroupBy
+        self._topCountText=topCountText
+        self._reportFilename=reportFilename
+        self._title=title
+        self._inAlphaOrder=inAlphaOrder
+        self._showDuplicateBodyRows=showDuplicateBodyRows
+        if paginate is None:
+            paginate=Settings().Get("Paginate Reports", "") != ""
+        self._paginate=paginate and fButtonText is not None
+
+        self._valid=False
+        if self._fCompareRowHeaderText is None:
+            self._fCompareRowHeaderText=lambda f1, f2: f1.casefold() == f2.casefold()
+        if self._fCompareRowBodyText is None:
+            self._fCompareRowBodyText=lambda f1, f2: f1.casefold() == f2.casefold()
+        if fGroupText is None:
+            LogError(f"WriteTable: critical parameter 'fGroupText' is None in call to generate {filename}")
+            return
+        if self._fRowHeaderSelect is None:  # The default is for the header selection rule to be the same as the header; but sometimes this is not the case
+            self._fRowHeaderSelect=fGroupText  # Note that this may also be None
+        if fRowText is None:
+            LogError(f"WriteTable: critical parameter 'fRowBodyText' is None in call to generate {filename}")
+            return
+        if fBodyURL is None:
+            LogError(f"WriteTable: critical parameter 'fURL' is None in call to generate {filename}")
+            return
+        if (not showDuplicateBodyRows) and fRowBodyGroupBy is None:
+            LogError(f"WriteTable: showDuplicateBodyRows is False, yet fRowBodySelect is None in call to generate {filename}")
+            return
+        self._valid=True
+
+        # Everything other than the issues themselves which goes into rendering a group box, for the fragment cache keys
+        self._paramsKey="\x1e".join([os.path.basename(filename), str(includeRowHeaderCounts), str(inAlphaOrder), str(showDuplicateBodyRows)]+
+                                    [CodeSignature(f) for f in (fGroupURL, fBodyURL, fGroupText, fGroupAnnot, fRowText, fRowAnnot, self._fCompareRowBodyText, fRowBodyGroupBy)])
+        self._cacheHits: int=0
+        self._cacheMisses: int=0
+
+        self._buttons: set[str]=set()           # The button texts found so far
+        self._body: list[str]=[]                # The main table as rendered so far
+        self._group: list[FanzineIssueInfo]=[]  # The issues in the group currently being collected
+        self._groupHasHeader: bool=False        # Issues which arrive before the first change of header are listed without a group header
+        self._lastRowHeaderSelect: str=""
+        self._lastRowBodySelect: str=""
+        self._lastButtonLinkString: str=""
+        self._pages: list[tuple[str, int]]=[]           # (button value, index in _body where its groups start).  A button value can appear more than once.
+        self._pageCounts: dict[str, FanzineCounts]={}   # Button value --> counts of the issues on its page
+
+
+    def Add(self, fz: FanzineIssueInfo) -> None:
+        if not self._valid:
+            return
+
+        # Do we skip this fanzine completely?
+        if self._fSelector is not None and not self._fSelector(fz):
+            return
+
+        # Collect the button texts for the jump buttons
+        if self._fButtonText is not None:
+            buttonText=self._fButtonText(fz)
+            if buttonText is not None:
+                self._buttons.add(buttonText)
+
+        if self._fBodyURL(fz) is None:        #TODO: Why do we skip when fBodyURL(fz) is None ??
+            return
+
+        # We start a new main row when fCompareRowHeaderText() thinks that fRowHeaderSelect() has changed
+        # Note that they have defaults, so they do not need to be checked for None
+        rowHeaderSelect=self._fRowHeaderSelect(fz)
+        if not self._fCompareRowHeaderText(self._lastRowHeaderSelect, rowHeaderSelect):
+            self._FlushGroup()
+            if self._lastRowHeaderSelect != "":  # If this is not the first sub-box, we must end the previous sub-box by ending its col 2
+                self._body.append('    </div></div>\n')
+            self._groupHasHeader=True
+        self._group.append(fz)
+        self._lastRowHeaderSelect=rowHeaderSelect
+
+
+    # Render the group that has been collected and append it to the body
+    def _FlushGroup(self) -> None:
+        if len(self._group) == 0:
+            return
+        group=self._group
+        self._group=[]
+        if not self._groupHasHeader:
+            self._body.append(self._RenderRows(group))
+            return
+        fz=group[0]
+
+        # Get the button link string, and check if we have a new decade (or 1st letter) and need to create a new jump anchor
+        buttonLinkString: str=""
+        if self._fButtonText is not None:
+            if self._fButtonText(fz) is not None:
+                buttonLinkString=self._fButtonText(fz)
+        if buttonLinkString != self._lastButtonLinkString:
+            self._pages.append((buttonLinkString, len(self._body)))
+            self._body.append(f'<a name="{buttonLinkString}"></a>')
+            self._lastButtonLinkString=buttonLinkString
+
+        if self._paginate:
+            self._pageCounts[buttonLinkString]=CountGroup(self._pageCounts.get(buttonLinkString, FanzineCounts()), group)
+        self._body.append(self._CachedRenderGroup(group))
+
+
+    # Render a group's box, using the fragment cache if there is one
+    def _CachedRenderGroup(self, group: list[FanzineIssueInfo]) -> str:
+        if _fragmentCache is None:
+            return self._RenderGroup(group)
+
+        # When duplicate body rows are suppressed, whether the group's first row is shown depends on the previous group's last row
+        key=hashlib.sha1(self._paramsKey.encode("utf-8"))
+        if not self._showDuplicateBodyRows:
+            key.update(self._lastRowBodySelect.encode("utf-8"))
+        for fz in group:
+            key.update(b"\x1d"+IssueRenderKey(fz).encode("utf-8"))
+        key=key.hexdigest()
+
+        cached=_fragmentCache.Get(key)
+        if cached is not None:
+            self._cacheHits+=1
+            output, self._lastRowBodySelect=cached
+            return output
+
+        self._cacheMisses+=1
+        output=self._RenderGroup(group)
+        _fragmentCache.Put(key, output, self._lastRowBodySelect)
+        return output
+
+
+    # Render a group's bordered box: the group header in column 1 and the rows in column 2
+    # The structure is
+    #   <div class="row border">        # This starts a new bordered box (a fanzine, a month)
+    #       <div class=col_md_2> (1st col: box title) </div>
+    #       <div class=col_md_10> (2nd col, a list of fanzine issues)
+    #           <a>issue</a> <br>
+    #           <a>issue</a> <br>
+    #           <a>issue</a> <br>
+    #       </div>
+    #   </div>
+    def _RenderGroup(self, group: list[FanzineIssueInfo]) -> str:
+        fz=group[0]
+        output='<div class="row border">\n'  # Start a new sub-box
+
+        # Write the 1st column header for a bunch of 2nd column fz's
+        # We sometimes have a very long single word in a fanzine name which does not wrap, but which collides with the second column.
+        # Detect it and, if necessary, add a wrap to the HTML
+        groupText=self._fGroupText(fz)
+        wrapper=""
+        if max([len(x) for x in groupText.split(" ")]) > 20:
+            wrapper=" text-break"
+        output+=f'  <div class="col-md-3{wrapper}">'
+        if self._fGroupURL is not None:
+            if self._inAlphaOrder:
+                output+=FormatLink(self._fGroupURL(fz), groupText)
+            else:
+                output+=groupText
+            if self._fGroupAnnot is not None:
+                output+=self._fGroupAnnot(fz)
+        else:
+            output+=groupText
+
+        if self._includeRowHeaderCounts:
+            # Count the issues in this block.
+            fc=CountGroup(FanzineCounts(), group)
+            output+=f"<br><small>{fc}</small>"
+
+        output+='</div>\n'
+        output+='    <div class=col-md-9>\n' # Start col 2
+        output+=self._RenderRows(group)
+        return output
+
+
+    # Render the rows of column 2 of a group
+    def _RenderRows(self, group: list[FanzineIssueInfo]) -> str:
+        output=""
+        # We sometimes print only the 1st row of column 2 of a block, skipping the rest.
+        # These are treated as two separate cases
+        for i, fz in enumerate(group):
+            if self._showDuplicateBodyRows:
+                # The hyperlink goes in column 2, in this case a link to the specific fanzine
+                # There are two kinds of hyperlink: Those with just a filename (xyz.html) and those with a full URL (http://xxx.vvv.zzz.html)
+                # The former are easy, but the latter need to be processed
+                bodytext=self._fRowText(fz)
+                # if there is a pipe character in the string, we only link the part before the pipe and delete the pipe
+                splitext=bodytext.split("|", 2)
+                if len(splitext) == 2:
+                    bodytext=splitext[0]
+                output+='        '+FormatLink(self._fBodyURL(fz), bodytext)
+
+                annot=""
+                if self._fRowAnnot is not None:
+                    annot=self._fRowAnnot(fz)
+                    if annot is not None:
+                        annot=annot.strip()
+                if annot != "":
+                    output+=Smallify(f"&nbsp;&nbsp;&nbsp;({annot})")
+
+                output+='<br>\n'
+            else:
+                # We're NOT showing duplicate body rows
+                # The hyperlink goes in column 2 and is a hyperlink to the *series* since there is only one row for the whole series
+                # There are two kinds of hyperlink: Those with just a filename (xyz.html) and those with a full URL (http://xxx.vvv.zzz.html)
+                # The former are easy, but the latter need to be processed
+                rowBodySelect=self._fRowBodyGroupBy(fz)
+                if not self._fCompareRowBodyText(self._lastRowBodySelect, rowBodySelect):
+                    bodytext=self._fRowText(fz)
+                    link=self._fBodyURL(fz)
+                    if fz.Series.AlphabetizeIndividually:
+                        link=fz.URL
+                    # if there is a pipe character in the string, we only link the part before the pipe and delete the pipe
+                    splitext=bodytext.split("|", 2)
+                    if len(splitext) == 2:
+                        bodytext=splitext[0]
+                    output+='        '+FormatLink(link, bodytext)
+
+                    # Count the run of issues in this group which will be collapsed into this row
+                    fc=FanzineCounts()
+                    for gz in group[i:]:
+                        if not self._fCompareRowBodyText(rowBodySelect, self._fRowBodyGroupBy(gz)):
+                            break
+                        fc+=gz
+
+                    annot=""
+                    if self._fRowAnnot is not None:
+                        annot=self._fRowAnnot(fz)
+                        if annot is not None:
+                            annot=annot.strip()
+                    if annot != "":
+                        annot+="&nbsp;&nbsp;&nbsp;"
+                    annot+=str(fc)
+                    output+=Smallify(f"&nbsp;&nbsp;&nbsp;({annot})")
+
+                    output+='<br>\n'
+                    self._lastRowBodySelect=rowBodySelect
+
+        return output
+
+
+    def Finish(self) -> None:
+        if not self._valid:
+            return
+        self._FlushGroup()
+
+        #--------------------------
+        #....... Header .......
+        # HTML needs to include a header.
+        # It will be a combination of the contents of "control-Header (basic).html" with headerInfoFilename
+        basicHeadertext=ReadFile("control-Header (basic).html")
+        if not basicHeadertext:
+            LogError(f"WriteTable: critical parameter basicHeadertext is None in call to generate {self.Filename}")
+            return
+
+        # Read the specialized control.html file for this type of report
+        if self._reportFilename != "":
+            specialText=ReadFile(self._reportFilename)
+        else:
+            specialText=[self._title] if self._title != "" else []
+        if specialText:
+            specialText=[s for s in specialText if len(s) > 0 and s[0] !="#"]   # Ignore comments
+            title=specialText[0]
+            del specialText[0]
+
+            # Do the substitutions
+            for i in range(0, len(basicHeadertext)):
+                if basicHeadertext[i].strip() == "<title>title</title>":
+                    basicHeadertext[i]=f"<title>{title}</title>"
+                if basicHeadertext[i].strip() == "<h1>title</h1>":
+                    basicHeadertext[i]=f"<h1>{title}</h1>"
+            basicHeadertext.extend(specialText)
+
+        # Initialize the output variable which will eventually be written to the file
+        header="\n".join(basicHeadertext)
+
+        # Externally supplied summary count text
+        if self._topCountText:
+            topCountText=self._topCountText.replace("\n", "<p>")
+            topCountText=f"<p>{topCountText}</p>\n"
+            header+=topCountText
+        footer="\n".join(ReadFile("control-Default.Footer"))
+
+        #--------------------------
+        # -- Jump buttons --
+        # If we have an HTML header, we need to create a set of jump buttons.
+        # If it's alpha, the buttons are by 1st letter; if date it's by decade
+        # When the report is paginated, the buttons link to the other pages rather than to anchors on this page
+        paginate=self._paginate and len(self._pages) > 0
+        headerlist=list(self._buttons)
+        if paginate:
+            pageFiles=self.PageFilenames([button for button, _ in self._pages])
+            headerlist=[x for x in headerlist if x in pageFiles]
+        headerlist.sort(key=lambda elem: elem.lower())
+        buttonlist=""
+        for item in headerlist:
+            if buttonlist:
+                buttonlist=buttonlist+" &mdash; "
+            if paginate:
+                buttonlist+=FormatLink(os.path.basename(pageFiles[item])+"#"+item, item)
+            else:
+                buttonlist+=FormatLink("#"+ item, item)
+        buttonlist=f"{buttonlist}<p><p>\n"
+
+        if not paginate:
+            self.WritePage(self.Filename, header+buttonlist, self._body, footer)
+            self.RemoveStalePages(set())     # In case the report was paginated last time
+        else:
+            # Each page holds the groups for one button value, in the order they appear.  (Anything before the first button's groups goes on the
+            #   first page.)
+            # The last group on a page was closed when the next group began; the closing is done by WritePage instead.
+            starts=[start for _, start in self._pages]
+            starts[0]=0
+            bodies: dict[str, list[str]]={}
+            for i, (button, start) in enumerate(self._pages):
+                end=starts[i+1] if i+1 < len(starts) else len(self._body)
+                bodies.setdefault(button, []).extend(self._body[starts[i]:end])
+            for button, body in bodies.items():
+                if len(body) > 0 and body[-1] == '    </div></div>\n':
+                    body=body[:-1]
+                self.WritePage(pageFiles[button], header+buttonlist, body, footer)
+            self.RemoveStalePages(set(pageFiles.values()))
+
+            # The index page lists the pages with their counts
+            index=['<div class="row border">\n  <div class=col-md-9>\n']
+            for button in headerlist:
+                index.append(f'        {FormatLink(os.path.basename(pageFiles[button]), button)}{Smallify(f"&nbsp;&nbsp;&nbsp;({self._pageCounts.get(button, FanzineCounts())})")}<br>\n')
+            self.WritePage(self.Filename, header+buttonlist, index, footer)
+
+        groups=self._cacheHits+self._cacheMisses
+        if _fragmentCache is not None and groups > 0:
+            Log(f"   Fragment cache: {self._cacheHits:,} of {groups:,} groups reused ({100*self._cacheHits/groups:.1f}%)")
+
+
+    # Write one page of the report
+    def WritePage(self, filename: str, header: str, body: list[str], footer: str) -> None:
+        output=header
+        #--------------------------
+        #....... Main table .......
+        output+='<div>\n'  # Begin the main table
+        output+="".join(body)
+
+        #....... Cleanup .......
+        output+='</div>\n</div>\n'
+        output+=footer
+
+        # The file being created.
+        output=UnicodeToHtml2(output)
+        with OpenReport(filename, "w+", compress=True) as f:
+            f.write(output)
+
+
+    # The filenames of the pages holding the button values' groups: e.g., Alphabetical_Listing_of_Fanzines_page_A.html
+    # Accents are dropped (so Ö's page is _page_O_2 if there is also an O), and button values which still come out the same (e.g., "United States"
+    #   and "United-States", or initials in other scripts, which become "other") get a suffix, given out in sorted order.
+    def PageFilenames(self, buttons: list[str]) -> dict[str, str]:
+        root, ext=os.path.splitext(self.Filename)
+        pageFiles: dict[str, str]={}
+        used: set[str]=set()
+        for button in sorted(set(buttons)):
+            slug=unicodedata.normalize("NFKD", button)
+            slug="".join(c for c in slug if not unicodedata.combining(c))
+            slug=re.sub(r"[^A-Za-z0-9]+", "_", slug).strip("_")
+            if slug == "":
+                slug="other"
+            unique=slug
+            n=2
+            while unique.casefold() in used:        # Case, too, since the pages may end up on a case-insensitive filesystem
+                unique=f"{slug}_{n}"
+                n+=1
+            used.add(unique.casefold())
+            pageFiles[button]=f"{root}_page_{unique}{ext}"
+        return pageFiles
+
+
+    # Delete the pages (and their compressed copies) left over from an earlier run for button values which no longer occur
+    def RemoveStalePages(self, pageFiles: set[str]) -> None:
+        root, ext=os.path.splitext(self.Filename)
+        pattern=glob.escape(f"{root}_page_")+"*"+glob.escape(ext)
+        for filename in glob.glob(pattern)+glob.glob(pattern+".gz"):
+            if filename.removesuffix(".gz") not in pageFiles:
+                Log(f"   Removing stale page {filename}")
+                os.remove(filename)
+
+
+# Add the issues of a group to a FanzineCounts.  Used for both the group boxes and the per-page counts of paginated reports.
+def CountGroup(fc: FanzineCounts, group: list[FanzineIssueInfo]) -> FanzineCounts:
+    for gz in group:
+        fc+=gz
+        fc+=gz.SeriesName
+    return fc
+
+
+#================================================================================
+# Write a single HTML report.  See HTMLTableReport for the arguments.
+def WriteHTMLTable(filename: str, fanacIssueList: list[FanzineIssueInfo], **kwargs) -> None:
+    RenderReports(fanacIssueList, [HTMLTableReport(filename, **kwargs)])
+
+
+# Write a single text report.  See TxtTableReport for the arguments.
+def WriteTxtTable(filename: str, fanacIssueList: list[FanzineIssueInfo], **kwargs) -> None:
+    RenderReports(fanacIssueList, [TxtTableReport(filename, **kwargs)])
+
+
+def ReadFile(filename: str) -> list[str]:
+    try:
+        with open(filename, "r") as f2:
+            return f2.readlines()
+    except:
+        # If the expected control header is unavailable, bail out, otherwise return an empty list.
+        LogFailureAndRaiseIfMissing(filename)
+    return []
+
+
+#----------------------------------------
+# Surround the contents by <small>...</small> if it is non-empty
+def Smallify(s1: str, s2: str="") -> str:
+    if s1 == "":
+        return ""
+    if s2 == "":
+        return f"<small>{s1}</small>"
+
+    return f"<small>{s1}&nbsp;&nbsp;&nbsp;{s2}</small>"
@@ -0,0 +1,145 @@
+from collections import defaultdict
+
+import os
+import re
+import glob
+import json
+import unicodedata
+
+from FanzineIssueSpecPackage import FanzineIssueInfo
+from ReportOutput import OpenReport
+from Log import Log
+
+
+#================================================================================
+# A search index shipped with the reports so that readers can search the catalogue from a static page rather than with Ctrl-F on the giant listings.
+# The index is built in one pass over the issues and written to <reports>/Search:
+#   docs-<n>.json     -- the issues themselves, DocsPerShard to a file: [issue name, series name, editor, year, URL]
+#   index-<xx>.json   -- an inverted index for the words beginning with the prefix xx: {word: [issue IDs]}
+#   search.html       -- the search page, which loads only the index shards for the prefixes of the words searched for
+#                          and then only the docs shards holding the issues found
+# Words come from the issue names, series names and editors; each issue's year is indexed as a word, too.
+# The shards left over from an earlier run which weren't written this time are deleted, so a search can't find an issue that's gone.
+DocsPerShard=2000
+PrefixLength=2
+
+
+# Words are lower-cased with their accents dropped (so "Österreich" is found by "osterreich" and "österreich" alike); letters in any script count.
+# The search page's words() must split words exactly the same way.
+def Words(s: str) -> list[str]:
+    s="".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
+    return [w for w in re.split(r"[\W_]+", s.lower()) if w != ""]
+
+
+def Prefix(word: str) -> str:
+    return word[:PrefixLength]
+
+
+def BuildSearchIndex(fanacIssueList: list[FanzineIssueInfo], reportFilePath: str) -> None:
+    Log("Building the search index", timestamp=True)
+    searchPath=os.path.join(reportFilePath, "Search")
+    if not os.path.isdir(searchPath):
+        os.mkdir(searchPath)
+
+    docs: list[list]=[]
+    index: defaultdict[str, defaultdict[str, list[int]]]=defaultdict(lambda: defaultdict(list))     # Prefix --> word --> list of issue IDs
+    for fz in fanacIssueList:
+        if fz.URL == "":
+            continue
+        issueID=len(docs)
+        year=fz.FIS.Year if fz.FIS is not None else None
+        docs.append([fz.IssueName, fz.SeriesName, fz.Editor, year, fz.URL])
+
+        words=set(Words(fz.IssueName)).union(Words(fz.SeriesName), Words(fz.Editor))
+        if year is not None:
+            words.add(str(year))
+        for word in words:
+            index[Prefix(word)][word].append(issueID)
+
+    written: set[str]=set()
+    for i in range(0, len(docs), DocsPerShard):
+        written.add(WriteJson(os.path.join(searchPath, f"docs-{i//DocsPerShard}.json"), docs[i:i+DocsPerShard]))
+    for prefix, words in index.items():
+        written.add(WriteJson(os.path.join(searchPath, f"index-{prefix}.json"), words))
+    for filename in glob.glob(os.path.join(glob.escape(searchPath), "docs-*.json"))+glob.glob(os.path.join(glob.escape(searchPath), "index-*.json")):
+        if filename not in written:
+            os.remove(filename)
+    with OpenReport(os.path.join(searchPath, "search.html"), "w", encoding="utf-8") as f:
+        f.write(SearchPage.replace("%DocsPerShard%", str(DocsPerShard)).replace("%PrefixLength%", str(PrefixLength)))
+
+    Log(f"Search index complete: {len(docs):,} issues, {sum(len(w) for w in index.values()):,} words in {len(index):,} shards", timestamp=True)
+
+
+# Returns the filename written
+def WriteJson(filename: str, contents) -> str:
+    with OpenReport(filename, "w", encoding="utf-8") as f:
+        json.dump(contents, f, separators=(",", ":"), ensure_ascii=False)
+    return filename
+
+
+#================================================================================
+# The static search page.  A search finds the issues which have, for every word typed, some indexed word beginning with it.
+SearchPage="""<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1, shrink-to-fit=no">
+  <link rel="stylesheet" href="https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css"
+    integrity="sha384-ggOyR0iXCbMQv3Xipma34MD+dH/1fQ784/j6cY/iJTQUOhcWr7x9JvoRxT2MZw1T" crossorigin="anonymous">
+  <title>Search the fanzines on Fanac.org</title>
+</head>
+<body>
+<div class="container">
+  <a href="http://www.fanac.org/" class="btn btn-info" role="button">Home</a>
+  <a href="http://fanac.org/fanzines/Classic_Fanzines.html" class="btn btn-info" role="button">Fanzines</a>
+  <h1>Search the fanzines on Fanac.org</h1>
+  <p>Search by fanzine title, issue, editor or year.</p>
+  <input id="query" type="text" size="50" autofocus> <button id="go" class="btn btn-info">Search</button>
+  <p id="status"></p>
+  <div id="results"></div>
+</div>
+<script>
+const docsPerShard=%DocsPerShard%, prefixLength=%PrefixLength%, maxResults=500;
+const shards={};
+function load(name) {
+  if (!(name in shards))
+    shards[name]=fetch(name).then(r => r.ok ? r.json() : {}).catch(() => ({}));
+  return shards[name];
+}
+function words(s) { return s.normalize("NFKD").replace(/\\p{Mn}/gu, "").toLowerCase().split(/[^\\p{L}\\p{N}]+/u).filter(w => w.length > 0); }
+function escape(s) { const d=document.createElement("div"); d.textContent=s; return d.innerHTML; }
+
+async function search() {
+  const terms=words(document.getElementById("query").value);
+  const status=document.getElementById("status"), results=document.getElementById("results");
+  results.innerHTML="";
+  if (terms.length === 0) { status.textContent=""; return; }
+  status.textContent="Searching...";
+
+  // For each term, the set of issues having a word which begins with it.  (A term shorter than the prefix matches only that exact word.)
+  let found=null;
+  for (const term of terms) {
+    const index=await load("index-"+term.slice(0, prefixLength)+".json");
+    const ids=new Set();
+    for (const [word, list] of Object.entries(index))
+      if (word.startsWith(term))
+        list.forEach(id => ids.add(id));
+    found=found === null ? ids : new Set([...found].filter(id => ids.has(id)));
+  }
+  const ids=[...found].sort((a, b) => a-b);
+  status.textContent=ids.length+" issues found"+(ids.length > maxResults ? " (showing the first "+maxResults+")" : "");
+
+  let html="";
+  for (const id of ids.slice(0, maxResults)) {
+    const docs=await load("docs-"+Math.floor(id/docsPerShard)+".json");
+    const [issue, series, editor, year, url]=docs[id%docsPerShard];
+    html+='<a href="'+encodeURI(url)+'">'+escape(issue)+'</a> <small>('+escape(series)+(editor ? '; ed. '+escape(editor) : '')+(year ? '; '+year : '')+')</small><br>';
+  }
+  results.innerHTML=html;
+}
+document.getElementById("go").onclick=search;
+document.getElementById("query").onkeydown=e => { if (e.key === "Enter") search(); };
+</script>
+</body>
+</html>
+"""
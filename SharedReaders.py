@@ -2,13 +2,16 @@ from typing import Self, Union
 
 import re
 import os
+import sys
 from contextlib import suppress
-import requests
+from functools import lru_cache
+import copy
 import time
 
 import urllib.parse
 
 from Log import Log, LogError
+from LogLevels import LogNormal, LogVerbose
 from FanzineIssueSpecPackage import FanzineIssueInfo, FanzineIssueSpec, FanzineDate, FanzineSerial
 
 from HelpersPackage import CanonicizeColumnHeaders, FindHrefInString, HtmlToUnicode2
@@ -73,7 +76,8 @@ class TextAndHref:
 
 
 #=================================================
-def DecodeTableRow(columnHeaders: list[str], tableRow: list[TextAndHref], iRow: int, defaultcountry: str, defaultEditor: str, fanzineType: str, alphabetizeIndividually: bool, directoryUrl: str) -> FanzineIssueInfo|None:
+def DecodeTableRow(columnHeaders: list[str], tableRow: list[TextAndHref], iRow: int, defaultcountry: str, defaultEditor: str, fanzineType: str, alphabetizeIndividually: bool, directoryUrl: str,
+                   subIndexes: list[tuple[str, str]]|None=None) -> FanzineIssueInfo|None:
     # We need to extract the name, url, year, and vol/issue info for each fanzine
     # We have to treat the Text column specially, since it contains the critical href we need.
     date=ExtractDate(columnHeaders, tableRow)
@@ -81,7 +85,10 @@ def DecodeTableRow(columnHeaders: list[str], tableRow: list[TextAndHref], iRow:
     fis=FanzineIssueSpec(FD=date, FS=ser)
     title=ExtractIssueNameAndHref(columnHeaders, tableRow)
     if "fanac.org/fanzines/" in title.Url.lower() and title.Url[-1] == "/":
-        return None      # This is an independent fanzine index page referred to in this FIP. It will be dealt with on its own and can be skipped for now.
+        # This is an independent fanzine index page referred to in this FIP. It is not an issue, but it is passed back to be crawled on its own.
+        if subIndexes is not None:
+            subIndexes.append((title.Text, title.Url))
+        return None
     pages=ExtractPageCount(columnHeaders, tableRow)
     mailings=ExtractMailings(columnHeaders, tableRow)
     country=ExtractRowCountry(columnHeaders, tableRow, defaultcountry)
@@ -125,9 +132,15 @@ def DecodeTableRow(columnHeaders: list[str], tableRow: list[TextAndHref], iRow:
     fi=FanzineIssueInfo(IssueName=title.Text, DirURL=dirUrl, PageFilename=title.Url, FIS=fis, Position=iRow, Pagecount=pages, Editor=ed, Country=country, Mailings=mailings,
                         FanzineType=fanzineType, AlphabetizeIndividually=alphabetizeIndividually)
     if fi.IssueName == "<not found>" and fi.FIS.Vol is None and fi.FIS.Year is None and fi.FIS.MonthNum is None:
-        Log(f"   ****Skipping null table row (#1): {fi}")
+        LogVerbose(lambda: f"   ****Skipping null table row (#1): {fi}")
         return None
 
+    # Keep the text of date columns which couldn't be interpreted, so that the data-quality checks can report it.  (Empty date columns aren't an error.)
+    if date.Year is None:
+        dateText=DateColumnsText(columnHeaders, tableRow)
+        if dateText != "":
+            fi.UnparsedDate=dateText
+
     return fi
 
 
@@ -137,20 +150,20 @@ def DecodeTableRow(columnHeaders: list[str], tableRow: list[TextAndHref], iRow:
 def ExtractDate(columnHeaders: list[str], row: list[TextAndHref]) -> FanzineDate:
 
     # Does this have a Date column?  If so, that's all we need. (I hope...)
-    dateText=GetCellValueByColHeader(columnHeaders, row, "Date").Text
+    dateText=NormalizeCellText(GetCellValueByColHeader(columnHeaders, row, "Date").Text)
     if dateText is not None and len(dateText) > 0:
         # Get the date
-        with suppress(Exception):
-            return FanzineDate().Match(dateText)
+        fd=MatchDateCached(dateText)
+        if fd is not None:
+            return copy.copy(fd)    # The cached FanzineDate is shared, so the caller gets its own copy
 
     # Next, take the various parts and assemble them and try to interpret the result using the FanzineDate() parser
-    yearText=GetCellValueByColHeader(columnHeaders, row, "Year").Text
-    monthText=GetCellValueByColHeader(columnHeaders, row, "Month").Text
-    dayText=GetCellValueByColHeader(columnHeaders, row, "Day").Text
+    yearText=NormalizeCellText(GetCellValueByColHeader(columnHeaders, row, "Year").Text)
+    monthText=NormalizeCellText(GetCellValueByColHeader(columnHeaders, row, "Month").Text)
+    dayText=NormalizeCellText(GetCellValueByColHeader(columnHeaders, row, "Day").Text)
 
     if yearText != "":  # Without a year, the month and day become meaningless
-        fd=FanzineDate(YearText=yearText, MonthText=monthText, Day=dayText, DateText=dateText)
-        return fd
+        return copy.copy(AssembleDateCached(yearText, monthText, dayText, dateText))
 
     # We want to log bad data, but not completely missing data.
     if len(dateText) != 0 or len(yearText) != 0 or len(monthText) != 0 or len(dayText) != 0:
@@ -158,6 +171,49 @@ def ExtractDate(columnHeaders: list[str], row: list[TextAndHref]) -> FanzineDate
     return FanzineDate()        # REturn an empty FanzineDate structure
 
 
+# The text of a row's date columns (Date, Year, Month, Day), joined by spaces: "" if they are all empty
+def DateColumnsText(columnHeaders: list[str], row: list[TextAndHref]) -> str:
+    texts=[NormalizeCellText(GetCellValueByColHeader(columnHeaders, row, header).Text) for header in ["Date", "Year", "Month", "Day"]]
+    return " ".join(t for t in texts if t is not None and t != "")
+
+
+#=============================================================================================
+# Bounded caches for the date and serial parsers used in decoding table rows.
+# The same column texts ("1953", "Spring 1962", "V2#3") recur thousands of times across the site, so each distinct combination is parsed only once.
+# The keys are the stripped cell texts.  The cached values are shared between callers, so FanzineDates are copied before they are handed out
+#   and serials are cached as tuples.
+ParseCacheSize=8192
+
+def NormalizeCellText(text: str|None) -> str|None:
+    if text is None:
+        return None
+    return text.strip()
+
+
+# Returns None if the text can't be interpreted as a date
+@lru_cache(maxsize=ParseCacheSize)
+def MatchDateCached(dateText: str) -> FanzineDate|None:
+    with suppress(Exception):
+        return FanzineDate().Match(dateText)
+    return None
+
+
+@lru_cache(maxsize=ParseCacheSize)
+def AssembleDateCached(yearText: str, monthText: str, dayText: str, dateText: str) -> FanzineDate:
+    return FanzineDate(YearText=yearText, MonthText=monthText, Day=dayText, DateText=dateText)
+
+
+# Lines for the run summary giving the parse caches' hit rates
+def ParseCacheSummaryLines() -> list[str]:
+    lines=[]
+    for name, cached in [("Date", MatchDateCached), ("Year/Month/Day", AssembleDateCached), ("Serial", SerialNumberCached)]:
+        info=cached.cache_info()
+        calls=info.hits+info.misses
+        rate=100*info.hits/calls if calls > 0 else 0
+        lines.append(f"{name} parse cache: {info.hits:,} hits of {calls:,} lookups ({rate:.1f}%), {info.currsize:,} entries")
+    return lines
+
+
 #=============================================================================================
 # Extract a serial number (vol, num, whole_num) from a table row
 # We return a FanzineSerial object
@@ -214,7 +270,7 @@ def ExtractRowCountry(columnHeaders: list[str], row: list[TextAndHref], defaultc
     if country is None or country == "":
         return defaultcountry
 
-    return country.strip()
+    return sys.intern(country.strip())     # The same few countries recur on every row, so share one copy of each
 
 
 #=============================================================================================
@@ -318,6 +374,17 @@ def ExtractMailings(columnHeaders: list[str], row: list[TextAndHref]) -> list[st
 # Given the contents of various table columns, attempt to extract serial information
 # This uses InterpretSerial for detailed decoding
 def ExtractSerialNumber(volText: str, numText: str, wholeText: str, volNumText: str, titleText: str) -> FanzineSerial:
+    if isinstance(titleText, list):
+        titleText=titleText[0]
+    volInt, numInt, numsuffix, wholeInt, wsuffix=SerialNumberCached(NormalizeCellText(volText), NormalizeCellText(numText), NormalizeCellText(wholeText),
+                                                                    NormalizeCellText(volNumText), NormalizeCellText(titleText))
+    return FanzineSerial(Vol=volInt, Num=numInt, NumSuffix=numsuffix, Whole=wholeInt, WSuffix=wsuffix)
+
+
+# The decoding proper.  Returns the tuple (Vol, Num, NumSuffix, Whole, WSuffix)
+# Note that because this is cached, an inconsistent serial designation is only logged the first time it is seen.
+@lru_cache(maxsize=ParseCacheSize)
+def SerialNumberCached(volText: str, numText: str, wholeText: str, volNumText: str, titleText: str) -> tuple:
     wholeInt=None
     volInt=None
     numInt=None
@@ -368,7 +435,7 @@ def ExtractSerialNumber(volText: str, numText: str, wholeText: str, volNumText:
         #   Vn  -- a volume number, but where's the issue?
         #   Vn[,] #m  -- a volume and number-within-volume
         #   Vn.m -- ditto
-        ser=FanzineSerial().Match(titleText if not isinstance(titleText, list) else titleText[0])
+        ser=FanzineSerial().Match(titleText)
 
         # Some indexes have fanzine names ending in <month> <year>.  We'll detect these by looking for a trailing number between 1930 and 2050, and reject
         # getting vol/ser, etc., from the title if we find it.
@@ -398,7 +465,7 @@ def ExtractSerialNumber(volText: str, numText: str, wholeText: str, volNumText:
             numsuffix=ser.NumSuffix
             wsuffix=ser.WSuffix
 
-    return FanzineSerial(Vol=volInt, Num=numInt, NumSuffix=numsuffix, Whole=wholeInt, WSuffix=wsuffix)
+    return volInt, numInt, numsuffix, wholeInt, wsuffix
 
 
 #======================================================================================
@@ -407,33 +474,34 @@ def FetchFileFromServer(directoryUrl: str) -> str|None:
     # * The fanzine's Issue Index Table page
     # * A singleton page
     # * The root of a tree with multiple Issue Index Pages
-    Log(f"    opening {directoryUrl}", noNewLine=True)
+    import requests     # Imported here so that runs which don't touch the network don't pay for loading it
+    # Pages are fetched concurrently, so each message is a complete line naming the URL
     try:
         h=requests.get(directoryUrl, timeout=1, headers={'Cache-Control': 'no-cache'})
     except:
-        LogError(f"\n***FetchFileFromServer failed. Retrying after 1.0 sec: {directoryUrl}")
+        LogError(f"***FetchFileFromServer failed. Retrying after 1.0 sec: {directoryUrl}")
         time.sleep(0.5)
         try:    # Do first retry
             h=requests.get(directoryUrl, timeout=2, headers={'Cache-Control': 'no-cache'})
         except:
             try:  # Do second retry
-                LogError(f"\n***FetchFileFromServer failed again. Retrying after 2.0 sec: {directoryUrl}")
+                LogError(f"***FetchFileFromServer failed again. Retrying after 2.0 sec: {directoryUrl}")
                 time.sleep(2.0)
                 h=requests.get(directoryUrl, timeout=4, headers={'Cache-Control': 'no-cache'})
             except:
                 try:  # Do a second second retry
-                    LogError(f"\n***FetchFileFromServer failed again. Retrying after 2.0 sec: {directoryUrl}")
+                    LogError(f"***FetchFileFromServer failed again. Retrying after 2.0 sec: {directoryUrl}")
                     time.sleep(2.0)
                     h=requests.get(directoryUrl, timeout=4, headers={'Cache-Control': 'no-cache'})
                 except:
                     try:  # Do third retry
-                        LogError(f"\n***FetchFileFromServer failed again. Retrying after 5.0 sec: {directoryUrl}")
+                        LogError(f"***FetchFileFromServer failed again. Retrying after 5.0 sec: {directoryUrl}")
                         time.sleep(5.0)
                         h=requests.get(directoryUrl, timeout=8, headers={'Cache-Control': 'no-cache'})
                     except:
-                        LogError(f"\n***FetchFileFromServer failed five times. Load attempt aborted: {directoryUrl}")
+                        LogError(f"***FetchFileFromServer failed five times. Load attempt aborted: {directoryUrl}")
                         return None
-    Log("...loaded", noNewLine=True)
+    LogNormal(f"    loaded {directoryUrl}")
 
     h.encoding='UTF-8'
     x=h.text
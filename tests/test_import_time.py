@@ -0,0 +1,59 @@
+import os
+import re
+import sys
+import subprocess
+
+
+#================================================================================
+# A report-only run shouldn't pay for loading the GUI toolkit or the HTTP stack: FanacAnalyser and the modules it imports at load time import
+#   tkinter, requests and jsonpickle only inside the functions which need them.
+# The import is run with "python -X importtime" in a fresh interpreter, which lists every module loaded and how long it took.
+# The helper packages which aren't part of this repository are replaced by stand-ins when they aren't installed, so the test always runs.
+#   (Only what the modules here do at load time is needed of them: importing names, using them in annotations, and subclassing or calling them.)
+RepoDir=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LazyModules=["tkinter", "requests", "jsonpickle"]
+
+ExternalModules=["FanzineIssueSpecPackage", "HelpersPackage", "Locale", "Log", "Settings"]
+
+# Run in the fresh interpreter before the import being timed
+StubModules=f"""
+import sys, types, importlib.util
+
+class Stub:
+    def __init__(self, *args, **kwargs):
+        pass
+    def __call__(self, *args, **kwargs):
+        return Stub()
+    def __getattr__(self, name):
+        return Stub()
+
+def StubModule(name):
+    module=types.ModuleType(name)
+    module.__getattr__=lambda attr: type(attr, (Stub,), {{}})
+    return module
+
+for name in {ExternalModules!r}:
+    if importlib.util.find_spec(name) is None:
+        sys.modules[name]=StubModule(name)
+"""
+
+
+# Return the modules imported by "import <module>" as a dict of module name --> cumulative import time in microseconds
+def ImportTimes(module: str) -> dict[str, int]:
+    result=subprocess.run([sys.executable, "-X", "importtime", "-c", f"{StubModules}\nimport {module}"], cwd=RepoDir, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    times: dict[str, int]={}
+    for line in result.stderr.splitlines():
+        m=re.match(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s+(\S.*)$", line)
+        if m is not None:
+            times[m.group(2).strip()]=int(m.group(1))
+    return times
+
+
+def test_import_fanacanalyser_skips_heavy_modules():
+    times=ImportTimes("FanacAnalyser")
+    assert "FanacAnalyser" in times
+    loaded=[name for name in times if name.split(".")[0] in LazyModules]
+    assert loaded == [], f"imported at load time: {', '.join(loaded)}"
+    print(f"import FanacAnalyser: {times['FanacAnalyser']/1000:.1f} ms")